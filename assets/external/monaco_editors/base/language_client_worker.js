@@ -0,0 +1 @@
+/root/package/src/monaco_editors/language_client_worker.js
\ No newline at end of file
@@ -4,15 +4,116 @@ This package provides integration and configuration for Monaco Editor components
 including language servers and editor models.
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
 from .base import monaco_editor
-from .lifespan_tasks import start_terraform_ls
-from .models import Command, LanguageClientConfig, LanguageServerUrl, TextModel
+from .diff import compute_hunks
+from .models import (
+    ClientMiddleware,
+    Command,
+    CommandProgress,
+    CursorChange,
+    Diagnostic,
+    DiagnosticsConfig,
+    DiffConfig,
+    DiffHunk,
+    DiffTextModel,
+    DocumentDiagnostics,
+    DocumentSync,
+    LanguageClientConfig,
+    LanguageServerSpec,
+    LanguageServerUrl,
+    LargeFilePolicy,
+    ModelCache,
+    ScrollChange,
+    SearchMatch,
+    SearchQuery,
+    SearchResults,
+    SelectionChange,
+    StreamConfig,
+    TextDelta,
+    TextModel,
+    WorkspaceFiles,
+)
+from .placeholder import highlight_placeholder
+
+if TYPE_CHECKING:
+    from .lifespan_tasks import (
+        preindex_workspaces,
+        serve_documents,
+        serve_workspace_files,
+        serve_workspace_search,
+        start_language_servers,
+        start_terraform_gateway,
+        start_terraform_ls,
+        terraform_language_server,
+    )
+
+# The backend lifespan tasks (and the Terraform tooling, with its network and archive imports) are imported on first
+# access, so apps that only render editors don't pay for them at startup.
+_LAZY_ATTRIBUTES = {
+    "preindex_workspaces": ".lifespan_tasks",
+    "serve_documents": ".lifespan_tasks",
+    "serve_workspace_files": ".lifespan_tasks",
+    "serve_workspace_search": ".lifespan_tasks",
+    "start_language_servers": ".lifespan_tasks",
+    "start_terraform_gateway": ".lifespan_tasks",
+    "start_terraform_ls": ".lifespan_tasks",
+    "terraform_language_server": ".lifespan_tasks",
+}
+
+
+def __getattr__(name: str) -> object:
+    """Imports the lazily loaded attributes on first access."""
+    if (module := _LAZY_ATTRIBUTES.get(name)) is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """Lists the module's attributes, including the ones not loaded yet."""
+    return sorted({*globals(), *_LAZY_ATTRIBUTES})
+
 
 __all__ = (
+    "ClientMiddleware",
     "Command",
+    "CommandProgress",
+    "CursorChange",
+    "Diagnostic",
+    "DiagnosticsConfig",
+    "DiffConfig",
+    "DiffHunk",
+    "DiffTextModel",
+    "DocumentDiagnostics",
+    "DocumentSync",
     "LanguageClientConfig",
+    "LanguageServerSpec",
     "LanguageServerUrl",
+    "LargeFilePolicy",
+    "ModelCache",
+    "ScrollChange",
+    "SearchMatch",
+    "SearchQuery",
+    "SearchResults",
+    "SelectionChange",
+    "StreamConfig",
+    "TextDelta",
     "TextModel",
+    "WorkspaceFiles",
+    "compute_hunks",
+    "highlight_placeholder",
     "monaco_editor",
+    "preindex_workspaces",
+    "serve_documents",
+    "serve_workspace_files",
+    "serve_workspace_search",
+    "start_language_servers",
+    "start_terraform_gateway",
     "start_terraform_ls",
+    "terraform_language_server",
 )
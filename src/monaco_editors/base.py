@@ -1,78 +1,184 @@
 """Base module for Monaco editor integration with Reflex."""
 
-from typing import Literal
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Literal
 
 import reflex as rx
 
 from monaco_editors import constants
 
-from .models import Command, LanguageClientConfig, LanguageServerUrl, TextModel
+from .diff import compute_hunks
+from .models import (
+    ClientMiddleware,
+    Command,
+    CommandProgress,
+    CursorChange,
+    DiagnosticsConfig,
+    DiffConfig,
+    DiffHunk,
+    DocumentDiagnostics,
+    DocumentSync,
+    LanguageClientConfig,
+    LanguageServerUrl,
+    LargeFilePolicy,
+    ModelCache,
+    ScrollChange,
+    SearchQuery,
+    SelectionChange,
+    StreamConfig,
+    TextDelta,
+    TextModel,
+    WorkspaceFiles,
+)
+from .placeholder import highlight_placeholder
+from .snippet import MonacoSnippet
+
+# The view event triggers, coalesced per animation frame and rate-limited by `view_event_rate`.
+VIEW_EVENT_TRIGGERS = ("on_cursor_change", "on_selection_change", "on_scroll")
+# Maximum number of distinct editor configs whose generated hooks are kept.
+HOOK_CACHE_SIZE = 512
+_HOOK_CACHE: OrderedDict[str, tuple[rx.Var, ...]] = OrderedDict()
+
+
+def generate_client_statics(language_clients: list[LanguageClientConfig]) -> dict[str, dict[str, Any]]:
+    """Generates the static (non-reactive) part of each language client config.
 
+    Args:
+        language_clients (list[LanguageClientConfig]): The list of lanaguge clients to configure for the editor.
+
+    Returns:
+        The JSON-serializable static configs, keyed by language ID.
+    """
+    return {
+        config.language_id: {
+            "name": f"{config.language_id} client",
+            "url": config.url.formatted,
+            "documentSelector": config.document_selector or [config.language_id],
+            "middleware": (
+                {
+                    "cancelSuperseded": config.middleware.cancel_superseded,
+                    "cacheResults": config.middleware.cache_results,
+                }
+                if config.middleware
+                else None
+            ),
+            "sessionResume": config.session_resume,
+            "workspaceRouting": config.workspace_routing,
+            "restartOptions": constants.FunctionConstants.RESTART_OPTIONS if config.session_resume else None,
+            "sharedWorker": rx.asset("language_client_worker.js", shared=True) if config.shared_worker else None,
+        }
+        for config in language_clients
+    }
 
-def generate_start_options(config: LanguageClientConfig) -> str:
-    """Generates the JS `onCall` start options for the language client, if commands are configured for the editor.
+
+def json_constant(prefix: str, value: Any) -> tuple[str, str]:  # noqa: ANN401
+    """Generates a module-level JS constant holding a value as JSON.
+
+    The constant is named after a hash of its content, so editors with the same config share it.
 
     Args:
-        config (LanguageClientConfig): The language client config object.
+        prefix (str): The name prefix of the constant.
+        value (Any): The JSON-serializable value.
 
     Returns:
-        The configured `startOptions` for the language client as a JS object string.
+        The name of the constant and its JS declaration.
     """
-    if config.register_commands:
-        commands = f"""Object.entries({config.register_commands}).map(async ([name, params]) => {{
-            params["name"] = name
-            params["language"] = '{config.language_id}'
-            await registerCommand(params);
-        }})"""
-        return f"""startOptions: {{
-            onCall: async () => {{
-                {commands}
-            }}
-        }}
-        """
-    return ""
+    content = json.dumps(value, sort_keys=True)
+    name = f"{prefix}_{hashlib.sha256(content.encode()).hexdigest()[:12]}"
+    return name, f"const {name} = {content};"
+
+
+def client_statics_constant(language_clients: list[LanguageClientConfig]) -> tuple[str, str]:
+    """Generates the module-level JS constant holding the static language client configs as JSON.
+
+    Args:
+        language_clients (list[LanguageClientConfig]): The list of lanaguge clients to configure for the editor.
+
+    Returns:
+        The name of the constant and its JS declaration.
+    """
+    return json_constant("languageClients", generate_client_statics(language_clients))
+
+
+def large_file_constant(policy: LargeFilePolicy) -> tuple[str, str]:
+    """Generates the module-level JS constant holding the large file policy as JSON.
+
+    Args:
+        policy (LargeFilePolicy): The large file policy of the editor.
+
+    Returns:
+        The name of the constant and its JS declaration.
+    """
+    return json_constant(
+        "largeFilePolicy",
+        {
+            "maxLines": policy.max_lines,
+            "maxBytes": policy.max_bytes,
+            "chunkSize": policy.chunk_size,
+            "editorOptions": policy.editor_options,
+        },
+    )
 
 
-def configure_language_clients(language_clients: list[LanguageClientConfig]) -> str:
-    """Configures all language clients as JS objects.
+def configure_language_clients(language_clients: list[LanguageClientConfig], *, save_only: bool = False) -> str:
+    """Configures all language clients as a JS expression.
+
+    Only the reactive values (the workspace and the state-bound `register_commands` and `initialization_options`)
+    are passed from the component body; everything else comes from the `client_statics_constant`.
 
     Args:
         language_clients (list[LanguageClientConfig]): The list of lanaguge clients to configure for the editor.
+        save_only (bool): Whether large files (see `LargeFilePolicy`) are only synced on save.
 
     Returns:
-        The language client configs JS object string.
+        The language client configs JS expression.
     """
     if language_clients:
-        config_string = ""
-        for config in language_clients:
-            config_string += f"""{config.language_id}: {{
-                name: "{config.language_id} client",
-                connection: {{
-                    options: {{
-                        $type: "WebSocketUrl",
-                        url: "{config.url.formatted}",
-                        {generate_start_options(config=config)}
-                    }}
-                }},
-                clientOptions: {{
-                    documentSelector: {config.document_selector or [config.language_id]},
-                    workspaceFolder: {{
-                        index: 0,
-                        name: "workspace",
-                        uri: vscode.Uri.parse(`${{workspace}}`)
-                    }},
-                    initializationOptions: {config.initialization_options or "{}"}
-                }}
-            }},
-            """
-        return f"""{{
-            configs: {{
-                {config_string}
-            }}
-        }}"""
+        name, _ = client_statics_constant(language_clients)
+        reactive = "".join(
+            f"{json.dumps(config.language_id)}: {{"
+            f"registerCommands: {config.register_commands or 'undefined'}, "
+            f"initializationOptions: {config.initialization_options or 'undefined'}}}, "
+            for config in language_clients
+        )
+        save_only_uris = ", saveOnlyUris" if save_only else ""
+        return f"buildLanguageClientConfigs({name}, workspace, registerCommands, {{{reactive}}}{save_only_uris})"
     return "undefined"
 
 
+def append(editor_id: str, chunk: str) -> rx.event.EventSpec:
+    """Appends a chunk of text to a streaming editor (see `StreamConfig`).
+
+    Yield it from an event handler, e.g. a background event reading `terraform plan` output.
+
+    Args:
+        editor_id (str): The `id` of the streaming editor.
+        chunk (str): The text to append.
+
+    Returns:
+        The event that appends the chunk in the browser.
+    """
+    return rx.call_script(f"globalThis.monacoEditorStream?.({json.dumps(editor_id)}).append({json.dumps(chunk)})")
+
+
+def cancel_command(name: str | None = None) -> rx.event.EventSpec:
+    """Cancels the queued and running executions of a registered editor command (see `Command`).
+
+    Queued executions are dropped. Running `request` commands are sent a `$/cancelRequest`, and don't restart the
+    language client afterwards.
+
+    Args:
+        name (str | None): The registered command name. Defaults to all registered commands.
+
+    Returns:
+        The event that cancels the command in the browser.
+    """
+    argument = json.dumps(name) if name is not None else ""
+    return rx.call_script(f"globalThis.monacoEditorCommands?.cancel({argument})")
+
+
 class MonacoEditorReactComp(rx.Component):
     """Monaco Editor with configurable langauage clients."""
 
@@ -83,9 +189,68 @@ class MonacoEditorReactComp(rx.Component):
         "@codingame/monaco-vscode-all-language-default-extensions@20.2.1",
     ]
 
+    @classmethod
+    def create(cls, *children: rx.Component, **props: Any) -> rx.Component:  # noqa: ANN401
+        """Creates the editor, with its static placeholder (see `highlight_placeholder`) as its only child.
+
+        The placeholder shows `value` until the editor starts. There's none for diff, streaming and stored documents,
+        which don't show `value`, nor for a state-bound `value` without a `placeholder`, which isn't known yet.
+
+        Raises:
+            TypeError: If children are passed; the editor renders its own content.
+        """
+        if children:
+            msg = "monaco_editor doesn't take children; pass the code as `value`"
+            raise TypeError(msg)
+        component = super().create(**props)
+        html, value, filename = (
+            x._var_value if isinstance(x, rx.vars.LiteralVar) else x  # noqa: SLF001
+            for x in (component.placeholder, component.value, component.filename)
+        )
+        shows_value = component.original is None and not component.stream and component.document_id is None
+        if html is None and shows_value and isinstance(value, str) and value and isinstance(filename, str):
+            html = highlight_placeholder(value, filename)
+        component.children = []
+        if html is not None and not (isinstance(html, str) and not html):
+            component.children.append(
+                rx.el.div(
+                    dangerouslySetInnerHTML={"__html": html},
+                    style={"height": "100%"},
+                    custom_attrs={"data-monaco-placeholder": "true"},
+                )
+            )
+        return component
+
     def add_imports(self) -> dict:
         """Add imports."""
+        model_cache = (
+            {
+                "@codingame/monaco-vscode-api/monaco": rx.ImportVar(
+                    "createModelReference", is_default=False, install=False
+                ),
+            }
+            if self.model_cache
+            else {}
+        )
+        workspace_files = (
+            {
+                "@codingame/monaco-vscode-files-service-override": [
+                    rx.ImportVar(name, is_default=False, install=False)
+                    for name in (
+                        "FileSystemProviderCapabilities",
+                        "FileSystemProviderError",
+                        "FileSystemProviderErrorCode",
+                        "FileType",
+                        "registerFileSystemOverlay",
+                    )
+                ],
+            }
+            if self.workspace_files
+            else {}
+        )
         return {
+            **model_cache,
+            **workspace_files,
             "@codingame/monaco-vscode-api": rx.ImportVar("LogLevel", is_default=False, install=False),
             "monaco-editor-wrapper": [
                 rx.ImportVar("MonacoEditorLanguageClientWrapper", is_default=False, install=False),
@@ -112,7 +277,164 @@ class MonacoEditorReactComp(rx.Component):
         }
 
     def add_hooks(self) -> list:
-        """Add component function hooks."""
+        """Add component function hooks.
+
+        The generated hooks are cached by a hash of the effective config (props, event triggers and language
+        clients), so pages with many editors only generate the JS once per distinct config.
+        """
+        if isinstance(self.workspace_folder, type(None)):  # noqa: FURB168
+            self.workspace_folder = "/workspace"
+        if self.stream and self.id is None:
+            msg = "A streaming monaco_editor needs an `id` to append to"
+            raise ValueError(msg)
+        if (self.document_id is None) != (self.document_sync is None):
+            msg = "`document_id` and `document_sync` must be set together"
+            raise ValueError(msg)
+
+        inputs = self._hook_inputs()
+        key = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=format).encode()).hexdigest()
+        if (hooks := _HOOK_CACHE.get(key)) is None:
+            hooks = _HOOK_CACHE[key] = self._generate_hooks(inputs)
+            if len(_HOOK_CACHE) > HOOK_CACHE_SIZE:
+                _HOOK_CACHE.popitem(last=False)
+        else:
+            _HOOK_CACHE.move_to_end(key)
+        return list(hooks)
+
+    def _hook_inputs(self) -> dict[str, Any]:
+        """Returns the formatted JS fragments (and language clients) that the generated hooks depend on."""
+
+        def trigger(name: str) -> str:
+            if self.event_triggers.get(name):
+                return rx.vars.LiteralVar.create(self.event_triggers[name])._js_expr  # noqa: SLF001
+            return ""
+
+        return {
+            "workspace_folder": format(
+                rx.Var.create(self.workspace_folder)
+                if isinstance(self.workspace_folder, str)
+                else self.workspace_folder
+            ),
+            "value": format(rx.Var.create(self.value) if isinstance(self.value, str) else self.value),
+            "theme": format(self.theme),
+            "loglevel": self.loglevel,
+            "filename": format(rx.Var.create(self.filename)),
+            "on_change": trigger("on_change"),
+            "on_command": trigger("on_command"),
+            "on_command_complete": trigger("on_command_complete"),
+            "on_restart": trigger("on_restart"),
+            "on_command_progress": trigger("on_command_progress"),
+            "language_clients": [config.model_dump() for config in self.language_clients],
+            "large_file_threshold": self.large_file_threshold.model_dump() if self.large_file_threshold else None,
+            "id": format(rx.Var.create(self.id)) if self.id is not None else "",
+            "stream": self.stream.model_dump() if self.stream else None,
+            "original": (
+                format(rx.Var.create(self.original) if isinstance(self.original, str) else self.original)
+                if self.original is not None
+                else ""
+            ),
+            "hunks": self._hunks_expression(),
+            "diff_config": self.diff_config.model_dump() if self.diff_config else None,
+            "on_delta": trigger("on_delta"),
+            "on_search": trigger("on_search"),
+            **{name: trigger(name) for name in VIEW_EVENT_TRIGGERS},
+            "view_event_rate": self.view_event_rate,
+            "on_diagnostics": trigger("on_diagnostics"),
+            "diagnostics_config": self.diagnostics_config.model_dump() if self.diagnostics_config else None,
+            "model_cache": self.model_cache.model_dump() if self.model_cache else None,
+            "workspace_files": self.workspace_files.model_dump() if self.workspace_files else None,
+            "document_id": format(rx.Var.create(self.document_id)) if self.document_id is not None else "",
+            "document_sync": self.document_sync.model_dump() if self.document_sync else None,
+        }
+
+    def _hunks_expression(self) -> str:
+        """Returns the JS expression of the precomputed hunks; literal hunks are a module-level constant."""
+        if self.hunks is None:
+            return ""
+        if isinstance(self.hunks, rx.Var):
+            return format(self.hunks)
+        return json_constant("diffHunks", self.hunks)[0]
+
+    def _update_code(self, inputs: dict[str, Any], policy: str) -> str:
+        """Returns the `useEffect` that updates the editor's text when `value` (or `filename`) changes."""
+        if self.original is not None:
+            return constants.UseEffects.UPDATE_DIFF_CODE.format(filename=inputs["filename"])
+        if policy:
+            return constants.UseEffects.UPDATE_LARGE_CODE.format(filename=inputs["filename"], policy=policy)
+        if self.document_sync:
+            return constants.UseEffects.UPDATE_STORED_CODE.format(
+                filename=inputs["filename"],
+                document_id=inputs["document_id"],
+                config=json.dumps({"url": self.document_sync.url.rstrip("/"), "debounce": self.document_sync.debounce}),
+            )
+        if self.model_cache and not self.stream:
+            return constants.UseEffects.UPDATE_CACHED_CODE.format(
+                filename=inputs["filename"],
+                limits=json.dumps({"maxModels": self.model_cache.max_models, "maxBytes": self.model_cache.max_bytes}),
+            )
+        return constants.UseEffects.UPDATE_CODE.format(filename=inputs["filename"])
+
+    def _diff_editor(self) -> str:
+        """Returns the diff editor entries of the editor app config."""
+        diff_config = self.diff_config or DiffConfig()
+        return constants.WrapperConfig.DIFF_EDITOR.format(
+            options=json.dumps(
+                {
+                    "maxComputationTime": diff_config.max_computation_time,
+                    "maxFileSize": diff_config.max_file_size,
+                    "renderSideBySide": diff_config.render_side_by_side,
+                    "originalEditable": diff_config.original_editable,
+                }
+            )
+        )
+
+    def _feature_inits(self, inputs: dict[str, Any], policy: str) -> str:
+        """Returns the init code of the editor's optional features, run once the editor has started."""
+        additional = f"{constants.CodeLensProviders.TERRAFORM_RESOURCE_DOCS}"
+        if policy:
+            additional += constants.FunctionConstants.LARGE_FILE_INIT.format(
+                on_change=inputs["on_change"] or "undefined", policy=policy
+            )
+        if self.stream:
+            additional += constants.FunctionConstants.STREAM_INIT.format(
+                id=inputs["id"],
+                config=json.dumps({"maxLines": self.stream.max_lines, "autoScroll": self.stream.auto_scroll}),
+            )
+        if self.original is not None:
+            additional += constants.FunctionConstants.DIFF_INIT.format(
+                on_change=inputs["on_change"] or "undefined", on_delta=inputs["on_delta"] or "undefined"
+            )
+        elif inputs["on_delta"]:
+            additional += constants.FunctionConstants.DELTA_INIT.format(on_delta=inputs["on_delta"])
+        if self.workspace_files:
+            additional += constants.FunctionConstants.WORKSPACE_FILES_INIT.format(
+                config=json.dumps(
+                    {
+                        "url": self.workspace_files.url.rstrip("/"),
+                        "pageSize": self.workspace_files.page_size,
+                        "cacheSize": self.workspace_files.cache_size,
+                        "statTtl": self.workspace_files.stat_ttl,
+                    }
+                )
+            )
+        if inputs["on_search"]:
+            additional += constants.FunctionConstants.SEARCH_INIT.format(on_search=inputs["on_search"])
+        if any(inputs[name] for name in VIEW_EVENT_TRIGGERS):
+            additional += constants.FunctionConstants.VIEW_EVENTS_INIT.format(
+                **{name: inputs[name] or "undefined" for name in VIEW_EVENT_TRIGGERS}, rate=inputs["view_event_rate"]
+            )
+        if inputs["on_diagnostics"]:
+            diagnostics_config = self.diagnostics_config or DiagnosticsConfig()
+            additional += constants.FunctionConstants.DIAGNOSTICS_INIT.format(
+                on_diagnostics=inputs["on_diagnostics"],
+                config=json.dumps(
+                    {"minSeverity": diagnostics_config.min_severity, "maxRate": diagnostics_config.max_rate}
+                ),
+            )
+        return additional
+
+    def _generate_hooks(self, inputs: dict[str, Any]) -> tuple[rx.Var, ...]:
+        """Generates the component function hooks from the formatted `_hook_inputs`."""
         # Internal Hooks - Does not have SELF access, so can only be static strings.
         internal = [
             rx.vars.base.Var(
@@ -130,57 +452,73 @@ class MonacoEditorReactComp(rx.Component):
         ]
 
         # Pre-Trigger Hooks - mostly function `const` definitions.
-        on_command = (
-            f"{rx.vars.LiteralVar.create(self.event_triggers['on_command'])._js_expr}(name);"  # noqa: SLF001
-            if self.event_triggers.get("on_command")
-            else ""
-        )
-        on_command_complete = (
-            f"{rx.vars.LiteralVar.create(self.event_triggers['on_command_complete'])._js_expr}(name);"  # noqa: SLF001
-            if self.event_triggers.get("on_command_complete")
-            else ""
-        )
-        on_restart = (
-            f"{rx.vars.LiteralVar.create(self.event_triggers['on_restart'])._js_expr}(language);"  # noqa: SLF001
-            if self.event_triggers.get("on_restart")
-            else ""
+        on_command, on_command_complete, on_restart, on_command_progress = (
+            f"{inputs[name]}({argument});" if inputs[name] else ""
+            for name, argument in (
+                ("on_command", "name"),
+                ("on_command_complete", "name"),
+                ("on_restart", "language"),
+                ("on_command_progress", "progress"),
+            )
         )
 
-        if isinstance(self.workspace_folder, type(None)):  # noqa: FURB168
-            self.workspace_folder = "/workspace"
-
         pre_triggers = [
             rx.vars.base.Var(
                 pre_trigger,
                 _var_data=rx.vars.base.VarData(position=rx.constants.Hooks.HookPosition.PRE_TRIGGER),
             )
             for pre_trigger in (
-                constants.FunctionConstants.WORKSPACE.format(
-                    workspace_folder=(
-                        rx.Var.create(self.workspace_folder)
-                        if isinstance(self.workspace_folder, str)
-                        else self.workspace_folder
-                    )
-                ),
-                constants.FunctionConstants.CODE_VALUE.format(
-                    value=rx.Var.create(self.value) if isinstance(self.value, str) else self.value,
-                ),
-                constants.FunctionConstants.USER_CONFIG.format(theme=self.theme),
+                constants.FunctionConstants.WORKSPACE.format(workspace_folder=inputs["workspace_folder"]),
+                constants.FunctionConstants.CODE_VALUE.format(value=inputs["value"]),
+                constants.FunctionConstants.USER_CONFIG.format(theme=inputs["theme"]),
                 constants.FunctionConstants.GET_PROVIDERS,
                 constants.FunctionConstants.REGISTER_COMMANDS.format(
-                    on_command=on_command, on_command_complete=on_command_complete, on_restart=on_restart
+                    on_command=on_command,
+                    on_command_complete=on_command_complete,
+                    on_restart=on_restart,
+                    on_command_progress=on_command_progress,
                 ),
             )
         ]
+        diff = self.original is not None
+        if diff:
+            pre_triggers.extend(
+                rx.vars.base.Var(
+                    pre_trigger,
+                    _var_data=rx.vars.base.VarData(position=rx.constants.Hooks.HookPosition.PRE_TRIGGER),
+                )
+                for pre_trigger in (
+                    constants.FunctionConstants.ORIGINAL_VALUE.format(original=inputs["original"]),
+                    constants.FunctionConstants.PRECOMPUTED_HUNKS.format(hunks=inputs["hunks"] or "undefined"),
+                )
+            )
+        policy = large_file_constant(self.large_file_threshold)[0] if self.large_file_threshold else ""
+        if policy:
+            pre_triggers.append(
+                rx.vars.base.Var(
+                    constants.FunctionConstants.LARGE_FILE_STATE.format(policy=policy),
+                    _var_data=rx.vars.base.VarData(
+                        imports={"react": ["useMemo"]}, position=rx.constants.Hooks.HookPosition.PRE_TRIGGER
+                    ),
+                )
+            )
 
         # Post-Trigger hooks - mostly `useEffect` functions to dynamically configure editor
 
-        text_change_callback = (
-            f"wrapper.registerTextChangedCallback({rx.vars.LiteralVar.create(self.event_triggers['on_change'])._js_expr})"  # noqa: SLF001
-            if self.event_triggers.get("on_change")
-            else ""
-        )
-        additional = f"{constants.CodeLensProviders.TERRAFORM_RESOURCE_DOCS}"
+        # Streaming editors are read-only, so appended chunks don't fire `on_change`, and diff editors send only
+        # the side that changed (see `watchEditorChanges`).
+        on_change = inputs["on_change"] if not (self.stream or diff) else ""
+        if on_change and policy:
+            # Large files fire `on_change` on save only (see `saveLargeFile`).
+            on_change = (
+                f"(contents) => saveOnlyUris.has(wrapper.getEditor()?.getModel()?.uri.toString()) "
+                f"|| ({on_change})(contents)"
+            )
+        text_change_callback = f"wrapper.registerTextChangedCallback({on_change})" if on_change else ""
+        additional = self._feature_inits(inputs, policy)
+        update_code = self._update_code(inputs, policy)
+        diff_editor = self._diff_editor() if diff else ""
+        original = constants.WrapperConfig.ORIGINAL_RESOURCE.format(filename=inputs["filename"]) if diff else ""
 
         post_triggers = [
             rx.vars.base.Var(
@@ -191,26 +529,89 @@ class MonacoEditorReactComp(rx.Component):
             )
             for post_trigger in (
                 constants.WrapperConfig.BASE.format(
-                    loglevel=self.loglevel,
+                    loglevel=inputs["loglevel"],
                     vscode_api_config=constants.WrapperConfig.VSCODE_API_CONFIG,
                     editor_app_config=constants.WrapperConfig.EDITOR_APP_CONFIG.format(
-                        filename=rx.Var.create(self.filename)
+                        filename=inputs["filename"],
+                        text='largeFile ? "" : codeValue' if policy else "codeValue",
+                        diff_editor=diff_editor,
+                        original=original,
                     ),
-                    language_client_configs=configure_language_clients(self.language_clients),
+                    language_client_configs=configure_language_clients(self.language_clients, save_only=bool(policy)),
                 ),
                 constants.UseEffects.UPDATE_USER_CONFIG,
                 constants.UseEffects.INIT_WRAPPER.format(
                     text_change_callback=text_change_callback, additional=additional
                 ),
-                constants.UseEffects.UPDATE_CODE.format(filename=rx.Var.create(self.filename)),
+                update_code,
             )
         ]
 
-        return [*internal, *pre_triggers, *post_triggers]
+        return (*internal, *pre_triggers, *post_triggers)
 
     def add_custom_code(self) -> list:
         """Returns custom JavaScript code snippets required for the Monaco editor component."""
+        middleware = (
+            [constants.FunctionConstants.CLIENT_MIDDLEWARE]
+            if any(config.middleware for config in self.language_clients)
+            else []
+        )
+        session_token = (
+            [constants.FunctionConstants.SESSION_TOKEN]
+            if any(config.session_resume for config in self.language_clients)
+            else []
+        )
+        shared_worker = (
+            [constants.FunctionConstants.SHARED_WORKER]
+            if any(config.shared_worker for config in self.language_clients)
+            else []
+        )
+        client_configs = (
+            [
+                constants.FunctionConstants.COMMAND_QUEUE,
+                constants.FunctionConstants.LANGUAGE_CLIENT_CONFIGS,
+                client_statics_constant(self.language_clients)[1],
+            ]
+            if self.language_clients
+            else []
+        )
+        large_file = (
+            [constants.FunctionConstants.LARGE_FILE, large_file_constant(self.large_file_threshold)[1]]
+            if self.large_file_threshold
+            else []
+        )
+        stream = [constants.FunctionConstants.STREAM] if self.stream else []
+        model_cache = [constants.FunctionConstants.MODEL_CACHE] if self.model_cache else []
+        workspace_files = [constants.FunctionConstants.WORKSPACE_FILES] if self.workspace_files else []
+        stored_documents = [constants.FunctionConstants.STORED_DOCUMENTS] if self.document_sync else []
+        view_events = (
+            [constants.FunctionConstants.VIEW_EVENTS]
+            if any(self.event_triggers.get(name) for name in VIEW_EVENT_TRIGGERS)
+            else []
+        )
+        diagnostics = [constants.FunctionConstants.DIAGNOSTICS] if self.event_triggers.get("on_diagnostics") else []
+        diff = [constants.FunctionConstants.DIFF] if self.original is not None else []
+        if self.hunks is not None and not isinstance(self.hunks, rx.Var):
+            diff.append(json_constant("diffHunks", self.hunks)[1])
+        deltas = (
+            [constants.FunctionConstants.TEXT_DELTAS]
+            if self.original is not None or self.event_triggers.get("on_delta")
+            else []
+        )
         return [
+            *middleware,
+            *session_token,
+            *shared_worker,
+            *client_configs,
+            *large_file,
+            *stream,
+            *model_cache,
+            *workspace_files,
+            *stored_documents,
+            *view_events,
+            *diagnostics,
+            *diff,
+            *deltas,
             # Wrapper must be created once in the file rather than inside the
             # component function or the universe will explode.
             "const wrapper = new MonacoEditorLanguageClientWrapper();",
@@ -243,9 +644,28 @@ class MonacoEditorReactComp(rx.Component):
             "onCommand",
             "onRestart",
             "onCommandComplete",
+            "largeFileThreshold",
+            "stream",
+            "original",
+            "hunks",
+            "diffConfig",
+            "onDelta",
+            "modelCache",
+            "workspaceFiles",
+            "documentId",
+            "documentSync",
+            "onSearch",
+            "onCommandProgress",
+            "placeholder",
+            "viewEventRate",
+            "onCursorChange",
+            "onSelectionChange",
+            "onScroll",
+            "onDiagnostics",
+            "diagnosticsConfig",
         )
         props = [prop for prop in rendered["props"] if not any(prop.startswith(i) for i in forbidden_props)]
-        return {"name": '"div"', "props": props}
+        return {"name": '"div"', "props": props, "children": rendered.get("children", [])}
 
     # Reference used to pass to the monaco wrapper.
     _ref = rx.Var("setContainer")
@@ -267,9 +687,33 @@ class MonacoEditorReactComp(rx.Component):
     loglevel: Literal["Off", "Trace", "Debug", "Info", "Warning", "Error"] = "Info"
     # The HTML class of the editor window.
     class_name: str = "w-full h-full"
+    # Degrades expensive features, loads in chunks and syncs on save only above the policy's line/byte thresholds.
+    large_file_threshold: LargeFilePolicy | None = None
+    # Read-only append-only mode; chunks are sent with `monaco_editor.append(id, chunk)`. Requires an `id`.
+    stream: StreamConfig | None = None
+    # The original text; setting it turns the editor into a diff editor with `value` as the modified text.
+    original: str | rx.Var[str] | None = None
+    # Precomputed diff hunks (see `compute_hunks`), shown until (or unless) the browser's diff finishes in budget.
+    hunks: list[DiffHunk] | rx.Var[list[DiffHunk]] | None = None
+    # The diff editor options.
+    diff_config: DiffConfig | None = None
+    # Keeps the models and view states of previously opened files (see `ModelCache`).
+    model_cache: ModelCache | None = None
+    # Fetches files under `workspace_folder` from the backend on demand (see `serve_workspace_files`).
+    workspace_files: WorkspaceFiles | None = None
+    # The ID of a document in the backend's document store, loaded and saved instead of `value`. Needs `document_sync`.
+    document_id: str | rx.Var[str] | None = None
+    # How the `document_id` document is loaded and saved (see `serve_documents`).
+    document_sync: DocumentSync | None = None
+    # HTML shown until the editor starts (see `highlight_placeholder`); generated for a literal `value`. "" for none.
+    placeholder: str | rx.Var[str] | None = None
+    # The most `on_cursor_change`, `on_selection_change` and `on_scroll` events sent per second, each.
+    view_event_rate: float = 10
+    # Which diagnostics `on_diagnostics` forwards, and how often (see `DiagnosticsConfig`).
+    diagnostics_config: DiagnosticsConfig | None = None
 
     ###### Configurable Event Handlers ######
-    # Fires on editor code content change. Returns the contant as a TextModel object.
+    # Fires on editor code content change. Returns the contant as a TextModel (DiffTextModel for diff editors) object.
     on_change: rx.EventHandler[rx.event.passthrough_event_spec(TextModel)]
     # Fires when an user-registered editor command executes. Returns the name of the registered command.
     on_command: rx.EventHandler[rx.event.passthrough_event_spec(str)]
@@ -277,15 +721,42 @@ class MonacoEditorReactComp(rx.Component):
     on_restart: rx.EventHandler[rx.event.passthrough_event_spec(str)]
     # Fires when an user-registered editor command finishes. Returns the name of the registered command.
     on_command_complete: rx.EventHandler[rx.event.passthrough_event_spec(str)]
+    # Fires when an user-registered editor command is queued, starts, or finishes. Returns a CommandProgress object.
+    on_command_progress: rx.EventHandler[rx.event.passthrough_event_spec(CommandProgress)]
+    # Fires on editor code content change. Returns the changed side and its changes as a TextDelta object.
+    on_delta: rx.EventHandler[rx.event.passthrough_event_spec(TextDelta)]
+    # Fires on the "Find in Workspace" action (Ctrl/Cmd+Shift+F). Returns the selection or word as a SearchQuery.
+    on_search: rx.EventHandler[rx.event.passthrough_event_spec(SearchQuery)]
+    # Fires when the cursor moves, at most `view_event_rate` times a second. Returns the latest CursorChange.
+    on_cursor_change: rx.EventHandler[rx.event.passthrough_event_spec(CursorChange)]
+    # Fires when the selections change, at most `view_event_rate` times a second. Returns the latest SelectionChange.
+    on_selection_change: rx.EventHandler[rx.event.passthrough_event_spec(SelectionChange)]
+    # Fires when the editor scrolls, at most `view_event_rate` times a second. Returns the latest ScrollChange.
+    on_scroll: rx.EventHandler[rx.event.passthrough_event_spec(ScrollChange)]
+    # Fires when language server diagnostics change. Returns a batch of the changed documents' DocumentDiagnostics.
+    on_diagnostics: rx.EventHandler[rx.event.passthrough_event_spec(list[DocumentDiagnostics])]
 
 
 class Monaco(rx.ComponentNamespace):
     """Namespace for Monaco editor components and configuration."""
 
     __call__ = MonacoEditorReactComp.create
+    snippet = staticmethod(MonacoSnippet.create)
     language_client = LanguageClientConfig
     server_url = LanguageServerUrl
     command = Command
+    middleware = ClientMiddleware
+    large_file_policy = LargeFilePolicy
+    stream_config = StreamConfig
+    diff_config = DiffConfig
+    compute_hunks = staticmethod(compute_hunks)
+    model_cache = ModelCache
+    workspace_files = WorkspaceFiles
+    document_sync = DocumentSync
+    diagnostics_config = DiagnosticsConfig
+    append = staticmethod(append)
+    cancel_command = staticmethod(cancel_command)
+    highlight_placeholder = staticmethod(highlight_placeholder)
 
 
 monaco_editor = Monaco()
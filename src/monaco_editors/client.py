@@ -0,0 +1,315 @@
+"""Headless asyncio language server client for batch validation and formatting.
+
+Runs the same language servers the editor uses (e.g. the downloaded `terraform-ls`) without a browser, so
+many files can be validated and formatted in CI or background jobs.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import os
+import pathlib
+from collections.abc import AsyncIterator, Iterable
+from typing import Any, Self, TypedDict
+
+from reflex.utils import console
+
+from . import jsonrpc
+from .gateway import position_offset
+from .models import Command, LanguageServerSpec
+
+
+class DocumentResult(TypedDict):
+    """The result of validating (and formatting) one document.
+
+    `formatted` is the document text after applying the formatting `edits`, or `None` if formatting was skipped.
+    `error` describes why the document couldn't be validated (e.g. it couldn't be read), or is `None`.
+    """
+
+    uri: str
+    diagnostics: list[dict[str, Any]]
+    edits: list[dict[str, Any]]
+    formatted: str | None
+    error: str | None
+
+
+def apply_edits(text: str, edits: list[dict[str, Any]]) -> str:
+    """Applies LSP `TextEdit`s, whose ranges all refer to the original text.
+
+    The edits are applied in one pass over the text; edits at the same position (e.g. several inserts) keep their
+    order in `edits`, as the LSP specification requires.
+
+    Args:
+        text (str): The original document text.
+        edits (list[dict[str, Any]]): The text edits, e.g. from `textDocument/formatting`.
+
+    Returns:
+        str: The edited document text.
+    """
+    spans = [
+        (position_offset(text, edit["range"]["start"]), position_offset(text, edit["range"]["end"]), edit["newText"])
+        for edit in edits
+    ]
+    spans.sort(key=lambda span: span[0])
+    parts = []
+    offset = 0
+    for start, end, new_text in spans:
+        parts += [text[offset:start], new_text]
+        offset = max(offset, end)
+    parts.append(text[offset:])
+    return "".join(parts)
+
+
+class LanguageServerClient:
+    """Asyncio JSON-RPC client for one stdio language server process.
+
+    Use it as an async context manager to start, initialize and shut down the server.
+
+    Args:
+        spec (LanguageServerSpec): The language server to run.
+        initialization_options (dict[str, Any] | None): The language-specific `initializationOptions`.
+        timeout (float): Seconds to wait for a response.
+        diagnostics_timeout (float): Seconds to wait for a document's diagnostics. Servers may publish nothing for a
+            clean document, so when this expires the document is taken to have no diagnostics.
+    """
+
+    def __init__(
+        self,
+        spec: LanguageServerSpec,
+        initialization_options: dict[str, Any] | None = None,
+        timeout: float = 30.0,
+        diagnostics_timeout: float = 2.0,
+    ) -> None:
+        self.spec = spec
+        self.initialization_options = initialization_options or {}
+        self.timeout = timeout
+        self.diagnostics_timeout = diagnostics_timeout
+        self.capabilities: dict[str, Any] = {}
+        self._process: asyncio.subprocess.Process | None = None
+        self._reader: asyncio.Task | None = None
+        self._ids = itertools.count()
+        self._responses: dict[int, asyncio.Future] = {}
+        self._diagnostics: dict[str, list[dict[str, Any]]] = {}
+        self._published: dict[str, asyncio.Event] = {}
+
+    async def __aenter__(self) -> Self:
+        """Starts and initializes the language server."""
+        command = await asyncio.to_thread(self.spec.resolve_command)
+        self._process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=self.spec.cwd,
+        )
+        self._reader = asyncio.create_task(self._read())
+        root = (pathlib.Path(self.spec.cwd) if self.spec.cwd else pathlib.Path.cwd()).resolve().as_uri()
+        result = await self.request(
+            "initialize",
+            {
+                "processId": os.getpid(),
+                "rootUri": root,
+                "workspaceFolders": [{"uri": root, "name": "workspace"}],
+                "capabilities": {"textDocument": {"publishDiagnostics": {}, "formatting": {}}},
+                "initializationOptions": self.initialization_options,
+            },
+        )
+        self.capabilities = result.get("capabilities", {})
+        self.notify("initialized", {})
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        """Shuts down the language server."""
+        if self._process is None:
+            return
+        with contextlib.suppress(TimeoutError, RuntimeError, OSError):
+            await self.request("shutdown")
+            self.notify("exit")
+            await asyncio.wait_for(self._process.wait(), timeout=5)
+        if self._process.returncode is None:
+            self._process.kill()
+        if self._reader:
+            self._reader.cancel()
+
+    def notify(self, method: str, params: dict[str, Any] | None = None) -> None:
+        """Sends a notification to the language server."""
+        self._send({"jsonrpc": "2.0", "method": method, "params": params or {}})
+
+    async def request(self, method: str, params: dict[str, Any] | None = None) -> Any:  # noqa: ANN401
+        """Sends a request and waits for its result.
+
+        Args:
+            method (str): The LSP method.
+            params (dict[str, Any] | None): The request parameters.
+
+        Returns:
+            Any: The result of the request.
+
+        Raises:
+            RuntimeError: If the language server answers with an error.
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._responses[request_id] = future
+        self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+        try:
+            response = await asyncio.wait_for(future, timeout=self.timeout)
+        finally:
+            self._responses.pop(request_id, None)
+        if "error" in response:
+            msg = f"{method} failed: {response['error'].get('message')}"
+            raise RuntimeError(msg)
+        return response.get("result")
+
+    async def execute(self, command: Command) -> Any:  # noqa: ANN401
+        """Runs a registered editor `Command` (e.g. `terraform-ls.terraform.validate`) against the server."""
+        if command.type == "notification":
+            self.notify(command.method, command.params)
+            return None
+        return await self.request(command.method, command.params)
+
+    async def validate(
+        self, uri: str, text: str, language_id: str, *, format_document: bool = True, settle: float = 0.0
+    ) -> DocumentResult:
+        """Opens a document, collects its diagnostics and formatting edits, and closes it.
+
+        Args:
+            uri (str): The document URI.
+            text (str): The document text.
+            language_id (str): The document's language ID.
+            format_document (bool): Whether to request formatting edits.
+            settle (float): Seconds to keep collecting diagnostic updates after the first publish.
+
+        Returns:
+            DocumentResult: The diagnostics and formatting edits of the document.
+        """
+        published = self._published[uri] = asyncio.Event()
+        self.notify(
+            "textDocument/didOpen",
+            {"textDocument": {"uri": uri, "languageId": language_id, "version": 1, "text": text}},
+        )
+        edits: list[dict[str, Any]] = []
+        try:
+            if format_document and self.capabilities.get("documentFormattingProvider"):
+                edits = (
+                    await self.request(
+                        "textDocument/formatting",
+                        {"textDocument": {"uri": uri}, "options": {"tabSize": 2, "insertSpaces": True}},
+                    )
+                    or []
+                )
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(published.wait(), timeout=self.diagnostics_timeout)
+            if settle:
+                await asyncio.sleep(settle)
+        finally:
+            self._published.pop(uri, None)
+            self.notify("textDocument/didClose", {"textDocument": {"uri": uri}})
+        return DocumentResult(
+            uri=uri,
+            diagnostics=self._diagnostics.pop(uri, []),
+            edits=edits,
+            formatted=apply_edits(text, edits) if format_document else None,
+            error=None,
+        )
+
+    def _send(self, message: dict[str, Any]) -> None:
+        if self._process is None or self._process.stdin is None or self._process.stdin.is_closing():
+            msg = "Language server is not running"
+            raise RuntimeError(msg)
+        self._process.stdin.write(jsonrpc.encode_message(message))
+
+    async def _read(self) -> None:
+        while (message := await jsonrpc.read_message(self._process.stdout)) is not None:
+            if jsonrpc.is_response(message):
+                future = self._responses.get(message["id"])
+                if future and not future.done():
+                    future.set_result(message)
+            elif jsonrpc.is_request(message):
+                # Answer server requests the way a client without those features would.
+                items = (message.get("params") or {}).get("items")
+                result = [None] * len(items) if message["method"] == "workspace/configuration" and items else None
+                self._send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+            elif message.get("method") == "textDocument/publishDiagnostics":
+                params = message["params"]
+                if (published := self._published.get(params["uri"])) is not None:
+                    self._diagnostics[params["uri"]] = params["diagnostics"]
+                    published.set()
+        for future in self._responses.values():
+            if not future.done():
+                future.set_result(jsonrpc.error_response(-1, -1, "Language server exited"))
+
+
+async def validate_files(  # noqa: PLR0913
+    paths: Iterable[str | os.PathLike],
+    spec: LanguageServerSpec,
+    language_id: str | None = None,
+    pool_size: int | None = None,
+    concurrency: int = 8,
+    *,
+    format_documents: bool = True,
+    diagnostics_timeout: float = 2.0,
+) -> AsyncIterator[DocumentResult]:
+    """Validates (and formats) many files across a pool of language server processes.
+
+    Results are yielded as soon as each document is done, in completion order. A document that fails (e.g. it can't
+    be read or its server exited) gets a result with its `error` set, without stopping the others.
+
+    Args:
+        paths (Iterable[str | os.PathLike]): The files to validate.
+        spec (LanguageServerSpec): The language server to run, e.g. `terraform_language_server()`.
+        language_id (str | None): The documents' language ID. Defaults to the spec's.
+        pool_size (int | None): Number of server processes. Defaults to the spec's `pool_size` or the core count.
+        concurrency (int): Documents open at once per server process.
+        format_documents (bool): Whether to request formatting edits.
+        diagnostics_timeout (float): Seconds to wait for each document's diagnostics before taking it as clean.
+
+    Yields:
+        DocumentResult: The result of each document.
+    """
+    paths = [pathlib.Path(path).resolve() for path in paths]
+    size = min(len(paths), pool_size or spec.pool_size or os.cpu_count() or 1)
+    if not size:
+        return
+    results: asyncio.Queue[DocumentResult | None] = asyncio.Queue()
+    queue: asyncio.Queue[pathlib.Path] = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+
+    async def work(client: LanguageServerClient) -> None:
+        while not queue.empty():
+            path = queue.get_nowait()
+            try:
+                text = await asyncio.to_thread(path.read_text)
+                result = await client.validate(
+                    path.as_uri(), text, language_id or spec.language_id, format_document=format_documents
+                )
+            except (OSError, UnicodeDecodeError, RuntimeError, TimeoutError) as error:
+                message = str(error) or type(error).__name__
+                result = DocumentResult(uri=path.as_uri(), diagnostics=[], edits=[], formatted=None, error=message)
+            await results.put(result)
+
+    async def serve() -> None:
+        async with contextlib.AsyncExitStack() as stack:
+            clients = await asyncio.gather(
+                *(
+                    stack.enter_async_context(LanguageServerClient(spec, diagnostics_timeout=diagnostics_timeout))
+                    for _ in range(size)
+                )
+            )
+            try:
+                await asyncio.gather(*(work(client) for client in clients for _ in range(concurrency)))
+            finally:
+                await results.put(None)
+
+    task = asyncio.create_task(serve())
+    try:
+        while (result := await results.get()) is not None:
+            yield result
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+            console.debug("Cancelled batch validation")
+
+
+__all__ = ("DocumentResult", "LanguageServerClient", "apply_edits", "validate_files")
@@ -4,8 +4,12 @@ This module provides configuration classes and Vite plugin definitions
 to enable Monaco Editor with VSCode language extensions and services.
 """
 
+import json
+
 from vite_config_plugin import RawJS, ViteConfig
 
+from .constants import ServiceWorker
+
 
 class MonacoEditorsReflexConfig:
     """A Reflex plugin for integrating Monaco Editor with VSCode extensions.
@@ -32,12 +36,27 @@ class MonacoEditorsReflexConfig:
         ]
 
     @classmethod
-    def get_vite_config(cls) -> ViteConfig:
+    def get_vite_config(cls, *, service_worker: bool = False) -> ViteConfig:
         """Return the Vite configuration for integrating Monaco Editor with VSCode extensions.
 
+        Args:
+            service_worker: Emit a service worker (`monaco-editors-sw.js`) in production builds, which precaches the
+                content-hashed editor bundles and workers in a cache versioned by their file names, and serves the
+                extensions served by Reflex (e.g. `hashicorp-terraform.vsix`) stale-while-revalidate, so repeat
+                visits start the editor from the browser's cache.
+
         Returns:
             The configuration dictionary for Vite.
         """
+        plugins = [RawJS("vsixPlugin()")]
+        if service_worker:
+            plugins.append(
+                RawJS(
+                    ServiceWorker.VITE_PLUGIN.format(
+                        file_name=json.dumps(ServiceWorker.FILE_NAME), script=json.dumps(ServiceWorker.SCRIPT)
+                    )
+                )
+            )
         return {
             "worker": {"format": "es"},
             "optimizeDeps": {
@@ -68,5 +87,5 @@ class MonacoEditorsReflexConfig:
                     "plugins": [RawJS("importMetaUrlPlugin")],
                 },
             },
-            "plugins": [RawJS("vsixPlugin()")],
+            "plugins": plugins,
         }
@@ -58,6 +58,8 @@ class FunctionConstants(SimpleNamespace):
     CONTAINER_REF: Final = "const [container, setContainer] = useState(null);"
     WORKSPACE: Final = "const workspace = `${{{workspace_folder}}}`;"
     CODE_VALUE: Final = "const codeValue = `${{{value}}}`;"
+    ORIGINAL_VALUE: Final = "const originalValue = `${{{original}}}`;"
+    PRECOMPUTED_HUNKS: Final = "const precomputedHunks = {hunks};"
     GET_PROVIDERS: Final = """const getProviders = async () => {
         const client = wrapper.getLanguageClient("terraform");
         const _providers = await client.sendRequest("workspace/executeCommand", {
@@ -78,39 +80,1020 @@ class FunctionConstants(SimpleNamespace):
         return providerMap || undefined
     };
     """
+    CLIENT_MIDDLEWARE: Final = """const createClientMiddleware = ({cancelSuperseded, cacheResults}) => {
+        const inFlight = new Map();
+        const results = new Map();
+        const cached = (id, document, key) => {
+            const entry = results.get(id);
+            if (entry && entry.version === document.version && entry.values.has(key)) {
+                return entry.values.get(key);
+            }
+            return undefined;
+        };
+        const store = (id, document, key, value) => {
+            let entry = results.get(id);
+            if (!entry || entry.version !== document.version) {
+                entry = {version: document.version, values: new Map()};
+                results.set(id, entry);
+            }
+            entry.values.set(key, value);
+        };
+        const run = async (method, document, key, token, next) => {
+            const id = `${method}:${document.uri.toString()}`;
+            const cacheable = cacheResults.includes(method);
+            if (cacheable) {
+                const hit = cached(id, document, key);
+                if (hit !== undefined) {
+                    return hit;
+                }
+            }
+            let source = undefined;
+            let forward = undefined;
+            if (cancelSuperseded.includes(method)) {
+                // Cancelling the token handed to `next` makes the client send `$/cancelRequest`.
+                inFlight.get(id)?.cancel();
+                source = new vscode.CancellationTokenSource();
+                forward = token.onCancellationRequested(() => source.cancel());
+                inFlight.set(id, source);
+                token = source.token;
+            }
+            try {
+                const result = await next(token);
+                if (cacheable && !token.isCancellationRequested) {
+                    store(id, document, key, result);
+                }
+                return result;
+            } finally {
+                if (source) {
+                    forward.dispose();
+                    if (inFlight.get(id) === source) {
+                        inFlight.delete(id);
+                    }
+                    source.dispose();
+                }
+            }
+        };
+        const position = (pos) => `${pos.line}:${pos.character}`;
+        return {
+            provideCompletionItem: (document, pos, context, token, next) => run(
+                "textDocument/completion", document, position(pos), token, (t) => next(document, pos, context, t)
+            ),
+            provideHover: (document, pos, token, next) => run(
+                "textDocument/hover", document, position(pos), token, (t) => next(document, pos, t)
+            ),
+            provideSignatureHelp: (document, pos, context, token, next) => run(
+                "textDocument/signatureHelp", document, position(pos), token, (t) => next(document, pos, context, t)
+            ),
+            provideCodeLenses: (document, token, next) => run(
+                "textDocument/codeLens", document, "", token, (t) => next(document, t)
+            ),
+            provideDocumentLinks: (document, token, next) => run(
+                "textDocument/documentLink", document, "", token, (t) => next(document, t)
+            ),
+            didClose: (document, next) => {
+                for (const id of results.keys()) {
+                    if (id.endsWith(`:${document.uri.toString()}`)) {
+                        results.delete(id);
+                    }
+                }
+                return next(document);
+            },
+        };
+    };
+    """
+    SESSION_TOKEN: Final = """const lspSessionToken = (language) => {
+        // Per-tab token that survives reloads, so the gateway can resume this tab's language server session.
+        const key = `reflex-monaco-lsp-session:${language}`;
+        let token = sessionStorage.getItem(key);
+        if (!token) {
+            token = crypto.randomUUID();
+            sessionStorage.setItem(key, token);
+        }
+        return token;
+    };
+    """  # noqa: S105
+    RESTART_OPTIONS: Final = {"retries": 10, "timeout": 1000, "keepWorker": True}
+    SHARED_WORKER: Final = """const sharedLanguageClientWorkers = new Map();
+    const sharedWorkerConnection = (workerUrl, connect, onOpen) => {
+        // Opened lazily: the wrapper config is rebuilt on every render, but only read when the client starts.
+        let connection;
+        const open = () => {
+            if (!connection) {
+                let worker = sharedLanguageClientWorkers.get(workerUrl);
+                if (!worker) {
+                    worker = new SharedWorker(workerUrl, {name: "monaco-editors-language-clients"});
+                    sharedLanguageClientWorkers.set(workerUrl, worker);
+                }
+                const channel = new MessageChannel();
+                // Held until the connection is disposed (or the tab is gone), which the worker waits for.
+                const lock = `monaco-editors-lsp:${crypto.randomUUID()}`;
+                let release;
+                const held = new Promise((resolve) => {
+                    release = resolve;
+                });
+                navigator.locks.request(lock, () => {
+                    worker.port.postMessage({connect: {...connect, lock}}, [channel.port2]);
+                    return held;
+                });
+                const terminate = () => {
+                    channel.port1.close();
+                    release();
+                    connection = undefined;
+                };
+                connection = {
+                    port: channel.port1,
+                    worker: Object.assign(new EventTarget(), {
+                        postMessage: (message) => channel.port1.postMessage(message),
+                        terminate,
+                    }),
+                };
+                onOpen?.();
+            }
+            return connection;
+        };
+        return {
+            $type: "WorkerDirect",
+            get worker() {
+                return open().worker;
+            },
+            get messagePort() {
+                return open().port;
+            },
+        };
+    };
+    """
+    LANGUAGE_CLIENT_CONFIGS: Final = """const buildLanguageClientConfigs = (
+        clients, workspace, registerCommands, reactive, saveOnlyUris
+    ) => ({
+        // `clients` holds the static configs emitted as a module-level constant; only `workspace` and the
+        // state-bound `reactive` values come from the component body. Changes to documents in `saveOnlyUris`
+        // (large files) are not synced; `syncLargeFile` sends their full text on save instead.
+        configs: Object.fromEntries(Object.entries(clients).map(([language, client]) => {
+            const {registerCommands: commands, initializationOptions} = reactive[language] ?? {};
+            // Browsers without SharedWorker (e.g. Chrome on Android) connect directly.
+            const shared = client.sharedWorker && typeof SharedWorker !== "undefined";
+            const query = [];
+            if (client.sessionResume && !shared) {
+                query.push(`session=${lspSessionToken(language)}`);
+            }
+            if (client.workspaceRouting) {
+                query.push(`workspace=${encodeURIComponent(workspace)}`);
+            }
+            const url = query.length ? `${client.url}?${query.join("&")}` : client.url;
+            const onCall = commands ? () => registerCommands(language, commands) : undefined;
+            const options = shared
+                ? sharedWorkerConnection(client.sharedWorker, {url, sessionResume: client.sessionResume}, onCall)
+                : {$type: "WebSocketUrl", url};
+            if (onCall && !shared) {
+                options.startOptions = {onCall};
+            }
+            const config = {
+                name: client.name,
+                connection: {options},
+                clientOptions: {
+                    documentSelector: client.documentSelector,
+                    workspaceFolder: {
+                        index: 0,
+                        name: "workspace",
+                        uri: vscode.Uri.parse(`${workspace}`),
+                    },
+                    initializationOptions: initializationOptions ?? {},
+                },
+            };
+            if (client.middleware) {
+                config.clientOptions.middleware = createClientMiddleware(client.middleware);
+            }
+            if (saveOnlyUris) {
+                config.clientOptions.middleware = {
+                    ...config.clientOptions.middleware,
+                    didChange: (event, next) => (
+                        saveOnlyUris.has(event.document.uri.toString()) ? Promise.resolve() : next(event)
+                    ),
+                };
+            }
+            if (client.restartOptions && !shared) {
+                config.restartOptions = client.restartOptions;
+            }
+            return [language, config];
+        })),
+    });
+    """
+    LARGE_FILE: Final = """const saveOnlyUris = new Set();
+    const largeFileLoads = new WeakMap();
+    const largeFileOptions = new WeakMap();
+    const isLargeFile = (text, policy) => {
+        // UTF-8 never takes fewer bytes than UTF-16 code units, so only mid-sized text needs encoding.
+        if (text.length > policy.maxBytes) {
+            return true;
+        }
+        if (text.length * 3 > policy.maxBytes && new TextEncoder().encode(text).length > policy.maxBytes) {
+            return true;
+        }
+        let lines = 1;
+        for (let index = text.indexOf("\\n"); index !== -1; index = text.indexOf("\\n", index + 1)) {
+            if (++lines > policy.maxLines) {
+                return true;
+            }
+        }
+        return false;
+    };
+    const syncLargeFile = async (model, configs) => {
+        // Full-text sync for documents whose `didChange` notifications are skipped by the client middleware.
+        const textDocument = {uri: model.uri.toString(), version: model.getVersionId()};
+        const text = model.getValue();
+        for (const [language, config] of Object.entries(configs ?? {})) {
+            const client = wrapper.getLanguageClient(language);
+            const selector = config.clientOptions.documentSelector;
+            if (client?.isRunning() && selector.some((entry) => (entry.language ?? entry) === model.getLanguageId())) {
+                await client.sendNotification("textDocument/didChange", {textDocument, contentChanges: [{text}]});
+                await client.sendNotification("textDocument/didSave", {textDocument: {uri: textDocument.uri}});
+            }
+        }
+    };
+    const saveLargeFile = async (editor, configs, onChange) => {
+        const model = editor.getModel();
+        if (model && saveOnlyUris.has(model.uri.toString())) {
+            await syncLargeFile(model, configs);
+            onChange?.({modified: model.getValue()});
+        }
+    };
+    const loadLargeFile = async (editor, text, policy, large, configs) => {
+        const model = editor.getModel();
+        const uri = model.uri.toString();
+        const container = editor.getContainerDomNode();
+        const load = (largeFileLoads.get(model) ?? 0) + 1;
+        largeFileLoads.set(model, load);
+        if (!large) {
+            if (saveOnlyUris.has(uri)) {
+                model.setValue(text);
+                await syncLargeFile(model, configs);
+                saveOnlyUris.delete(uri);
+                editor.updateOptions(largeFileOptions.get(editor) ?? {});
+                delete container.dataset.largeFile;
+            }
+            return;
+        }
+        if (!saveOnlyUris.has(uri)) {
+            const options = editor.getRawOptions();
+            largeFileOptions.set(
+                editor, Object.fromEntries(Object.keys(policy.editorOptions).map((key) => [key, options[key]]))
+            );
+            saveOnlyUris.add(uri);
+            editor.updateOptions(policy.editorOptions);
+        }
+        container.dataset.largeFile = "loading";
+        performance.mark("monaco-editors:large-file-load");
+        model.setValue("");
+        for (let start = 0; start < text.length;) {
+            let end = Math.min(start + policy.chunkSize, text.length);
+            if (end < text.length) {
+                // Split at a line end so CRLFs and surrogate pairs are never cut in half.
+                const newline = text.lastIndexOf("\\n", end - 1);
+                end = newline >= start ? newline + 1 : end - (/[\\uD800-\\uDBFF]/.test(text[end - 1]) ? 1 : 0);
+            }
+            const line = model.getLineCount();
+            const column = model.getLineMaxColumn(line);
+            model.applyEdits([{
+                range: {startLineNumber: line, startColumn: column, endLineNumber: line, endColumn: column},
+                text: text.slice(start, end),
+            }]);
+            start = end;
+            // Yield to the event loop between chunks so the tab stays responsive.
+            await new Promise((resolve) => setTimeout(resolve));
+            if (model.isDisposed() || largeFileLoads.get(model) !== load) {
+                return;
+            }
+        }
+        container.dataset.largeFile = "true";
+        performance.measure("monaco-editors:large-file-load", "monaco-editors:large-file-load");
+    };
+    """
+    LARGE_FILE_STATE: Final = "const largeFile = useMemo(() => isLargeFile(codeValue, {policy}), [codeValue]);"
+    LARGE_FILE_INIT: Final = """editor.addAction({{
+        id: "monaco-editors.saveLargeFile",
+        label: "Sync Large File",
+        // KeyMod.CtrlCmd | KeyCode.KeyS
+        keybindings: [2048 | 49],
+        run: () => saveLargeFile(editor, wrapperConfig.languageClientConfigs?.configs, {on_change}),
+    }});
+    if (largeFile) {{
+        await loadLargeFile(editor, codeValue, {policy}, true, wrapperConfig.languageClientConfigs?.configs);
+    }}
+    """
+    STREAM: Final = """const monacoEditorStreams = (globalThis.monacoEditorStreams ??= new Map());
+    const monacoEditorStream = (id) => {
+        // Chunks are buffered until the editor is started, and coalesced into one tail edit per animation frame.
+        let stream = monacoEditorStreams.get(id);
+        if (!stream) {
+            stream = {editor: undefined, config: undefined, pending: [], frame: undefined};
+            stream.flush = () => {
+                stream.frame = undefined;
+                const editor = stream.editor;
+                const model = editor?.getModel();
+                if (!model || !stream.pending.length) {
+                    return;
+                }
+                const text = stream.pending.join("");
+                stream.pending = [];
+                const lines = model.getLineCount();
+                const visible = editor.getVisibleRanges();
+                const following = stream.config.autoScroll && (
+                    !visible.length || visible[visible.length - 1].endLineNumber >= lines
+                );
+                const column = model.getLineMaxColumn(lines);
+                model.applyEdits([{
+                    range: {startLineNumber: lines, startColumn: column, endLineNumber: lines, endColumn: column},
+                    text,
+                }]);
+                const excess = model.getLineCount() - stream.config.maxLines;
+                if (excess > 0) {
+                    model.applyEdits([{
+                        range: {startLineNumber: 1, startColumn: 1, endLineNumber: excess + 1, endColumn: 1},
+                        text: "",
+                    }]);
+                }
+                if (following) {
+                    editor.revealLine(model.getLineCount());
+                }
+            };
+            stream.append = (chunk) => {
+                stream.pending.push(chunk);
+                stream.frame ??= requestAnimationFrame(stream.flush);
+            };
+            monacoEditorStreams.set(id, stream);
+        }
+        return stream;
+    };
+    globalThis.monacoEditorStream = monacoEditorStream;
+    """
+    STREAM_INIT: Final = """const stream = monacoEditorStream({id});
+    stream.editor = editor;
+    stream.config = {config};
+    editor.updateOptions({{readOnly: true}});
+    stream.flush();
+    """
+    DIFF: Final = """const diffHunkDecorations = new WeakMap();
+    const showDiffHunks = (diffEditor, hunks) => {
+        // Precomputed hunks highlight the diff as soon as it opens; the worker's diff replaces them if it
+        // finishes within `maxComputationTime`.
+        const state = diffHunkDecorations.get(diffEditor) ?? {hunks: [], collections: []};
+        state.collections.forEach((collection) => collection.clear());
+        state.hunks = hunks ?? [];
+        const lines = (start, end, className) => (start > 0 && end >= start ? [{
+            range: {startLineNumber: start, startColumn: 1, endLineNumber: end, endColumn: 1},
+            options: {isWholeLine: true, className},
+        }] : []);
+        state.collections = state.hunks.length ? [
+            diffEditor.getOriginalEditor().createDecorationsCollection(state.hunks.flatMap(
+                (hunk) => lines(hunk.originalStartLineNumber, hunk.originalEndLineNumber, "line-delete")
+            )),
+            diffEditor.getModifiedEditor().createDecorationsCollection(state.hunks.flatMap(
+                (hunk) => lines(hunk.modifiedStartLineNumber, hunk.modifiedEndLineNumber, "line-insert")
+            )),
+        ] : [];
+        diffHunkDecorations.set(diffEditor, state);
+    };
+    const watchDiffEditor = (diffEditor) => {
+        diffEditor.onDidUpdateDiff(() => {
+            const result = diffEditor.getDiffComputationResult?.();
+            if (result && !result.quitEarly) {
+                diffHunkDecorations.get(diffEditor)?.collections.forEach((collection) => collection.clear());
+            }
+        });
+    };
+    """
+    TEXT_DELTAS: Final = """const watchEditorChanges = (editors, onChange, onDelta) => {
+        // Sends only the side that changed, and its changes as LSP-style (0-based) ranges.
+        for (const [side, editor] of editors) {
+            editor.onDidChangeModelContent((event) => {
+                onChange?.({[side]: editor.getModel().getValue()});
+                onDelta?.({side, version: event.versionId, changes: event.changes.map((change) => ({
+                    range: {
+                        start: {line: change.range.startLineNumber - 1, character: change.range.startColumn - 1},
+                        end: {line: change.range.endLineNumber - 1, character: change.range.endColumn - 1},
+                    },
+                    text: change.text,
+                }))});
+            });
+        }
+    };
+    """
+    VIEW_EVENTS: Final = """const coalesceViewEvent = (send, rate) => {
+        // Keeps only the latest event, sent on the next animation frame and at most `rate` times a second. Events
+        // are passed as functions, so the payload is only built for the ones sent.
+        const interval = 1000 / rate;
+        let latest;
+        let scheduled = false;
+        let last = -Infinity;
+        const flush = () => {
+            const wait = last + interval - performance.now();
+            if (wait > 0) {
+                setTimeout(() => requestAnimationFrame(flush), wait);
+                return;
+            }
+            last = performance.now();
+            scheduled = false;
+            send(latest());
+        };
+        return (event) => {
+            latest = event;
+            if (!scheduled) {
+                scheduled = true;
+                requestAnimationFrame(flush);
+            }
+        };
+    };
+    const lspRange = (range) => ({
+        start: {line: range.startLineNumber - 1, character: range.startColumn - 1},
+        end: {line: range.endLineNumber - 1, character: range.endColumn - 1},
+    });
+    const watchViewEvents = (editor, {onCursorChange, onSelectionChange, onScroll}, rate) => {
+        const uri = () => editor.getModel()?.uri.toString() ?? "";
+        if (onCursorChange) {
+            const emit = coalesceViewEvent(onCursorChange, rate);
+            editor.onDidChangeCursorPosition(({position, source}) => emit(() => ({
+                uri: uri(),
+                position: {line: position.lineNumber - 1, character: position.column - 1},
+                source,
+            })));
+        }
+        if (onSelectionChange) {
+            const emit = coalesceViewEvent(onSelectionChange, rate);
+            editor.onDidChangeCursorSelection(({selection, secondarySelections, source}) => emit(() => ({
+                uri: uri(),
+                selections: [selection, ...secondarySelections].map(lspRange),
+                source,
+            })));
+        }
+        if (onScroll) {
+            const emit = coalesceViewEvent(onScroll, rate);
+            editor.onDidScrollChange((event) => {
+                if (event.scrollTopChanged || event.scrollLeftChanged) {
+                    emit(() => ({
+                        uri: uri(),
+                        scrollTop: editor.getScrollTop(),
+                        scrollLeft: editor.getScrollLeft(),
+                        visibleRanges: editor.getVisibleRanges().map(lspRange),
+                    }));
+                }
+            });
+        }
+    };
+    """
+    VIEW_EVENTS_INIT: Final = """watchViewEvents(editor, {{
+        onCursorChange: {on_cursor_change}, onSelectionChange: {on_selection_change}, onScroll: {on_scroll},
+    }}, {rate});
+    """
+    DIAGNOSTICS: Final = """const diagnosticSeverities = ["error", "warning", "information", "hint"];
+    const diagnosticsHash = (text) => {
+        // 32-bit FNV-1a.
+        let hash = 0x811c9dc5;
+        for (let i = 0; i < text.length; i++) {
+            hash = Math.imul(hash ^ text.charCodeAt(i), 0x01000193);
+        }
+        return (hash >>> 0).toString(16).padStart(8, "0");
+    };
+    const watchDiagnostics = (onDiagnostics, {minSeverity, maxRate}) => {
+        // Changed documents are sent in one batch at most `maxRate` times a second, and only when the hash of their
+        // filtered diagnostics differs from the last one sent for them.
+        const maxLevel = diagnosticSeverities.indexOf(minSeverity);
+        const cleared = diagnosticsHash("[]");
+        const sent = new Map();
+        const changed = new Set();
+        let timer;
+        let last = -Infinity;
+        const flush = () => {
+            timer = undefined;
+            last = performance.now();
+            const batch = [];
+            for (const uri of changed) {
+                const diagnostics = vscode.languages.getDiagnostics(vscode.Uri.parse(uri))
+                    .filter((diagnostic) => diagnostic.severity <= maxLevel)
+                    .map(({range, severity, message, source, code}) => ({
+                        range: {
+                            start: {line: range.start.line, character: range.start.character},
+                            end: {line: range.end.line, character: range.end.character},
+                        },
+                        severity: diagnosticSeverities[severity],
+                        message,
+                        ...(source ? {source} : {}),
+                        ...(code !== undefined ? {code: String(code?.value ?? code)} : {}),
+                    }))
+                    .sort((a, b) => a.range.start.line - b.range.start.line
+                        || a.range.start.character - b.range.start.character
+                        || a.message.localeCompare(b.message));
+                const hash = diagnosticsHash(JSON.stringify(diagnostics));
+                if ((sent.get(uri) ?? cleared) !== hash) {
+                    batch.push({uri, hash, diagnostics});
+                }
+                if (hash === cleared) {
+                    sent.delete(uri);
+                } else {
+                    sent.set(uri, hash);
+                }
+            }
+            changed.clear();
+            if (batch.length) {
+                onDiagnostics(batch);
+            }
+        };
+        return vscode.languages.onDidChangeDiagnostics(({uris}) => {
+            uris.forEach((uri) => changed.add(uri.toString()));
+            timer ??= setTimeout(flush, Math.max(0, last + 1000 / maxRate - performance.now()));
+        });
+    };
+    """
+    DIAGNOSTICS_INIT: Final = "watchDiagnostics({on_diagnostics}, {config});\n"
+    DIFF_INIT: Final = """const diffEditor = wrapper.getDiffEditor();
+    watchDiffEditor(diffEditor);
+    showDiffHunks(diffEditor, precomputedHunks);
+    watchEditorChanges(
+        [["original", diffEditor.getOriginalEditor()], ["modified", diffEditor.getModifiedEditor()]],
+        {on_change},
+        {on_delta},
+    );
+    """
+    DELTA_INIT: Final = """watchEditorChanges([["modified", editor]], undefined, {on_delta});
+    """
+    MODEL_CACHE: Final = """const modelCaches = new WeakMap();
+    const openCachedModel = async (uri, text, limits) => {
+        // Holds a reference to each visited model, so the wrapper switching files doesn't close it.
+        const editor = wrapper.getEditor();
+        const cache = modelCaches.get(editor) ?? new Map();
+        modelCaches.set(editor, cache);
+        const touch = async (resource) => {
+            const key = resource.toString();
+            const entry = cache.get(key) ?? {ref: await createModelReference(resource), viewState: undefined};
+            cache.delete(key);
+            cache.set(key, entry);
+            return entry;
+        };
+        const current = editor.getModel();
+        const target = vscode.Uri.parse(uri);
+        if (current && current.uri.toString() !== target.toString()) {
+            (await touch(current.uri)).viewState = editor.saveViewState();
+        }
+        await wrapper.updateCodeResources({modified: {text, uri}});
+        const entry = await touch(target);
+        if (entry.viewState && current?.uri.toString() !== target.toString()) {
+            editor.restoreViewState(entry.viewState);
+        }
+        const size = () => [...cache.values()].reduce(
+            (total, {ref}) => total + ref.object.textEditorModel.getValueLength(), 0
+        );
+        for (const [key, {ref}] of cache) {
+            if (cache.size <= limits.maxModels && size() <= limits.maxBytes) {
+                break;
+            }
+            if (key !== target.toString()) {
+                // Releasing the last reference disposes the model, which sends `didClose`.
+                cache.delete(key);
+                ref.dispose();
+            }
+        }
+    };
+    """
+    WORKSPACE_FILES: Final = """const workspaceFileSystems = new Map();
+    const registerWorkspaceFiles = (workspace, config) => {
+        // One read-only overlay per workspace and backend, shared by every editor on the page. Paths outside the
+        // workspace are "not found", so the next file system provider answers them.
+        const root = vscode.Uri.parse(workspace).path.replace(/\\/+$/, "");
+        const key = `${config.url} ${root}`;
+        if (workspaceFileSystems.has(key)) {
+            return;
+        }
+        const notFound = (resource) => FileSystemProviderError.create(
+            `${resource} not found`, FileSystemProviderErrorCode.FileNotFound
+        );
+        const served = (uri) => uri.scheme === "file" && (uri.path === root || uri.path.startsWith(`${root}/`));
+        const request = async (endpoint, params, headers = {}) => {
+            const response = await fetch(`${config.url}/${endpoint}?${new URLSearchParams(params)}`, {headers});
+            if (response.status === 404) {
+                throw notFound(params.path);
+            }
+            if (!response.ok && response.status !== 304) {
+                throw FileSystemProviderError.create(
+                    `${endpoint} ${params.path}: ${response.status}`, FileSystemProviderErrorCode.Unknown
+                );
+            }
+            return response;
+        };
+        // Metadata by path, trusted for `statTtl` ms, and file contents by path, least recently used first.
+        const stats = new Map();
+        const files = new Map();
+        const remember = (path, entry) => stats.set(path, {...entry, checked: Date.now()});
+        const fresh = (entry) => entry !== undefined && Date.now() - entry.checked < config.statTtl;
+        const toStat = ({type, mtime, size}) => ({
+            type: type === "directory" ? FileType.Directory : FileType.File, ctime: mtime, mtime, size,
+        });
+        const readOnly = async (uri) => {
+            throw served(uri) ? FileSystemProviderError.create(
+                `${uri.path} is read-only`, FileSystemProviderErrorCode.NoPermissions
+            ) : notFound(uri.path);
+        };
+        const provider = {
+            capabilities: FileSystemProviderCapabilities.FileReadWrite
+                | FileSystemProviderCapabilities.PathCaseSensitive,
+            onDidChangeCapabilities: new vscode.EventEmitter().event,
+            onDidChangeFile: new vscode.EventEmitter().event,
+            watch: () => ({dispose: () => {}}),
+            stat: async (uri) => {
+                if (!served(uri)) {
+                    throw notFound(uri.path);
+                }
+                if (!fresh(stats.get(uri.path))) {
+                    remember(uri.path, await (await request("stat", {path: uri.path})).json());
+                }
+                return toStat(stats.get(uri.path));
+            },
+            readdir: async (uri) => {
+                if (!served(uri)) {
+                    throw notFound(uri.path);
+                }
+                const entries = [];
+                for (let cursor = 0; cursor !== null;) {
+                    const page = await (
+                        await request("list", {path: uri.path, cursor, limit: config.pageSize})
+                    ).json();
+                    for (const entry of page.entries) {
+                        remember(`${uri.path.replace(/\\/+$/, "")}/${entry.name}`, entry);
+                        entries.push([entry.name, toStat(entry).type]);
+                    }
+                    cursor = page.next;
+                }
+                return entries;
+            },
+            readFile: async (uri) => {
+                if (!served(uri)) {
+                    throw notFound(uri.path);
+                }
+                const cached = files.get(uri.path);
+                const stat = stats.get(uri.path);
+                let file = cached;
+                if (!(cached && fresh(stat) && stat.etag === cached.etag)) {
+                    const response = await request(
+                        "file", {path: uri.path}, cached ? {"If-None-Match": cached.etag} : {}
+                    );
+                    if (response.status === 304) {
+                        stat && remember(uri.path, stat);
+                    } else {
+                        const content = new Uint8Array(await response.arrayBuffer());
+                        file = {etag: response.headers.get("ETag"), content};
+                        stats.delete(uri.path);
+                    }
+                }
+                files.delete(uri.path);
+                if (file.etag && config.cacheSize > 0) {
+                    files.set(uri.path, file);
+                    for (const path of files.keys()) {
+                        if (files.size <= config.cacheSize) {
+                            break;
+                        }
+                        files.delete(path);
+                    }
+                }
+                return file.content;
+            },
+            writeFile: readOnly,
+            mkdir: readOnly,
+            delete: readOnly,
+            rename: readOnly,
+        };
+        workspaceFileSystems.set(key, registerFileSystemOverlay(1, provider));
+    };
+    """
+    WORKSPACE_FILES_INIT: Final = "registerWorkspaceFiles(workspace, {config});\n"
+    SEARCH_INIT: Final = """editor.addAction({{
+        id: "monaco-editors.findInWorkspace",
+        label: "Find in Workspace",
+        // KeyMod.CtrlCmd | KeyMod.Shift | KeyCode.KeyF
+        keybindings: [2048 | 1024 | 36],
+        contextMenuGroupId: "navigation",
+        run: (editor) => {{
+            const model = editor.getModel();
+            const selection = editor.getSelection();
+            const query = selection && !selection.isEmpty()
+                ? model.getValueInRange(selection)
+                : model?.getWordAtPosition(editor.getPosition())?.word ?? "";
+            ({on_search})({{query, uri: model?.uri.toString() ?? ""}});
+        }},
+    }});
+    """
+    STORED_DOCUMENTS: Final = """const loadStoredDocument = async (config, id) => {
+        const response = await fetch(`${config.url}/documents/${encodeURIComponent(id)}`, {cache: "no-cache"});
+        if (response.status === 404) {
+            return {version: 0, text: ""};
+        }
+        if (!response.ok) {
+            throw new Error(`Loading document ${id} failed: ${response.status}`);
+        }
+        const manifest = await response.json();
+        // Chunks are immutable, so the browser's HTTP cache serves the ones it already has.
+        const chunks = await Promise.all(manifest.chunks.map(async (digest) => {
+            const chunk = await fetch(`${config.url}/chunks/${digest}`);
+            if (!chunk.ok) {
+                throw new Error(`Loading chunk ${digest} of document ${id} failed: ${chunk.status}`);
+            }
+            return chunk.text();
+        }));
+        return {version: manifest.version, text: chunks.join("")};
+    };
+    const syncStoredDocument = (config, id, model, version) => {
+        // Edits are batched for `debounce` ms and sent as deltas against the version the backend last acknowledged.
+        // If the document has moved on (409) or a request failed, the whole text is saved instead.
+        const url = `${config.url}/documents/${encodeURIComponent(id)}`;
+        let pending = [];
+        let timer;
+        let resync = false;
+        // Bumped by full saves, which supersede the batches queued before them.
+        let generation = 0;
+        let queue = Promise.resolve();
+        const send = (method, body) => {
+            const json = JSON.stringify(body);
+            return fetch(url, {
+                method,
+                body: json,
+                headers: {"Content-Type": "application/json"},
+                // Lets the last edits reach the backend when the page is closed; browsers cap such bodies at 64KB.
+                keepalive: json.length < 60000,
+            });
+        };
+        const flush = () => {
+            clearTimeout(timer);
+            timer = undefined;
+            if (!pending.length && !resync) {
+                return queue;
+            }
+            const changes = pending;
+            const batch = generation;
+            pending = [];
+            queue = queue.then(async () => {
+                if (batch !== generation) {
+                    return;
+                }
+                let response = resync ? undefined : await send("POST", {version, changes});
+                if (response === undefined || response.status === 409) {
+                    if (model.isDisposed()) {
+                        return;
+                    }
+                    // The full text includes the edits still pending or queued.
+                    clearTimeout(timer);
+                    timer = undefined;
+                    pending = [];
+                    generation += 1;
+                    response = await send("PUT", {text: model.getValue()});
+                }
+                if (!response.ok) {
+                    throw new Error(`Saving document ${id} failed: ${response.status}`);
+                }
+                version = (await response.json()).version;
+                resync = false;
+            }).catch((error) => {
+                resync = true;
+                console.error(error);
+            });
+            return queue;
+        };
+        const listener = model.onDidChangeContent((event) => {
+            pending.push(...event.changes.map((change) => ({
+                range: {
+                    start: {line: change.range.startLineNumber - 1, character: change.range.startColumn - 1},
+                    end: {line: change.range.endLineNumber - 1, character: change.range.endColumn - 1},
+                },
+                text: change.text,
+            })));
+            timer ??= setTimeout(flush, config.debounce);
+        });
+        window.addEventListener("pagehide", flush);
+        return {
+            flush,
+            dispose: () => {
+                listener.dispose();
+                window.removeEventListener("pagehide", flush);
+                flush();
+            },
+        };
+    };
+    """
+    SNIPPETS: Final = """const registerMonacoSnippet = (globalThis.registerMonacoSnippet ??= (() => {
+        // All snippets on the page share one read-only editor, started when the first snippet nears the viewport
+        // and moved into whichever snippet is focused. The others keep their static highlighted view.
+        const host = document.createElement("div");
+        let started;
+        let active;
+        const start = () => (started ??= (async () => {
+            const snippetWrapper = new MonacoEditorLanguageClientWrapper();
+            await snippetWrapper.init({
+                $type: 'extended',
+                logLevel: LogLevel.Off,
+                htmlContainer: host,
+                vscodeApiConfig: {
+                    viewsConfig: {viewServiceType: 'EditorService'},
+                    serviceOverrides: {...getKeybindingsServiceOverride(), ...getExtensionServiceOverride()},
+                },
+                editorAppConfig: {
+                    monacoWorkerFactory: configureDefaultWorkerFactory,
+                    codeResources: {modified: {text: "", uri: "/snippets/snippet.txt"}},
+                    editorOptions: {
+                        readOnly: true,
+                        domReadOnly: true,
+                        automaticLayout: true,
+                        lineNumbers: "off",
+                        glyphMargin: false,
+                        folding: false,
+                        lineDecorationsWidth: 0,
+                        minimap: {enabled: false},
+                        overviewRulerLanes: 0,
+                        renderLineHighlight: "none",
+                        scrollBeyondLastLine: false,
+                        scrollbar: {alwaysConsumeMouseWheel: false},
+                    },
+                },
+            });
+            await snippetWrapper.start();
+            return snippetWrapper;
+        })());
+        const release = () => {
+            if (active) {
+                active.view.removeAttribute("hidden");
+                host.remove();
+                active = undefined;
+            }
+        };
+        const activate = async (element) => {
+            if (active?.element === element) {
+                return;
+            }
+            const snippetWrapper = await start();
+            const view = element.querySelector(":scope > [data-snippet-view]");
+            if (!view || !element.isConnected) {
+                return;
+            }
+            release();
+            await updateUserConfiguration(JSON.stringify({'workbench.colorTheme': element.dataset.theme}));
+            await snippetWrapper.updateCodeResources({
+                modified: {text: element.dataset.value, uri: `/snippets/${element.dataset.filename}`},
+            });
+            host.style.height = `${view.offsetHeight}px`;
+            element.append(host);
+            view.setAttribute("hidden", "");
+            active = {element, view};
+            snippetWrapper.getEditor().focus();
+        };
+        // Off-screen snippets hand the editor back; snippets coming into view warm it up while the page is idle.
+        const observer = new IntersectionObserver((entries) => {
+            for (const entry of entries) {
+                if (entry.isIntersecting) {
+                    (globalThis.requestIdleCallback ?? setTimeout)(start);
+                } else if (active?.element === entry.target) {
+                    release();
+                }
+            }
+        }, {rootMargin: "200px"});
+        // A React callback ref; the returned cleanup runs when the snippet unmounts.
+        return (element) => {
+            if (!element) {
+                return;
+            }
+            const onFocus = () => activate(element);
+            element.addEventListener("focusin", onFocus);
+            element.addEventListener("pointerdown", onFocus);
+            observer.observe(element);
+            return () => {
+                element.removeEventListener("focusin", onFocus);
+                element.removeEventListener("pointerdown", onFocus);
+                observer.unobserve(element);
+                if (active?.element === element) {
+                    release();
+                }
+            };
+        };
+    })());
+    """
     USER_CONFIG: Final = """const userConfiguration = {{
         'workbench.colorTheme': {theme},
         'editor.guides.bracketPairsHorizontal': 'active',
         'editor.experimental.asyncTokenization': true,
     }};
     """
+    COMMAND_QUEUE: Final = """const monacoEditorCommands = (globalThis.monacoEditorCommands ??= (() => {
+        // Executions of each registered command run at most `concurrency` at a time, in order. An execution with the
+        // same arguments as a queued or running one joins it instead of running again (e.g. a double click).
+        const commands = new Map();
+        const report = (name, command, status, error) => {
+            const progress = {name, status, running: command.running, queued: command.queue.length};
+            command.onProgress?.(
+                error === undefined ? progress : {...progress, error: String(error?.message ?? error)}
+            );
+        };
+        const settle = (name, command, entry, status, error) => {
+            command.running--;
+            if (command.inflight.get(entry.key) === entry) {
+                command.inflight.delete(entry.key);
+            }
+            entry.source.dispose();
+            report(name, command, status, error);
+            pump(name, command);
+        };
+        const pump = (name, command) => {
+            while (command.running < command.concurrency && command.queue.length) {
+                const entry = command.queue.shift();
+                command.running++;
+                report(name, command, "started");
+                const token = entry.source.token;
+                Promise.resolve().then(() => entry.run(token)).then(
+                    (result) => {
+                        settle(name, command, entry, token.isCancellationRequested ? "cancelled" : "completed");
+                        entry.resolve(result);
+                    },
+                    (error) => {
+                        if (token.isCancellationRequested) {
+                            settle(name, command, entry, "cancelled");
+                            entry.resolve(undefined);
+                        } else {
+                            settle(name, command, entry, "failed", error);
+                            entry.reject(error);
+                        }
+                    },
+                );
+            }
+        };
+        const key = (args) => {
+            try {
+                return JSON.stringify(args);
+            } catch {
+                return Symbol();
+            }
+        };
+        return {
+            configure(name, concurrency, onProgress) {
+                const command = commands.get(name) ?? {running: 0, queue: [], inflight: new Map()};
+                Object.assign(command, {concurrency: Math.max(1, concurrency ?? 1), onProgress});
+                commands.set(name, command);
+            },
+            execute(name, args, run) {
+                const command = commands.get(name);
+                const entry = {key: key(args), run, source: new vscode.CancellationTokenSource()};
+                const existing = command.inflight.get(entry.key);
+                if (existing) {
+                    entry.source.dispose();
+                    return existing.promise;
+                }
+                entry.promise = new Promise((resolve, reject) => Object.assign(entry, {resolve, reject}));
+                command.inflight.set(entry.key, entry);
+                command.queue.push(entry);
+                report(name, command, "queued");
+                pump(name, command);
+                return entry.promise;
+            },
+            cancel(name) {
+                // Queued executions are dropped; running requests are sent `$/cancelRequest` and skip their restart.
+                for (const [commandName, command] of commands) {
+                    if (name !== undefined && commandName !== name) {
+                        continue;
+                    }
+                    for (const entry of command.queue.splice(0)) {
+                        command.inflight.delete(entry.key);
+                        entry.source.dispose();
+                        report(commandName, command, "cancelled");
+                        entry.resolve(undefined);
+                    }
+                    // Later executions start afresh instead of joining the cancelled ones.
+                    for (const entry of command.inflight.values()) {
+                        entry.source.cancel();
+                    }
+                    command.inflight.clear();
+                }
+            },
+        };
+    })());
+    """
     REGISTER_COMMANDS: Final = """
-    const registerCommand = async ({{language, type, name, method, params, restart_client}}) => {{
-        const registered = await vscode.commands.getCommands(true);
-        if (!registered.includes(name)) {{
-            if (type === "request") {{
-                vscode.commands.registerCommand(name, async () => {{
-                    {on_command}
-                    const languageClient = wrapper.getLanguageClient(language);
-                    await languageClient.sendRequest(method, params);
-                    if (restart_client) {{
-                        {on_restart}
-                        await wrapper.getLanguageClientWrapper(language).restartLanguageClient();
-                    }};
-                    {on_command_complete}
-                }});
-            }} else {{
-                vscode.commands.registerCommand(name, async () => {{
-                    {on_command}
-                    const languageClient = wrapper.getLanguageClient(language);
-                    await languageClient.sendNotification(method, params);
-                    if (restart_client) {{
-                        {on_restart}
-                        await wrapper.getLanguageClientWrapper(language).restartLanguageClient();
-                    }};
-                    {on_command_complete}
-                }});
+    const registerCommands = async (language, commands) => {{
+        // One snapshot of the registered commands, instead of fetching the full list for every command.
+        const registered = new Set(await vscode.commands.getCommands(true));
+        for (const [name, {{type, method, params, restart_client, concurrency}}] of Object.entries(commands)) {{
+            monacoEditorCommands.configure(name, concurrency, (progress) => {{
+                {on_command_progress}
+            }});
+            if (registered.has(name)) {{
+                continue;
             }}
+            const run = async (token) => {{
+                {on_command}
+                const languageClient = wrapper.getLanguageClient(language);
+                if (type === "request") {{
+                    await languageClient.sendRequest(method, params, token);
+                }} else {{
+                    await languageClient.sendNotification(method, params);
+                }}
+                if (restart_client && !token.isCancellationRequested) {{
+                    {on_restart}
+                    await wrapper.getLanguageClientWrapper(language).restartLanguageClient();
+                }}
+                {on_command_complete}
+            }};
+            vscode.commands.registerCommand(name, (...args) => monacoEditorCommands.execute(name, args, run));
         }}
     }};
     """
@@ -134,13 +1117,88 @@ class UseEffects(SimpleNamespace):
                 await wrapper.init(wrapperConfig);
                 {text_change_callback}
                 await wrapper.start();
-                const editor = wrapper.getEditor();
+                // The editor is in place, so the static placeholder (see `highlight_placeholder`) can go.
+                container.querySelector(":scope > [data-monaco-placeholder]")?.setAttribute("hidden", "");
+                const editor = wrapper.getEditor() ?? wrapper.getDiffEditor()?.getModifiedEditor();
                 {additional}
                 setStarted(true);
             }})();
         }}
     }}, [wrapper, container, started]);
     """
+    UPDATE_LARGE_CODE: Final = """useEffect(() => {{
+        (async () => {{
+            const model = wrapper.isStarted() ? wrapper.getEditor().getModel() : undefined;
+            if (model && (largeFile || saveOnlyUris.has(model.uri.toString()))) {{
+                const configs = wrapperConfig.languageClientConfigs?.configs;
+                await loadLargeFile(wrapper.getEditor(), codeValue, {policy}, largeFile, configs);
+            }} else if (!largeFile) {{
+                await wrapper.updateCodeResources({{
+                    modified: {{
+                        text: codeValue,
+                        uri: `${{workspace}}/${{{filename}}}`,
+                    }}
+                }});
+            }}
+        }})();
+    }}, [codeValue]);
+    """
+    UPDATE_DIFF_CODE: Final = """useEffect(() => {{
+        if (wrapper.isStarted()) {{
+            (async () => {{
+                await wrapper.updateCodeResources({{
+                    modified: {{
+                        text: codeValue,
+                        uri: `${{workspace}}/${{{filename}}}`,
+                    }},
+                    original: {{
+                        text: originalValue,
+                        uri: `${{workspace}}/.original/${{{filename}}}`,
+                    }}
+                }});
+                showDiffHunks(wrapper.getDiffEditor(), precomputedHunks);
+            }})();
+        }}
+    }}, [codeValue, originalValue, precomputedHunks]);
+    """
+    UPDATE_CACHED_CODE: Final = """useEffect(() => {{
+        (async () => {{
+            const uri = `${{workspace}}/${{{filename}}}`;
+            if (wrapper.isStarted()) {{
+                await openCachedModel(uri, codeValue, {limits});
+            }} else {{
+                await wrapper.updateCodeResources({{modified: {{text: codeValue, uri}}}});
+            }}
+        }})();
+    }}, [codeValue, {filename}]);
+    """
+    UPDATE_STORED_CODE: Final = """useEffect(() => {{
+        if (!started) {{
+            return;
+        }}
+        let sync;
+        let cancelled = false;
+        (async () => {{
+            const stored = await loadStoredDocument({config}, {document_id});
+            if (cancelled) {{
+                return;
+            }}
+            await wrapper.updateCodeResources({{
+                modified: {{
+                    text: stored.text,
+                    uri: `${{workspace}}/${{{filename}}}`,
+                }}
+            }});
+            if (!cancelled) {{
+                sync = syncStoredDocument({config}, {document_id}, wrapper.getEditor().getModel(), stored.version);
+            }}
+        }})();
+        return () => {{
+            cancelled = true;
+            sync?.dispose();
+        }};
+    }}, [started, {document_id}, {filename}]);
+    """
     UPDATE_CODE: Final = """useEffect(() => {{
         (async () => {{
             await wrapper.updateCodeResources({{
@@ -177,12 +1235,149 @@ class WrapperConfig(SimpleNamespace):
             json: JSON.stringify(userConfiguration)
         },
     }"""
+    DIFF_EDITOR: Final = """useDiffEditor: true,
+        diffEditorOptions: {options},"""
+    ORIGINAL_RESOURCE: Final = """original: {{
+                text: originalValue,
+                uri: `${{workspace}}/.original/${{{filename}}}`,
+            }}"""
     EDITOR_APP_CONFIG: Final = """{{
         monacoWorkerFactory: configureDefaultWorkerFactory,
+        {diff_editor}
         codeResources: {{
             modified: {{
-                text: codeValue,
+                text: {text},
                 uri: `${{workspace}}/${{{filename}}}`,
-            }}
+            }},
+            {original}
         }}
     }}"""
+
+
+class ServiceWorker(SimpleNamespace):
+    """Service worker precaching the editor's build assets."""
+
+    FILE_NAME: Final = "monaco-editors-sw.js"
+    # `__VERSION__` and `__PRECACHE__` are filled in at build time by the Vite plugin.
+    SCRIPT: Final = """const VERSION = __VERSION__;
+const PRECACHE = __PRECACHE__;
+const PREFIX = "monaco-editors-";
+const PRECACHE_NAME = `${PREFIX}precache-${VERSION}`;
+const RUNTIME_NAME = `${PREFIX}runtime-${VERSION}`;
+// Editor assets that are not content-hashed, such as the extensions served by Reflex, are revalidated.
+const RUNTIME = /\\.(vsix|wasm)$|\\/external\\/monaco_editors\\//;
+const precached = new Set(PRECACHE.map((path) => new URL(path, self.location).href));
+
+self.addEventListener("install", (event) => {
+    event.waitUntil(
+        caches.open(PRECACHE_NAME)
+            .then((cache) => cache.addAll([...precached]))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener("activate", (event) => {
+    event.waitUntil(
+        caches.keys()
+            .then((names) => Promise.all(names
+                .filter((name) => name.startsWith(PREFIX) && name !== PRECACHE_NAME && name !== RUNTIME_NAME)
+                .map((name) => caches.delete(name))))
+            .then(() => self.clients.claim())
+    );
+});
+
+const cacheFirst = async (request) => {
+    const cache = await caches.open(PRECACHE_NAME);
+    const cached = await cache.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok) {
+        await cache.put(request, response.clone());
+    }
+    return response;
+};
+
+const staleWhileRevalidate = async (event) => {
+    const cache = await caches.open(RUNTIME_NAME);
+    const cached = await cache.match(event.request);
+    const revalidated = fetch(event.request).then(async (response) => {
+        if (response.ok) {
+            await cache.put(event.request, response.clone());
+        }
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(revalidated.catch(() => {}));
+        return cached;
+    }
+    return revalidated;
+};
+
+self.addEventListener("fetch", (event) => {
+    if (event.request.method !== "GET") {
+        return;
+    }
+    const url = new URL(event.request.url);
+    if (url.origin !== self.location.origin) {
+        return;
+    }
+    if (precached.has(url.origin + url.pathname)) {
+        event.respondWith(cacheFirst(event.request));
+    } else if (RUNTIME.test(url.pathname)) {
+        event.respondWith(staleWhileRevalidate(event));
+    }
+});
+"""
+    VITE_PLUGIN: Final = """(() => {{
+    const fileName = {file_name};
+    const script = {script};
+    const editorModules = /[\\\\/]node_modules[\\\\/](@codingame|monaco-|vscode|@vscode)|\\.vsix/;
+    const editorAssets = /worker|\\.(wasm|vsix)$/i;
+    const client = (context) => context.environment?.config?.consumer !== "server";
+    let base = "/";
+    let ssr = false;
+    return {{
+        name: "monaco-editors-service-worker",
+        apply: "build",
+        configResolved(config) {{
+            base = config.base;
+            ssr = Boolean(config.build?.ssr);
+        }},
+        renderChunk(code, chunk) {{
+            if (ssr || !chunk.isEntry || !client(this)) {{
+                return null;
+            }}
+            const url = JSON.stringify(base + fileName);
+            return `${{code}}
+if (typeof navigator !== "undefined" && "serviceWorker" in navigator) {{
+    navigator.serviceWorker.register(${{url}}).catch(() => {{}});
+}}
+`;
+        }},
+        async generateBundle(_, bundle) {{
+            if (ssr || !client(this)) {{
+                return;
+            }}
+            const precache = Object.values(bundle)
+                .filter((file) => file.type === "chunk"
+                    ? (file.moduleIds ?? Object.keys(file.modules ?? {{}})).some((id) => editorModules.test(id))
+                    : [file.fileName, ...(file.originalFileNames ?? [])].some(
+                        (name) => editorAssets.test(name) || editorModules.test(name)
+                    ))
+                .map((file) => base + file.fileName)
+                .sort();
+            // The file names are content-hashed, so they version the cache.
+            const {{createHash}} = await import("node:crypto");
+            const version = createHash("sha256").update(precache.join("\\n")).digest("hex").slice(0, 16);
+            this.emitFile({{
+                type: "asset",
+                fileName,
+                source: script
+                    .replace("__VERSION__", () => JSON.stringify(version))
+                    .replace("__PRECACHE__", () => JSON.stringify(precache)),
+            }});
+        }},
+    }};
+}})()"""
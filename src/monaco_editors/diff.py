@@ -0,0 +1,39 @@
+"""Server-side diffing for the diff editor's precomputed hunks."""
+
+import difflib
+import re
+
+from .models import DiffHunk
+
+# Line breaks as the editor counts them.
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+def compute_hunks(original: str, modified: str) -> list[DiffHunk]:
+    """Computes the changed line ranges between two texts.
+
+    Pass the result to the diff editor's `hunks` prop, so huge diffs are highlighted as soon as they open, even when
+    the browser's diff computation runs out of its time budget. For very large texts, run it in a thread
+    (`asyncio.to_thread`) from a background event.
+
+    Args:
+        original (str): The original text.
+        modified (str): The modified text.
+
+    Returns:
+        list[DiffHunk]: The changed line ranges, in order.
+    """
+    matcher = difflib.SequenceMatcher(None, _LINE_BREAK.split(original), _LINE_BREAK.split(modified))
+    return [
+        DiffHunk(
+            originalStartLineNumber=original_start + 1 if original_end > original_start else original_start,
+            originalEndLineNumber=original_end if original_end > original_start else 0,
+            modifiedStartLineNumber=modified_start + 1 if modified_end > modified_start else modified_start,
+            modifiedEndLineNumber=modified_end if modified_end > modified_start else 0,
+        )
+        for tag, original_start, original_end, modified_start, modified_end in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+__all__ = ("compute_hunks",)
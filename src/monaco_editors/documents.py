@@ -0,0 +1,489 @@
+"""Document store keeping editor documents outside Reflex state, in content-addressed chunks.
+
+Editors bound to a `document_id` load their text from the backend's document routes and send their edits back as
+deltas, so Reflex state only ever holds the ID, however large the document is. Documents are stored as a manifest
+(version and chunk digests) plus immutable chunks keyed by their SHA-256, so:
+
+- a save only writes the chunks around an edit, and identical chunks are stored once across all documents,
+- browsers cache chunks forever and only download the ones they don't have when a document is reopened.
+"""
+
+import abc
+import asyncio
+import hashlib
+import json
+import os
+import pathlib
+import re
+import tempfile
+import urllib.parse
+import weakref
+import zlib
+from collections.abc import AsyncIterator, Iterable, Sequence
+from typing import Any, Final, TypedDict
+
+from reflex.utils import prerequisites
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import BaseRoute, Route
+
+from .gateway import apply_changes
+
+# Characters per chunk: chunks end at a content-defined line boundary between the minimum and maximum size.
+CHUNK_MIN_SIZE: Final = 16 * 1024
+CHUNK_MAX_SIZE: Final = 256 * 1024
+# One in `CHUNK_DIVISOR` lines (by hash) ends a chunk, for an average of about 64K characters with 80-column lines.
+CHUNK_DIVISOR: Final = 600
+# A chunk digest: a lowercase hex SHA-256.
+_DIGEST: Final = re.compile(r"[0-9a-f]{64}")
+
+
+class Manifest(TypedDict):
+    """A stored document: its version and the digests of its chunks, in order."""
+
+    version: int
+    length: int
+    chunks: list[str]
+
+
+class DocumentConflictError(Exception):
+    """Raised when changes are applied against a version that is no longer the document's current one."""
+
+
+def chunk_text(
+    text: str, min_size: int = CHUNK_MIN_SIZE, max_size: int = CHUNK_MAX_SIZE, divisor: int = CHUNK_DIVISOR
+) -> list[str]:
+    """Splits a text into content-defined chunks.
+
+    Chunks end after a line whose hash is a multiple of `divisor` (once they hold `min_size` characters), or at
+    `max_size`. Boundaries depend on the content rather than offsets, so an edit only changes the chunks around it
+    and the rest of the document keeps its digests.
+
+    Args:
+        text (str): The text to split.
+        min_size (int): The smallest chunk (except the last), in characters.
+        max_size (int): The largest chunk, in characters.
+        divisor (int): One in `divisor` lines ends a chunk.
+
+    Returns:
+        list[str]: The chunks, which join back to `text`.
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        for start in range(0, len(line), max_size):
+            piece = line[start : start + max_size]
+            if size + len(piece) > max_size:
+                chunks.append("".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece)
+        if size >= min_size and zlib.crc32(line.encode()) % divisor == 0:
+            chunks.append("".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def digest(chunk: bytes) -> str:
+    """Returns the content address of a chunk."""
+    return hashlib.sha256(chunk).hexdigest()
+
+
+class DocumentStore(abc.ABC):
+    """Stores documents by ID as content-addressed chunks.
+
+    Subclasses implement the storage of manifests and chunks; documents are read and written with `load`, `save`
+    and `apply`. Changes to one document are serialized within a process, while concurrent writers in other
+    processes are last-writer-wins.
+    """
+
+    def __init__(self) -> None:
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    @abc.abstractmethod
+    async def get_manifest(self, document_id: str) -> Manifest | None:
+        """Returns the manifest of a document, or `None` if it doesn't exist."""
+
+    @abc.abstractmethod
+    async def put_manifest(self, document_id: str, manifest: Manifest) -> None:
+        """Stores the manifest of a document."""
+
+    @abc.abstractmethod
+    async def delete_manifest(self, document_id: str) -> None:
+        """Deletes the manifest of a document."""
+
+    @abc.abstractmethod
+    def document_ids(self) -> AsyncIterator[str]:
+        """Yields the IDs of the stored documents."""
+
+    @abc.abstractmethod
+    async def get_chunks(self, digests: Sequence[str]) -> list[bytes | None]:
+        """Returns the chunks with the given digests, with `None` for missing ones."""
+
+    @abc.abstractmethod
+    async def put_chunks(self, chunks: dict[str, bytes]) -> None:
+        """Stores chunks by digest."""
+
+    @abc.abstractmethod
+    async def delete_chunks(self, digests: Iterable[str]) -> None:
+        """Deletes chunks by digest."""
+
+    @abc.abstractmethod
+    def chunk_digests(self) -> AsyncIterator[str]:
+        """Yields the digests of the stored chunks."""
+
+    def lock(self, document_id: str) -> asyncio.Lock:
+        """Returns the lock serializing changes to a document."""
+        if (lock := self._locks.get(document_id)) is None:
+            lock = self._locks[document_id] = asyncio.Lock()
+        return lock
+
+    async def load(self, document_id: str) -> str | None:
+        """Returns the text of a document, or `None` if it doesn't exist."""
+        if (manifest := await self.get_manifest(document_id)) is None:
+            return None
+        return await self._text(document_id, manifest)
+
+    async def save(self, document_id: str, text: str) -> Manifest:
+        """Replaces the text of a document, writing only the chunks not stored yet.
+
+        Args:
+            document_id (str): The document ID.
+            text (str): The new text.
+
+        Returns:
+            Manifest: The new manifest, whose version is one more than the previous one.
+        """
+        async with self.lock(document_id):
+            return await self._save(document_id, text, await self.get_manifest(document_id))
+
+    async def apply(self, document_id: str, changes: list[dict[str, Any]], version: int) -> Manifest:
+        """Applies LSP-style content changes (e.g. an editor's `TextDelta` changes) to a document.
+
+        Args:
+            document_id (str): The document ID.
+            changes (list[dict[str, Any]]): The changes, in order (see `gateway.apply_changes`).
+            version (int): The document version the changes were made against.
+
+        Returns:
+            Manifest: The new manifest.
+
+        Raises:
+            DocumentConflictError: If `version` isn't the document's current version.
+        """
+        async with self.lock(document_id):
+            manifest = await self.get_manifest(document_id)
+            if (manifest["version"] if manifest else 0) != version:
+                msg = f"Document {document_id} is not at version {version}"
+                raise DocumentConflictError(msg)
+            text = await self._text(document_id, manifest) if manifest else ""
+            return await self._save(document_id, apply_changes(text, changes), manifest)
+
+    async def delete(self, document_id: str) -> None:
+        """Deletes a document. Its chunks are removed by `collect` unless other documents use them."""
+        async with self.lock(document_id):
+            await self.delete_manifest(document_id)
+
+    async def collect(self) -> int:
+        """Deletes the chunks no document refers to, and returns how many were deleted.
+
+        Run it while no documents are being saved, since a save writes its chunks before its manifest.
+        """
+        referenced: set[str] = set()
+        async for document_id in self.document_ids():
+            if manifest := await self.get_manifest(document_id):
+                referenced.update(manifest["chunks"])
+        unreferenced = [chunk async for chunk in self.chunk_digests() if chunk not in referenced]
+        await self.delete_chunks(unreferenced)
+        return len(unreferenced)
+
+    async def _text(self, document_id: str, manifest: Manifest) -> str:
+        chunks = await self.get_chunks(manifest["chunks"])
+        if any(chunk is None for chunk in chunks):
+            msg = f"Document {document_id} refers to missing chunks"
+            raise LookupError(msg)
+        return b"".join(chunks).decode()
+
+    async def _save(self, document_id: str, text: str, previous: Manifest | None) -> Manifest:
+        chunks = [chunk.encode() for chunk in chunk_text(text)]
+        digests = [digest(chunk) for chunk in chunks]
+        stored = set(previous["chunks"]) if previous else set()
+        await self.put_chunks({key: chunk for key, chunk in zip(digests, chunks, strict=True) if key not in stored})
+        manifest = Manifest(version=(previous["version"] if previous else 0) + 1, length=len(text), chunks=digests)
+        await self.put_manifest(document_id, manifest)
+        return manifest
+
+
+class MemoryDocumentStore(DocumentStore):
+    """Keeps documents in process memory, for single-worker apps and tests."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._manifests: dict[str, Manifest] = {}
+        self._chunks: dict[str, bytes] = {}
+
+    async def get_manifest(self, document_id: str) -> Manifest | None:
+        """Returns the manifest of a document, or `None` if it doesn't exist."""
+        return self._manifests.get(document_id)
+
+    async def put_manifest(self, document_id: str, manifest: Manifest) -> None:
+        """Stores the manifest of a document."""
+        self._manifests[document_id] = manifest
+
+    async def delete_manifest(self, document_id: str) -> None:
+        """Deletes the manifest of a document."""
+        self._manifests.pop(document_id, None)
+
+    async def document_ids(self) -> AsyncIterator[str]:
+        """Yields the IDs of the stored documents."""
+        for document_id in list(self._manifests):
+            yield document_id
+
+    async def get_chunks(self, digests: Sequence[str]) -> list[bytes | None]:
+        """Returns the chunks with the given digests, with `None` for missing ones."""
+        return [self._chunks.get(key) for key in digests]
+
+    async def put_chunks(self, chunks: dict[str, bytes]) -> None:
+        """Stores chunks by digest."""
+        self._chunks.update(chunks)
+
+    async def delete_chunks(self, digests: Iterable[str]) -> None:
+        """Deletes chunks by digest."""
+        for key in digests:
+            self._chunks.pop(key, None)
+
+    async def chunk_digests(self) -> AsyncIterator[str]:
+        """Yields the digests of the stored chunks."""
+        for key in list(self._chunks):
+            yield key
+
+
+class DiskDocumentStore(DocumentStore):
+    """Keeps documents as files under a directory, shared by the workers of one host.
+
+    Chunks are stored under `chunks/<first two hex digits>/<digest>` and manifests as JSON under `documents/`. All
+    files are written atomically (write to a temporary file, then rename).
+
+    Args:
+        directory (str | os.PathLike): The directory to store documents in.
+    """
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        super().__init__()
+        self.directory = pathlib.Path(directory)
+        (self.directory / "documents").mkdir(parents=True, exist_ok=True)
+        (self.directory / "chunks").mkdir(parents=True, exist_ok=True)
+
+    def _manifest_path(self, document_id: str) -> pathlib.Path:
+        return self.directory / "documents" / f"{urllib.parse.quote(document_id, safe='')}.json"
+
+    def _chunk_path(self, key: str) -> pathlib.Path:
+        return self.directory / "chunks" / key[:2] / key
+
+    @staticmethod
+    def _write(path: pathlib.Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            pathlib.Path(temporary).replace(path)
+        except BaseException:
+            pathlib.Path(temporary).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _read(path: pathlib.Path) -> bytes | None:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    async def get_manifest(self, document_id: str) -> Manifest | None:
+        """Returns the manifest of a document, or `None` if it doesn't exist."""
+        data = await asyncio.to_thread(self._read, self._manifest_path(document_id))
+        return json.loads(data) if data is not None else None
+
+    async def put_manifest(self, document_id: str, manifest: Manifest) -> None:
+        """Stores the manifest of a document."""
+        await asyncio.to_thread(self._write, self._manifest_path(document_id), json.dumps(manifest).encode())
+
+    async def delete_manifest(self, document_id: str) -> None:
+        """Deletes the manifest of a document."""
+        await asyncio.to_thread(self._manifest_path(document_id).unlink, missing_ok=True)
+
+    async def document_ids(self) -> AsyncIterator[str]:
+        """Yields the IDs of the stored documents."""
+        for path in await asyncio.to_thread(lambda: list((self.directory / "documents").glob("*.json"))):
+            yield urllib.parse.unquote(path.stem)
+
+    async def get_chunks(self, digests: Sequence[str]) -> list[bytes | None]:
+        """Returns the chunks with the given digests, with `None` for missing ones."""
+        return await asyncio.to_thread(lambda: [self._read(self._chunk_path(key)) for key in digests])
+
+    async def put_chunks(self, chunks: dict[str, bytes]) -> None:
+        """Stores chunks by digest."""
+
+        def write() -> None:
+            for key, data in chunks.items():
+                if not self._chunk_path(key).exists():
+                    self._write(self._chunk_path(key), data)
+
+        await asyncio.to_thread(write)
+
+    async def delete_chunks(self, digests: Iterable[str]) -> None:
+        """Deletes chunks by digest."""
+        await asyncio.to_thread(lambda: [self._chunk_path(key).unlink(missing_ok=True) for key in digests])
+
+    async def chunk_digests(self) -> AsyncIterator[str]:
+        """Yields the digests of the stored chunks."""
+        for path in await asyncio.to_thread(lambda: list((self.directory / "chunks").glob("*/*"))):
+            if not path.name.startswith("."):
+                yield path.name
+
+
+class RedisDocumentStore(DocumentStore):
+    """Keeps documents in Redis, shared by all workers.
+
+    Args:
+        redis (Any): An async Redis client. Defaults to the one of the app's `redis_url`.
+        prefix (str): The prefix of the store's keys.
+    """
+
+    def __init__(self, redis: Any = None, prefix: str = "monaco_editors:") -> None:  # noqa: ANN401
+        super().__init__()
+        self.redis = redis or prerequisites.get_redis()
+        if self.redis is None:
+            msg = "RedisDocumentStore needs a Redis client or the app's `redis_url`"
+            raise ValueError(msg)
+        self.prefix = prefix
+
+    async def get_manifest(self, document_id: str) -> Manifest | None:
+        """Returns the manifest of a document, or `None` if it doesn't exist."""
+        data = await self.redis.get(f"{self.prefix}document:{document_id}")
+        return json.loads(data) if data is not None else None
+
+    async def put_manifest(self, document_id: str, manifest: Manifest) -> None:
+        """Stores the manifest of a document."""
+        await self.redis.set(f"{self.prefix}document:{document_id}", json.dumps(manifest))
+
+    async def delete_manifest(self, document_id: str) -> None:
+        """Deletes the manifest of a document."""
+        await self.redis.delete(f"{self.prefix}document:{document_id}")
+
+    async def document_ids(self) -> AsyncIterator[str]:
+        """Yields the IDs of the stored documents."""
+        start = len(f"{self.prefix}document:")
+        async for key in self.redis.scan_iter(match=f"{self.prefix}document:*"):
+            yield (key.decode() if isinstance(key, bytes) else key)[start:]
+
+    async def get_chunks(self, digests: Sequence[str]) -> list[bytes | None]:
+        """Returns the chunks with the given digests, with `None` for missing ones."""
+        if not digests:
+            return []
+        return await self.redis.mget([f"{self.prefix}chunk:{key}" for key in digests])
+
+    async def put_chunks(self, chunks: dict[str, bytes]) -> None:
+        """Stores chunks by digest."""
+        if chunks:
+            await self.redis.mset({f"{self.prefix}chunk:{key}": data for key, data in chunks.items()})
+
+    async def delete_chunks(self, digests: Iterable[str]) -> None:
+        """Deletes chunks by digest."""
+        if keys := [f"{self.prefix}chunk:{key}" for key in digests]:
+            await self.redis.delete(*keys)
+
+    async def chunk_digests(self) -> AsyncIterator[str]:
+        """Yields the digests of the stored chunks."""
+        start = len(f"{self.prefix}chunk:")
+        async for key in self.redis.scan_iter(match=f"{self.prefix}chunk:*"):
+            yield (key.decode() if isinstance(key, bytes) else key)[start:]
+
+
+class DocumentServer:
+    """Serves a `DocumentStore` to editors bound to a `document_id` (see `DocumentSync`).
+
+    Routes, under a prefix such as `/documents`:
+
+    - `GET <path>/chunks/<digest>`: a chunk, cacheable forever.
+    - `GET <path>/documents/<id>`: the document's `Manifest`.
+    - `PUT <path>/documents/<id>` with `{"text": ...}`: replaces the text.
+    - `POST <path>/documents/<id>` with `{"version": ..., "changes": [...]}`: applies changes, or answers 409 if
+      the document has moved past `version`.
+
+    Args:
+        store (DocumentStore): The document store.
+    """
+
+    def __init__(self, store: DocumentStore) -> None:
+        self.store = store
+
+    def routes(self, path: str) -> list[BaseRoute]:
+        """Returns the chunk and document routes."""
+        return [
+            Route(f"{path}/chunks/{{digest}}", self.chunk_endpoint),
+            Route(f"{path}/documents/{{document_id:path}}", self.document_endpoint, methods=["GET", "PUT", "POST"]),
+        ]
+
+    def mount(self, app: Starlette, path: str) -> None:
+        """Mounts the routes ahead of the app's catch-all mounts.
+
+        Args:
+            app (Starlette): The Reflex backend app, as passed to lifespan tasks.
+            path (str): The route prefix, e.g. `/documents`.
+        """
+        app.router.routes[0:0] = self.routes(path)
+
+    async def chunk_endpoint(self, request: Request) -> Response:
+        """Serves a chunk. Chunks never change, so browsers may cache them forever."""
+        key = request.path_params["digest"]
+        # Anything else isn't a chunk, and must not reach a store that maps digests to paths.
+        if not _DIGEST.fullmatch(key):
+            return Response(status_code=404)
+        (chunk,) = await self.store.get_chunks([key])
+        if chunk is None:
+            return Response(status_code=404)
+        return Response(
+            chunk,
+            media_type="text/plain; charset=utf-8",
+            headers={"Cache-Control": "public, max-age=31536000, immutable"},
+        )
+
+    async def document_endpoint(self, request: Request) -> Response:
+        """Serves, replaces or changes a document."""
+        document_id = request.path_params["document_id"]
+        if request.method == "GET":
+            if (manifest := await self.store.get_manifest(document_id)) is None:
+                return Response(status_code=404)
+            return JSONResponse(manifest, headers={"Cache-Control": "no-cache"})
+        try:
+            body = await request.json()
+            if request.method == "PUT":
+                manifest = await self.store.save(document_id, body["text"])
+            else:
+                manifest = await self.store.apply(document_id, body["changes"], body["version"])
+        except DocumentConflictError:
+            return Response(status_code=409)
+        except (KeyError, TypeError, ValueError):
+            return Response(status_code=400)
+        return JSONResponse(manifest)
+
+
+__all__ = (
+    "CHUNK_DIVISOR",
+    "CHUNK_MAX_SIZE",
+    "CHUNK_MIN_SIZE",
+    "DiskDocumentStore",
+    "DocumentConflictError",
+    "DocumentServer",
+    "DocumentStore",
+    "Manifest",
+    "MemoryDocumentStore",
+    "RedisDocumentStore",
+    "chunk_text",
+    "digest",
+)
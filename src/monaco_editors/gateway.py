@@ -0,0 +1,776 @@
+"""WebSocket gateway between Monaco language clients and stdio language servers.
+
+The gateway is mounted on the Reflex backend and spawns one language server process per websocket session.
+Client requests from all sessions go through a shared `RequestScheduler`, so one session running heavy
+commands cannot starve everyone else's completions. A session's notifications are held behind its queued requests,
+so the server sees each session's messages in order.
+"""
+
+import asyncio
+import contextlib
+import dataclasses
+import enum
+import functools
+import itertools
+import json
+import os
+import pathlib
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any, Final, Self
+
+from reflex.utils import console
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from . import jsonrpc
+from .write_behind import WriteBehind
+
+
+class Priority(enum.IntEnum):
+    """Scheduling priority of a language client request. Lower values are dispatched first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    HEAVY = 2
+
+
+INTERACTIVE_METHODS: Final = frozenset(
+    {
+        "completionItem/resolve",
+        "textDocument/completion",
+        "textDocument/hover",
+        "textDocument/signatureHelp",
+    }
+)
+HEAVY_METHODS: Final = frozenset({"workspace/executeCommand"})
+DEFAULT_COSTS: Final = {Priority.INTERACTIVE: 1.0, Priority.NORMAL: 1.0, Priority.HEAVY: 10.0}
+
+
+def classify(method: str) -> Priority:
+    """Returns the scheduling priority for an LSP method.
+
+    Args:
+        method (str): The LSP method of the request.
+
+    Returns:
+        Priority: The priority the request is scheduled with.
+    """
+    if method in INTERACTIVE_METHODS:
+        return Priority.INTERACTIVE
+    if method in HEAVY_METHODS:
+        return Priority.HEAVY
+    return Priority.NORMAL
+
+
+@dataclasses.dataclass
+class TokenBucket:
+    """Token bucket rate limiter.
+
+    Params:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum number of tokens, i.e. the allowed burst.
+    """
+
+    rate: float
+    capacity: float
+    tokens: float = dataclasses.field(init=False)
+    updated: float = dataclasses.field(init=False, default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        """Starts the bucket full."""
+        self.tokens = self.capacity
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_consume(self, cost: float) -> bool:
+        """Consumes `cost` tokens if available. Costs above the capacity are capped to it.
+
+        Args:
+            cost (float): The number of tokens to consume.
+
+        Returns:
+            bool: Whether the tokens were consumed.
+        """
+        self._refill()
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+    def delay(self, cost: float) -> float:
+        """Returns the number of seconds until `cost` tokens are available."""
+        self._refill()
+        return max(0.0, (min(cost, self.capacity) - self.tokens) / self.rate)
+
+
+@dataclasses.dataclass
+class _Pending:
+    session_id: str
+    request_id: int | str
+    priority: Priority
+    dispatch: Callable[[], None]
+    sequence: int
+    enqueued: float = dataclasses.field(default_factory=time.monotonic)
+
+
+class RequestScheduler:
+    """Priority scheduler with per-session token buckets for language client requests.
+
+    Requests are dispatched by priority and round-robin across sessions within a priority, as long as the
+    session's token bucket allows it and in-flight capacity is left. Heavy requests may only take part of the
+    in-flight capacity, so interactive requests always have room.
+
+    A session's notifications (see `notify`) are held behind its requests queued before them, and its requests
+    queued after a held notification wait for it, so the language server sees each session's edits and requests in
+    order while the caps still apply.
+
+    Args:
+        max_in_flight (int | None): Maximum requests awaiting a response across all sessions.
+            Defaults to twice the core count.
+        heavy_in_flight (int | None): Maximum heavy requests in flight. Defaults to a quarter of `max_in_flight`.
+        rate (float): Tokens refilled per second for each session.
+        burst (float): Token bucket capacity for each session.
+        costs (dict[Priority, float] | None): Token cost overrides per priority.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int | None = None,
+        heavy_in_flight: int | None = None,
+        rate: float = 20.0,
+        burst: float = 40.0,
+        costs: dict[Priority, float] | None = None,
+    ) -> None:
+        self.max_in_flight = max_in_flight or max(2, (os.cpu_count() or 1) * 2)
+        self.heavy_in_flight = heavy_in_flight or max(1, self.max_in_flight // 4)
+        self.rate = rate
+        self.burst = burst
+        self.costs = {**DEFAULT_COSTS, **(costs or {})}
+        self._queues: dict[Priority, OrderedDict[str, deque[_Pending]]] = {p: OrderedDict() for p in Priority}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._in_flight: dict[tuple[str, int | str], Priority] = {}
+        self._dispatched: dict[Priority, int] = dict.fromkeys(Priority, 0)
+        self._waited: dict[Priority, float] = dict.fromkeys(Priority, 0.0)
+        self._sequence = itertools.count()
+        self._held: dict[str, deque[tuple[int, Callable[[], None]]]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._users = 0
+
+    async def __aenter__(self) -> Self:
+        """Starts dispatching. The scheduler may be entered by several gateways sharing it."""
+        self._users += 1
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        """Stops dispatching once the last gateway sharing the scheduler exits."""
+        self._users -= 1
+        if self._users == 0 and self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def submit(self, session_id: str, message: dict[str, Any], dispatch: Callable[[], None]) -> Priority:
+        """Queues a client request for dispatch.
+
+        Args:
+            session_id (str): The session the request belongs to.
+            message (dict[str, Any]): The JSON-RPC request.
+            dispatch (Callable[[], None]): Writes the request to the session's language server.
+
+        Returns:
+            Priority: The priority the request was queued with.
+        """
+        priority = classify(message["method"])
+        pending = _Pending(
+            session_id=session_id,
+            request_id=message["id"],
+            priority=priority,
+            dispatch=dispatch,
+            sequence=next(self._sequence),
+        )
+        self._queues[priority].setdefault(session_id, deque()).append(pending)
+        self._wakeup.set()
+        return priority
+
+    def complete(self, session_id: str, request_id: int | str) -> None:
+        """Releases the in-flight slot of a request once the language server answered it."""
+        if self._in_flight.pop((session_id, request_id), None) is not None:
+            self._wakeup.set()
+
+    def cancel(self, session_id: str, request_id: int | str) -> bool:
+        """Removes a request that has not been dispatched yet.
+
+        Args:
+            session_id (str): The session the request belongs to.
+            request_id (int | str): The ID of the request to cancel.
+
+        Returns:
+            bool: Whether the request was still queued and is now removed.
+        """
+        for sessions in self._queues.values():
+            queue = sessions.get(session_id, ())
+            for pending in queue:
+                if pending.request_id == request_id:
+                    queue.remove(pending)
+                    if not queue:
+                        del sessions[session_id]
+                    self._release(session_id)
+                    return True
+        return False
+
+    def notify(self, session_id: str, send: Callable[[], None]) -> None:
+        """Sends a client notification once the session's requests queued before it are dispatched.
+
+        Notifications like `textDocument/didChange` change the documents the queued requests refer to. Without
+        queued or held messages of the session, the notification is sent right away and errors of `send` propagate.
+
+        Args:
+            session_id (str): The session the notification belongs to.
+            send (Callable[[], None]): Writes the notification to the session's language server.
+        """
+        if session_id not in self._held and not any(session_id in sessions for sessions in self._queues.values()):
+            send()
+            return
+        self._held.setdefault(session_id, deque()).append((next(self._sequence), send))
+
+    def remove_session(self, session_id: str) -> None:
+        """Drops all queued and in-flight requests and held notifications of a session."""
+        for sessions in self._queues.values():
+            sessions.pop(session_id, None)
+        self._held.pop(session_id, None)
+        self._buckets.pop(session_id, None)
+        for key in [key for key in self._in_flight if key[0] == session_id]:
+            del self._in_flight[key]
+        self._wakeup.set()
+
+    def _next(self) -> tuple[_Pending | None, float | None]:
+        if len(self._in_flight) >= self.max_in_flight:
+            return None, None
+        heavy = sum(1 for priority in self._in_flight.values() if priority is Priority.HEAVY)
+        delay = None
+        for priority, sessions in self._queues.items():
+            if priority is Priority.HEAVY and heavy >= self.heavy_in_flight:
+                continue
+            cost = self.costs[priority]
+            for session_id in list(sessions):
+                if (held := self._held.get(session_id)) and sessions[session_id][0].sequence > held[0][0]:
+                    # Made after a notification that still waits for earlier requests.
+                    continue
+                bucket = self._buckets.setdefault(session_id, TokenBucket(rate=self.rate, capacity=self.burst))
+                if bucket.try_consume(cost):
+                    queue = sessions[session_id]
+                    pending = queue.popleft()
+                    if queue:
+                        sessions.move_to_end(session_id)
+                    else:
+                        del sessions[session_id]
+                    return pending, None
+                wait = bucket.delay(cost)
+                delay = wait if delay is None else min(delay, wait)
+        return None, delay
+
+    async def run(self) -> None:
+        """Dispatches queued requests until cancelled."""
+        while True:
+            pending, delay = self._next()
+            if pending is None:
+                self._wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                continue
+            self._dispatch(pending)
+
+    def _dispatch(self, pending: _Pending) -> None:
+        self._dispatched[pending.priority] += 1
+        self._waited[pending.priority] += time.monotonic() - pending.enqueued
+        try:
+            pending.dispatch()
+        except (OSError, RuntimeError) as err:
+            console.debug(f"Dropping request {pending.request_id} of session {pending.session_id}: {err}")
+        else:
+            self._in_flight[(pending.session_id, pending.request_id)] = pending.priority
+        self._release(pending.session_id)
+
+    def _release(self, session_id: str) -> None:
+        """Sends the session's held notifications that no queued request of the session precedes any more."""
+        if not (held := self._held.get(session_id)):
+            return
+        first_queued = min(
+            (queue[0].sequence for sessions in self._queues.values() if (queue := sessions.get(session_id))),
+            default=None,
+        )
+        while held and (first_queued is None or held[0][0] < first_queued):
+            _, send = held.popleft()
+            try:
+                send()
+            except (OSError, RuntimeError) as err:
+                console.debug(f"Dropping a notification of session {session_id}: {err}")
+        if not held:
+            del self._held[session_id]
+        # Requests made after the sent notifications may go now.
+        self._wakeup.set()
+
+    def metrics(self) -> dict[str, Any]:
+        """Returns queue depth, in-flight and dispatch metrics.
+
+        Returns:
+            dict[str, Any]: The scheduler metrics as a JSON serializable dict.
+        """
+        depth: dict[str, int] = {}
+        for sessions in self._queues.values():
+            for session_id, queue in sessions.items():
+                depth[session_id] = depth.get(session_id, 0) + len(queue)
+        return {
+            "in_flight": len(self._in_flight),
+            "queue_depth": {p.name.lower(): sum(len(q) for q in s.values()) for p, s in self._queues.items()},
+            "session_queue_depth": depth,
+            "held_notifications": sum(len(held) for held in self._held.values()),
+            "dispatched": {p.name.lower(): count for p, count in self._dispatched.items()},
+            "mean_wait_ms": {
+                p.name.lower(): (self._waited[p] / count * 1000 if count else 0.0)
+                for p, count in self._dispatched.items()
+            },
+        }
+
+
+def position_offset(text: str, position: dict[str, int]) -> int:
+    """Returns the string index of an LSP position, clamped to its line and the end of the text."""
+    start = 0
+    for _ in range(position["line"]):
+        start = text.find("\n", start) + 1
+        if not start:
+            return len(text)
+    end = text.find("\n", start)
+    line = text[start : end if end >= 0 else len(text)]
+    if line.isascii():
+        return start + min(position["character"], len(line))
+    # LSP positions count UTF-16 code units.
+    units = line.encode("utf-16-le")[: position["character"] * 2]
+    return start + len(units.decode("utf-16-le", errors="ignore"))
+
+
+def apply_changes(text: str, changes: list[dict[str, Any]]) -> str:
+    """Applies LSP `TextDocumentContentChangeEvent`s to a document's text.
+
+    Args:
+        text (str): The document text before the changes.
+        changes (list[dict[str, Any]]): The full or ranged content changes, in order.
+
+    Returns:
+        str: The document text after the changes.
+    """
+    for change in changes:
+        if "range" not in change:
+            text = change["text"]
+            continue
+        start = position_offset(text, change["range"]["start"])
+        end = position_offset(text, change["range"]["end"])
+        text = text[:start] + change["text"] + text[end:]
+    return text
+
+
+@dataclasses.dataclass
+class _Document:
+    version: int
+    text: str
+    # The server's version minus the client's version, after the document is reopened by a resumed client.
+    offset: int = 0
+
+
+@dataclasses.dataclass
+class _Session:
+    id: str
+    process: asyncio.subprocess.Process
+    token: str | None = None
+    websocket: WebSocket | None = None
+    generation: int = 0
+    pending: dict[str, int | str] = dataclasses.field(default_factory=dict)
+    initialize_id: str | None = None
+    initialize_result: Any = None
+    cached_initialize: bool = False
+    registrations: dict[str, dict[str, Any]] = dataclasses.field(default_factory=dict)
+    documents: dict[str, _Document] = dataclasses.field(default_factory=dict)
+    diagnostics: dict[str, dict[str, Any]] = dataclasses.field(default_factory=dict)
+    replayed: set[str] = dataclasses.field(default_factory=set)
+    exited: bool = False
+    reader: asyncio.Task | None = None
+    expiry: asyncio.Task | None = None
+
+    def send(self, message: dict[str, Any]) -> None:
+        if self.process.stdin is None or self.process.stdin.is_closing():
+            msg = f"Language server of session {self.id} is not running"
+            raise RuntimeError(msg)
+        self.process.stdin.write(jsonrpc.encode_message(message))
+
+    def track_document(self, message: dict[str, Any]) -> dict[str, Any] | None:
+        """Tracks open documents, returning the message to forward (if any)."""
+        method = message.get("method")
+        params = message.get("params") or {}
+        if method == "textDocument/didOpen":
+            item = params["textDocument"]
+            document = self.documents.get(item["uri"])
+            if document is None:
+                self.documents[item["uri"]] = _Document(version=item["version"], text=item["text"])
+                return message
+            # Reopened by a resumed client: the server still has it open, so only replay it if it changed.
+            if document.text != item["text"]:
+                document.version += 1
+                document.text = item["text"]
+                message = {
+                    "jsonrpc": "2.0",
+                    "method": "textDocument/didChange",
+                    "params": {
+                        "textDocument": {"uri": item["uri"], "version": document.version},
+                        "contentChanges": [{"text": item["text"]}],
+                    },
+                }
+            else:
+                message = None
+            document.offset = document.version - item["version"]
+            return message
+        if method == "textDocument/didChange" and (document := self.documents.get(params["textDocument"]["uri"])):
+            document.text = apply_changes(document.text, params["contentChanges"])
+            document.version = params["textDocument"]["version"] + document.offset
+            if document.offset:
+                identifier = {**params["textDocument"], "version": document.version}
+                message = {**message, "params": {**params, "textDocument": identifier}}
+        elif method == "textDocument/didClose":
+            self.documents.pop(params["textDocument"]["uri"], None)
+            self.diagnostics.pop(params["textDocument"]["uri"], None)
+        return message
+
+    def track_server_message(self, message: dict[str, Any]) -> None:
+        """Keeps the state a resumed client needs replayed."""
+        method = message.get("method")
+        params = message.get("params") or {}
+        if method == "textDocument/publishDiagnostics":
+            self.diagnostics[params["uri"]] = message
+        elif method == "client/registerCapability":
+            for registration in params["registrations"]:
+                self.registrations[registration["id"]] = registration
+        elif method == "client/unregisterCapability":
+            # `unregisterations` is the (misspelled) field name in the LSP specification.
+            for registration in params["unregisterations"]:
+                self.registrations.pop(registration["id"], None)
+        elif jsonrpc.is_response(message) and message["id"] == self.initialize_id and "result" in message:
+            self.initialize_result = message["result"]
+
+
+class LanguageServerGateway:
+    """Bridges Monaco language client websockets to stdio language server processes.
+
+    Use it as an async context manager to run the scheduler, and `mount` it on the Reflex backend app.
+
+    Clients connecting with a `?session=<token>` query parameter can resume their session: when the websocket
+    drops, the language server is kept alive for `resume_grace_period` seconds. A reconnecting client with the
+    same token gets the cached `initialize` result, and of the documents it reopens only changed ones are sent
+    to the server.
+
+    Args:
+        command (Sequence[str]): The language server executable and its arguments.
+        cwd (str | os.PathLike | None): The default working directory of the language server processes.
+        scheduler (RequestScheduler | None): The request scheduler, which may be shared between gateways.
+        resume_grace_period (float): Seconds a disconnected session is kept alive. `0` disables resuming.
+        pool_size (int): Number of started, not yet used language server processes kept ready for new sessions.
+        workspace_roots (Sequence[str | os.PathLike]): Directories under which clients may pick the working
+            directory of their language server with a `?workspace=<path or file URI>` query parameter.
+        write_behind (WriteBehind | None): Persists the documents clients edit into the workspace on disk, and
+            flushes a session's pending writes before its heavy commands (e.g. `terraform.validate`) are dispatched.
+        env (Mapping[str, str] | None): Environment variables set for the language server processes, on top of the
+            backend's.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        command: Sequence[str],
+        cwd: str | os.PathLike | None = None,
+        scheduler: RequestScheduler | None = None,
+        resume_grace_period: float = 60.0,
+        pool_size: int = 0,
+        workspace_roots: Sequence[str | os.PathLike] = (),
+        write_behind: WriteBehind | None = None,
+        env: Mapping[str, str] | None = None,
+    ) -> None:
+        self.command = list(command)
+        self.cwd = cwd
+        self.scheduler = scheduler or RequestScheduler()
+        self.resume_grace_period = resume_grace_period
+        self.pool_size = pool_size
+        self.workspace_roots = [pathlib.Path(root).resolve() for root in workspace_roots]
+        self.write_behind = write_behind
+        self.env = dict(env or {})
+        self._sessions: dict[str, _Session] = {}
+        self._tokens: dict[str, _Session] = {}
+        self._warm: deque[asyncio.subprocess.Process] = deque()
+        self._filling: asyncio.Task | None = None
+
+    async def __aenter__(self) -> Self:
+        """Starts the request scheduler and the warm process pool."""
+        await self.scheduler.__aenter__()
+        await self._fill_pool()
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        """Stops the request scheduler and terminates all language server processes."""
+        await self.scheduler.__aexit__()
+        if self._filling:
+            self._filling.cancel()
+        for session in list(self._sessions.values()):
+            await self._close_session(session)
+        while self._warm:
+            await self._terminate(self._warm.popleft())
+
+    def routes(self, path: str) -> list[BaseRoute]:
+        """Returns the websocket route and the `<path>/metrics` JSON route of the gateway."""
+        return [WebSocketRoute(path, self.handle), Route(f"{path}/metrics", self.metrics_endpoint)]
+
+    def mount(self, app: Starlette, path: str) -> None:
+        """Mounts the gateway routes ahead of the app's catch-all mounts.
+
+        Args:
+            app (Starlette): The Reflex backend app, as passed to lifespan tasks.
+            path (str): The websocket path, e.g. `/lsp/terraform`.
+        """
+        app.router.routes[0:0] = self.routes(path)
+
+    def metrics(self) -> dict[str, Any]:
+        """Returns the session counts and scheduler metrics."""
+        detached = sum(1 for session in self._sessions.values() if session.websocket is None)
+        return {
+            "sessions": len(self._sessions),
+            "detached_sessions": detached,
+            "warm_processes": len(self._warm),
+            **({"write_behind": self.write_behind.metrics()} if self.write_behind else {}),
+            **self.scheduler.metrics(),
+        }
+
+    async def metrics_endpoint(self, _: Request) -> JSONResponse:
+        """Serves the gateway metrics as JSON."""
+        return JSONResponse(self.metrics())
+
+    async def handle(self, websocket: WebSocket) -> None:
+        """Serves one language client websocket connection."""
+        await websocket.accept()
+        token = websocket.query_params.get("session")
+        workspace = websocket.query_params.get("workspace")
+        cwd = self.cwd
+        if workspace and (cwd := self._route_workspace(workspace)) is None:
+            await websocket.close(code=1008, reason=f"Workspace {workspace} is not served by this gateway")
+            return
+        session = self._resume(token) or await self._open_session(token, cwd)
+        session.websocket = websocket
+        try:
+            while True:
+                message = json.loads(await websocket.receive_text())
+                await self._handle_client_message(session, message)
+        except WebSocketDisconnect:
+            pass
+        except json.JSONDecodeError as err:
+            console.debug(f"Closing language client of session {session.id} after a malformed message: {err}")
+            with contextlib.suppress(RuntimeError):
+                await websocket.close(code=1007, reason="Malformed JSON-RPC message")
+        except RuntimeError as err:
+            console.debug(f"Closing language client of session {session.id}: {err}")
+            with contextlib.suppress(RuntimeError):
+                await websocket.close(code=1011, reason="Language server is not running")
+        finally:
+            await self._detach(session, websocket)
+
+    def _resume(self, token: str | None) -> _Session | None:
+        session = self._tokens.get(token) if token else None
+        if session is None or session.websocket is not None or session.process.returncode is not None:
+            return None
+        if session.expiry:
+            session.expiry.cancel()
+            session.expiry = None
+        session.generation += 1
+        console.debug(f"Resuming language server session {session.id}")
+        return session
+
+    def _route_workspace(self, workspace: str) -> pathlib.Path | None:
+        path = pathlib.Path(workspace.removeprefix("file://")).resolve()
+        if path.is_dir() and any(path == root or root in path.parents for root in self.workspace_roots):
+            return path
+        return None
+
+    async def _spawn(self, cwd: str | os.PathLike | None) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            env={**os.environ, **self.env} if self.env else None,
+        )
+
+    async def _fill_pool(self) -> None:
+        while len(self._warm) < self.pool_size:
+            self._warm.append(await self._spawn(self.cwd))
+
+    async def _take_process(self, cwd: str | os.PathLike | None) -> asyncio.subprocess.Process:
+        if cwd != self.cwd or not self.pool_size:
+            return await self._spawn(cwd)
+        while self._warm:
+            process = self._warm.popleft()
+            if process.returncode is None:
+                break
+        else:
+            process = await self._spawn(cwd)
+        if self._filling is None or self._filling.done():
+            self._filling = asyncio.create_task(self._fill_pool())
+        return process
+
+    async def _open_session(self, token: str | None, cwd: str | os.PathLike | None) -> _Session:
+        session = _Session(id=uuid.uuid4().hex, process=await self._take_process(cwd))
+        if token and self.resume_grace_period and token not in self._tokens:
+            session.token = token
+            self._tokens[token] = session
+        session.reader = asyncio.create_task(self._forward_server_messages(session))
+        self._sessions[session.id] = session
+        return session
+
+    async def _detach(self, session: _Session, websocket: WebSocket) -> None:
+        if session.websocket is not websocket:
+            return
+        session.websocket = None
+        self.scheduler.remove_session(session.id)
+        if session.token is None or session.exited or session.process.returncode is not None:
+            await self._close_session(session)
+            return
+        # Nobody is left to read the answers of the dropped connection's requests.
+        for request_id in session.pending:
+            with contextlib.suppress(RuntimeError):
+                session.send({"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": request_id}})
+        session.pending.clear()
+        session.expiry = asyncio.create_task(self._expire(session))
+
+    async def _expire(self, session: _Session) -> None:
+        await asyncio.sleep(self.resume_grace_period)
+        session.expiry = None
+        await self._close_session(session)
+
+    async def _close_session(self, session: _Session) -> None:
+        self._sessions.pop(session.id, None)
+        if session.token:
+            self._tokens.pop(session.token, None)
+        self.scheduler.remove_session(session.id)
+        for task in (session.expiry, session.reader):
+            if task and task is not asyncio.current_task():
+                task.cancel()
+        await self._terminate(session.process)
+
+    async def _terminate(self, process: asyncio.subprocess.Process) -> None:
+        if process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except TimeoutError:
+                process.kill()
+
+    async def _send_client(self, session: _Session, message: dict[str, Any]) -> None:
+        if session.websocket is not None:
+            with contextlib.suppress(WebSocketDisconnect, RuntimeError):
+                await session.websocket.send_text(json.dumps(message))
+
+    async def _handle_client_request(self, session: _Session, message: dict[str, Any]) -> None:
+        method = message["method"]
+        if method == "initialize" and session.initialize_result is not None:
+            session.cached_initialize = True
+            await self._send_client(
+                session, {"jsonrpc": "2.0", "id": message["id"], "result": session.initialize_result}
+            )
+            return
+        # Namespace IDs per connection so late answers to a dropped connection are not misrouted.
+        request_id = f"{session.generation}:{message['id']}"
+        session.pending[request_id] = message["id"]
+        if method == "initialize":
+            session.initialize_id = request_id
+        if self.write_behind and classify(method) == Priority.HEAVY:
+            # Commands read the workspace on disk, so it must have the editor's content first.
+            await self.write_behind.flush(session.documents)
+        request = {**message, "id": request_id}
+        self.scheduler.submit(session.id, request, lambda: session.send(request))
+
+    async def _handle_client_message(self, session: _Session, message: dict[str, Any]) -> None:
+        method = message.get("method")
+        if jsonrpc.is_request(message):
+            await self._handle_client_request(session, message)
+        elif jsonrpc.is_response(message):
+            if message["id"] in session.replayed:
+                session.replayed.discard(message["id"])
+            else:
+                session.send(message)
+        elif method == "$/cancelRequest":
+            request_id = f"{session.generation}:{message['params']['id']}"
+            if self.scheduler.cancel(session.id, request_id):
+                # The server never saw the request, so the gateway answers it.
+                session.pending.pop(request_id, None)
+                error = jsonrpc.error_response(message["params"]["id"], jsonrpc.REQUEST_CANCELLED, "Request cancelled")
+                await self._send_client(session, error)
+            else:
+                session.send({**message, "params": {"id": request_id}})
+        elif method == "initialized" and session.cached_initialize:
+            session.cached_initialize = False
+            await self._replay(session)
+        elif (message := session.track_document(message)) is not None:
+            session.exited = session.exited or method == "exit"
+            # Queued requests were made against the documents before this notification changes them.
+            self.scheduler.notify(session.id, functools.partial(session.send, message))
+            if self.write_behind and message.get("method") == "textDocument/didChange":
+                uri = message["params"]["textDocument"]["uri"]
+                if document := session.documents.get(uri):
+                    self.write_behind.update(uri, document.text)
+
+    async def _replay(self, session: _Session) -> None:
+        if session.registrations:
+            request_id = f"gateway:{session.generation}"
+            session.replayed.add(request_id)
+            registrations = {"registrations": list(session.registrations.values())}
+            await self._send_client(
+                session,
+                {"jsonrpc": "2.0", "id": request_id, "method": "client/registerCapability", "params": registrations},
+            )
+        for diagnostics in session.diagnostics.values():
+            await self._send_client(session, diagnostics)
+
+    async def _forward_server_messages(self, session: _Session) -> None:
+        while (message := await jsonrpc.read_message(session.process.stdout)) is not None:
+            session.track_server_message(message)
+            if jsonrpc.is_response(message):
+                self.scheduler.complete(session.id, message["id"])
+                if message["id"] not in session.pending:
+                    continue
+                message = {**message, "id": session.pending.pop(message["id"])}
+            if session.websocket is not None:
+                await self._send_client(session, message)
+            elif jsonrpc.is_request(message):
+                # Answer server requests on behalf of a disconnected client.
+                session.send({"jsonrpc": "2.0", "id": message["id"], "result": None})
+        if session.websocket is not None:
+            with contextlib.suppress(RuntimeError):
+                await session.websocket.close()
+        await self._close_session(session)
+
+
+__all__ = (
+    "LanguageServerGateway",
+    "Priority",
+    "RequestScheduler",
+    "TokenBucket",
+    "apply_changes",
+    "classify",
+    "position_offset",
+)
@@ -0,0 +1,84 @@
+"""JSON-RPC message framing and helpers for talking to language servers over stdio."""
+
+import asyncio
+import json
+from typing import Any, Final
+
+CONTENT_LENGTH: Final = b"Content-Length"
+REQUEST_CANCELLED: Final = -32800
+SERVER_BUSY: Final = -32803
+
+
+def encode_message(message: dict[str, Any]) -> bytes:
+    """Encodes a JSON-RPC message with its LSP base protocol header.
+
+    Args:
+        message (dict[str, Any]): The JSON-RPC message.
+
+    Returns:
+        bytes: The framed message ready to write to a language server.
+    """
+    body = json.dumps(message, separators=(",", ":")).encode()
+    return CONTENT_LENGTH + b": " + str(len(body)).encode() + b"\r\n\r\n" + body
+
+
+async def read_message(reader: asyncio.StreamReader) -> dict[str, Any] | None:
+    """Reads a single framed JSON-RPC message from a language server.
+
+    Args:
+        reader (asyncio.StreamReader): The language server's stdout stream.
+
+    Returns:
+        dict[str, Any] | None: The decoded message, or `None` once the stream is closed.
+    """
+    length = 0
+    while True:
+        try:
+            line = await reader.readuntil(b"\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        if line == b"\r\n":
+            break
+        name, _, value = line.partition(b":")
+        if name.strip() == CONTENT_LENGTH:
+            length = int(value.strip())
+    try:
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+    return json.loads(body)
+
+
+def is_request(message: dict[str, Any]) -> bool:
+    """Returns whether the message is a request (has both a `method` and an `id`)."""
+    return "method" in message and "id" in message
+
+
+def is_response(message: dict[str, Any]) -> bool:
+    """Returns whether the message is a response to a request."""
+    return "method" not in message and "id" in message
+
+
+def error_response(request_id: int | str, code: int, message: str) -> dict[str, Any]:
+    """Builds a JSON-RPC error response.
+
+    Args:
+        request_id (int | str): The ID of the request being answered.
+        code (int): The JSON-RPC error code.
+        message (str): The human readable error message.
+
+    Returns:
+        dict[str, Any]: The error response message.
+    """
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+__all__ = (
+    "REQUEST_CANCELLED",
+    "SERVER_BUSY",
+    "encode_message",
+    "error_response",
+    "is_request",
+    "is_response",
+    "read_message",
+)
@@ -0,0 +1,408 @@
+// Shared language client transport of the monaco editors (see `LanguageClientConfig.shared_worker`).
+//
+// Runs as a SharedWorker, so every tab of an origin talks to the same instance. Each tab's language client connects
+// through its own MessageChannel, and all clients of the same server URL are multiplexed onto one websocket:
+//
+// - Request IDs are rewritten per server, and responses are routed back to the client that sent the request.
+// - The server is initialized once; later clients get the cached `initialize` result and the dynamic capability
+//   registrations, and their `initialized`, `shutdown` and `exit` messages are answered or dropped here.
+// - Documents open in several tabs are opened once. The server holds the text of the tab that changed the document
+//   last: its incremental changes are forwarded, and a change from another tab is sent as the full text.
+// - Requests from the server go to the oldest client; diagnostics go to every client that has the document open.
+// - When the websocket drops, it is reopened with backoff and the server re-initialized with the open documents.
+//
+// Tabs hold a Web Lock for each connection, which this worker waits for to notice closed tabs.
+
+const RECONNECT_DELAYS = [1000, 2000, 5000, 10000, 30000];
+// Milliseconds the websocket is kept open without clients, so reloads reuse the warm server.
+const IDLE_TIMEOUT = 10000;
+const CONNECTION_LOST = {code: -32603, message: "Language server connection lost"};
+
+const servers = new Map();
+
+const offsetAt = (text, {line, character}) => {
+    let offset = 0;
+    for (let current = 0; current < line; current++) {
+        const next = text.indexOf("\n", offset);
+        if (next === -1) {
+            return text.length;
+        }
+        offset = next + 1;
+    }
+    const end = text.indexOf("\n", offset);
+    return Math.min(offset + character, end === -1 ? text.length : end);
+};
+
+const applyChanges = (text, changes) => changes.reduce((current, change) => (
+    change.range
+        ? current.slice(0, offsetAt(current, change.range.start))
+            + change.text
+            + current.slice(offsetAt(current, change.range.end))
+        : change.text
+), text);
+
+class Server {
+    constructor(key, url) {
+        this.key = key;
+        this.url = url;
+        this.clients = [];
+        this.nextId = 0;
+        // Server request ID -> {client, id} of the client request it was sent for.
+        this.pending = new Map();
+        // Server-to-client request ID -> the client it was sent to.
+        this.requests = new Map();
+        this.initializeParams = undefined;
+        this.initializeResult = undefined;
+        this.initializeId = undefined;
+        this.initializing = [];
+        this.registrations = new Map();
+        // URI -> {owner, languageId, version}; the text is the owner's.
+        this.documents = new Map();
+        this.diagnostics = new Map();
+        this.queue = [];
+        this.attempt = 0;
+        this.connect();
+    }
+
+    connect() {
+        this.socket = new WebSocket(this.url);
+        this.socket.onopen = () => {
+            this.attempt = 0;
+            const reinitialized = Boolean(this.initializeParams && this.initializeResult);
+            if (reinitialized) {
+                this.reinitialize();
+            }
+            // Document syncs queued while disconnected are covered by reopening the documents.
+            this.queue.splice(0)
+                .filter((message) => !(reinitialized && message.method?.startsWith("textDocument/did")))
+                .forEach((message) => this.socket.send(JSON.stringify(message)));
+        };
+        this.socket.onmessage = (event) => this.receive(JSON.parse(event.data));
+        this.socket.onclose = () => this.disconnected();
+    }
+
+    send(message) {
+        if (this.socket.readyState === WebSocket.OPEN) {
+            this.socket.send(JSON.stringify(message));
+        } else {
+            this.queue.push(message);
+        }
+    }
+
+    request(client, message) {
+        const id = ++this.nextId;
+        this.pending.set(id, {client, id: message.id});
+        client.requests.set(message.id, id);
+        this.send({...message, id});
+    }
+
+    reinitialize() {
+        // The server forgot everything: initialize it again (its result is already known to the clients) and
+        // reopen the documents with the text of their owners.
+        this.initializeId = ++this.nextId;
+        this.socket.send(JSON.stringify({jsonrpc: "2.0", id: this.initializeId, method: "initialize", params: this.initializeParams}));
+        this.socket.send(JSON.stringify({jsonrpc: "2.0", method: "initialized", params: {}}));
+        for (const [uri, document] of this.documents) {
+            const text = document.owner.documents.get(uri)?.text ?? "";
+            this.socket.send(JSON.stringify({
+                jsonrpc: "2.0",
+                method: "textDocument/didOpen",
+                params: {textDocument: {uri, languageId: document.languageId, version: document.version, text}},
+            }));
+        }
+    }
+
+    disconnected() {
+        for (const [, {client, id}] of this.pending) {
+            client.post({jsonrpc: "2.0", id, error: CONNECTION_LOST});
+        }
+        this.pending.clear();
+        this.requests.clear();
+        if (this.initializeParams && !this.initializeResult) {
+            // Initialization itself failed; let the clients retry it.
+            this.initializing.splice(0).forEach(({client, id}) => client.post({jsonrpc: "2.0", id, error: CONNECTION_LOST}));
+            this.initializeParams = undefined;
+        }
+        if (!this.clients.length) {
+            servers.delete(this.key);
+            return;
+        }
+        const delay = RECONNECT_DELAYS[Math.min(this.attempt++, RECONNECT_DELAYS.length - 1)];
+        setTimeout(() => this.connect(), delay);
+    }
+
+    receive(message) {
+        if (message.id !== undefined && message.method === undefined) {
+            this.respond(message);
+        } else if (message.id !== undefined) {
+            this.serverRequest(message);
+        } else {
+            this.notify(message);
+        }
+    }
+
+    respond(message) {
+        if (message.id === this.initializeId) {
+            this.initializeId = undefined;
+            if (this.initializeResult) {
+                return;  // A re-initialization; the clients already have the result.
+            }
+            if (message.error) {
+                this.initializeParams = undefined;
+            } else {
+                this.initializeResult = message.result;
+            }
+            this.initializing.splice(0).forEach(({client, id}) => client.post({...message, id}));
+            return;
+        }
+        const pending = this.pending.get(message.id);
+        if (pending) {
+            this.pending.delete(message.id);
+            pending.client.requests.delete(pending.id);
+            pending.client.post({...message, id: pending.id});
+        }
+    }
+
+    serverRequest(message) {
+        if (message.method === "client/registerCapability") {
+            message.params.registrations.forEach((registration) => this.registrations.set(registration.id, registration));
+        } else if (message.method === "client/unregisterCapability") {
+            message.params.unregisterations.forEach(({id}) => this.registrations.delete(id));
+        }
+        const client = this.clients.find((candidate) => candidate.initialized);
+        if (!client) {
+            this.send({jsonrpc: "2.0", id: message.id, result: null});
+            return;
+        }
+        this.requests.set(message.id, client);
+        client.post(message);
+    }
+
+    notify(message) {
+        if (message.method === "textDocument/publishDiagnostics") {
+            const uri = message.params.uri;
+            this.diagnostics.set(uri, message);
+            this.clients.filter((client) => client.documents.has(uri)).forEach((client) => client.post(message));
+        } else if (message.method === "$/progress") {
+            // Progress tokens are created by requests, which went to the oldest client.
+            this.clients.find((client) => client.initialized)?.post(message);
+        } else {
+            this.clients.forEach((client) => client.post(message));
+        }
+    }
+
+    attach(client) {
+        clearTimeout(this.idleTimer);
+        this.clients.push(client);
+    }
+
+    detach(client) {
+        this.clients = this.clients.filter((candidate) => candidate !== client);
+        for (const [id, pending] of this.pending) {
+            if (pending.client === client) {
+                this.pending.delete(id);
+                this.send({jsonrpc: "2.0", method: "$/cancelRequest", params: {id}});
+            }
+        }
+        for (const [id, target] of this.requests) {
+            if (target === client) {
+                this.requests.delete(id);
+                this.send({jsonrpc: "2.0", id, result: null});
+            }
+        }
+        for (const uri of client.documents.keys()) {
+            client.close(uri);
+        }
+        this.initializing = this.initializing.filter((waiting) => waiting.client !== client);
+        if (!this.clients.length) {
+            this.idleTimer = setTimeout(() => {
+                if (!this.clients.length) {
+                    servers.delete(this.key);
+                    this.socket.onclose = null;
+                    this.socket.close();
+                }
+            }, IDLE_TIMEOUT);
+        }
+    }
+}
+
+class Client {
+    constructor(server, port) {
+        this.server = server;
+        this.port = port;
+        this.initialized = false;
+        // Client request ID -> server request ID.
+        this.requests = new Map();
+        // URI -> {text, version} as this tab has it.
+        this.documents = new Map();
+        this.registrationRequests = 0;
+        port.onmessage = (event) => this.receive(event.data);
+        server.attach(this);
+    }
+
+    post(message) {
+        this.port.postMessage(message);
+    }
+
+    receive(message) {
+        if (message.id !== undefined && message.method === undefined) {
+            this.respond(message);
+        } else if (message.id !== undefined) {
+            this.request(message);
+        } else {
+            this.notify(message);
+        }
+    }
+
+    respond(message) {
+        if (typeof message.id === "string" && message.id.startsWith("shared-worker:")) {
+            return;  // The answer to a replayed capability registration.
+        }
+        if (this.server.requests.get(message.id) === this) {
+            this.server.requests.delete(message.id);
+            this.server.send(message);
+        }
+    }
+
+    request(message) {
+        const server = this.server;
+        if (message.method === "initialize") {
+            if (server.initializeResult) {
+                this.post({jsonrpc: "2.0", id: message.id, result: server.initializeResult});
+                return;
+            }
+            server.initializing.push({client: this, id: message.id});
+            if (!server.initializeParams) {
+                server.initializeParams = message.params;
+                server.initializeId = ++server.nextId;
+                server.send({...message, id: server.initializeId});
+            }
+        } else if (message.method === "shutdown") {
+            this.post({jsonrpc: "2.0", id: message.id, result: null});
+        } else {
+            server.request(this, message);
+        }
+    }
+
+    notify(message) {
+        const server = this.server;
+        const params = message.params;
+        switch (message.method) {
+            case "initialized":
+                if (server.clients.some((client) => client.initialized)) {
+                    this.replayRegistrations();
+                } else {
+                    server.send(message);
+                }
+                this.initialized = true;
+                break;
+            case "exit":
+                break;
+            case "$/cancelRequest":
+                if (this.requests.has(params.id)) {
+                    server.send({...message, params: {id: this.requests.get(params.id)}});
+                }
+                break;
+            case "textDocument/didOpen":
+                this.open(params.textDocument);
+                break;
+            case "textDocument/didChange":
+                this.change(params.textDocument.uri, params.contentChanges);
+                break;
+            case "textDocument/didClose":
+                this.close(params.textDocument.uri);
+                break;
+            default:
+                server.send(message);
+        }
+    }
+
+    replayRegistrations() {
+        if (this.server.registrations.size) {
+            this.post({
+                jsonrpc: "2.0",
+                id: `shared-worker:${++this.registrationRequests}`,
+                method: "client/registerCapability",
+                params: {registrations: [...this.server.registrations.values()]},
+            });
+        }
+    }
+
+    open({uri, languageId, version, text}) {
+        this.documents.set(uri, {text, version});
+        const document = this.server.documents.get(uri);
+        if (!document) {
+            this.server.documents.set(uri, {owner: this, languageId, version});
+            this.server.send({jsonrpc: "2.0", method: "textDocument/didOpen", params: {textDocument: {uri, languageId, version, text}}});
+        } else if (document.owner.documents.get(uri)?.text !== text) {
+            this.sync(uri, document, [{text}]);
+        } else if (this.server.diagnostics.has(uri)) {
+            this.post(this.server.diagnostics.get(uri));
+        }
+    }
+
+    change(uri, changes) {
+        const local = this.documents.get(uri);
+        const document = this.server.documents.get(uri);
+        if (!local || !document) {
+            return;
+        }
+        local.text = applyChanges(local.text, changes);
+        this.sync(uri, document, document.owner === this ? changes : [{text: local.text}]);
+    }
+
+    sync(uri, document, contentChanges) {
+        document.owner = this;
+        document.version += 1;
+        this.server.send({
+            jsonrpc: "2.0",
+            method: "textDocument/didChange",
+            params: {textDocument: {uri, version: document.version}, contentChanges},
+        });
+    }
+
+    close(uri) {
+        this.documents.delete(uri);
+        const document = this.server.documents.get(uri);
+        if (!document) {
+            return;
+        }
+        const holder = this.server.clients.find((client) => client !== this && client.documents.has(uri));
+        if (!holder) {
+            this.server.documents.delete(uri);
+            this.server.diagnostics.delete(uri);
+            this.server.send({jsonrpc: "2.0", method: "textDocument/didClose", params: {textDocument: {uri}}});
+        } else if (document.owner === this) {
+            this.sync(uri, document, [{text: holder.documents.get(uri).text}]);
+            document.owner = holder;
+        }
+    }
+
+    disconnect() {
+        this.port.onmessage = null;
+        this.port.close();
+        this.server.detach(this);
+    }
+}
+
+const connect = ({url, sessionResume, lock}, port) => {
+    let server = servers.get(url);
+    if (!server) {
+        // One gateway session for all tabs, resumed by the gateway when the websocket reconnects.
+        const target = sessionResume ? `${url}${url.includes("?") ? "&" : "?"}session=${crypto.randomUUID()}` : url;
+        server = new Server(url, target);
+        servers.set(url, server);
+    }
+    const client = new Client(server, port);
+    // Granted once the tab releases the lock: the connection was disposed or the tab is gone.
+    navigator.locks.request(lock, () => client.disconnect());
+};
+
+self.onconnect = (event) => {
+    const [tab] = event.ports;
+    tab.onmessage = (message) => {
+        if (message.data?.connect) {
+            connect(message.data.connect, message.ports[0]);
+        }
+    };
+};
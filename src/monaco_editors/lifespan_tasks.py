@@ -1,12 +1,21 @@
 """Async context managers for managing Terraform Language Server and LSP WebSocket proxy lifecycle."""
 
-from collections.abc import AsyncGenerator
+import asyncio
+import contextlib
+import os
+from collections.abc import AsyncGenerator, Sequence
 from contextlib import asynccontextmanager
 from typing import Any
 
-from reflex.utils.processes import new_process
+from starlette.applications import Starlette
 
-from .terraform import download_lsp_ws_proxy, download_terraform_ls, get_bin_dir
+from .documents import DocumentServer, DocumentStore
+from .gateway import LanguageServerGateway, RequestScheduler
+from .models import LanguageServerSpec
+from .preindex import PLUGIN_CACHE_ENV, WorkspacePreindexer, plugin_cache_dir
+from .search import WorkspaceIndex
+from .workspace import WorkspaceFileServer
+from .write_behind import WriteBehind
 
 
 @asynccontextmanager
@@ -19,6 +28,11 @@ async def start_terraform_ls(port: int = 9999) -> AsyncGenerator[None, Any, None
     Yields:
         None: Yields control while the server is running.
     """
+    # The Terraform tooling (and its network and archive imports) is only loaded when Terraform is served.
+    from reflex.utils.processes import new_process
+
+    from .terraform import download_lsp_ws_proxy, download_terraform_ls, get_bin_dir
+
     download_terraform_ls()
     download_lsp_ws_proxy()
     bin_dir = get_bin_dir()
@@ -29,4 +43,262 @@ async def start_terraform_ls(port: int = 9999) -> AsyncGenerator[None, Any, None
     proc.wait()
 
 
-__all__ = ("start_terraform_ls",)
+def _terraform_ls_path() -> str:
+    from .terraform import download_terraform_ls, get_bin_dir
+
+    download_terraform_ls()
+    return str(get_bin_dir() / "terraform-ls")
+
+
+def terraform_language_server(
+    pool_size: int | None = None,
+    workspace_roots: Sequence[str] = (),
+    cwd: str | None = None,
+    cache_dir: str | os.PathLike | None = None,
+) -> LanguageServerSpec:
+    """Returns the spec serving the downloaded `terraform-ls` through `start_language_servers`.
+
+    Args:
+        pool_size (int | None, optional): Warm processes kept ready. Defaults to None (scaled to the cores).
+        workspace_roots (Sequence[str], optional): Directories clients may route sessions into. Defaults to ().
+        cwd (str | None, optional): Default working directory of the server processes. Defaults to None.
+        cache_dir (str | os.PathLike | None, optional): The `preindex_workspaces` cache directory, whose provider
+            plugin cache every `terraform` the servers run reuses. Defaults to None.
+
+    Returns:
+        LanguageServerSpec: The Terraform language server spec.
+    """
+    return LanguageServerSpec(
+        language_id="terraform",
+        command=_terraform_ls_path,
+        args=["serve"],
+        pool_size=pool_size,
+        workspace_roots=list(workspace_roots),
+        cwd=cwd,
+        env={PLUGIN_CACHE_ENV: str(plugin_cache_dir(cache_dir))} if cache_dir else {},
+    )
+
+
+@asynccontextmanager
+async def start_terraform_gateway(
+    app: Starlette,
+    path: str = "/lsp/terraform",
+    scheduler: RequestScheduler | None = None,
+    resume_grace_period: float = 60.0,
+    write_behind: WriteBehind | None = None,
+    cache_dir: str | os.PathLike | None = None,
+) -> AsyncGenerator[None, Any, None]:
+    """Serves the Terraform Language Server through the backend's language server gateway.
+
+    Unlike `start_terraform_ls`, no separate proxy port is opened: language clients connect to the Reflex backend
+    at `path`, and requests from all sessions are scheduled fairly (see `RequestScheduler`).
+
+    Args:
+        app (Starlette): The Reflex backend app, injected by Reflex.
+        path (str, optional): Websocket path to serve the language server on. Defaults to "/lsp/terraform".
+        scheduler (RequestScheduler | None, optional): Custom request scheduler. Defaults to None.
+        resume_grace_period (float, optional): Seconds a disconnected session's language server is kept alive for
+            the client to resume it. Defaults to 60.
+        write_behind (WriteBehind | None, optional): Persists edited documents into the workspace on disk, so
+            commands like `terraform.validate` see them. Defaults to None.
+        cache_dir (str | os.PathLike | None, optional): The `preindex_workspaces` cache directory, whose provider
+            plugin cache the servers reuse. Defaults to None.
+
+    Yields:
+        None: Yields control while the gateway is running.
+    """
+    spec = terraform_language_server(cache_dir=cache_dir)
+    # Resolving the command may download terraform-ls, so run it off the event loop.
+    command = await asyncio.to_thread(spec.resolve_command)
+    gateway = LanguageServerGateway(
+        command,
+        scheduler=scheduler,
+        resume_grace_period=resume_grace_period,
+        write_behind=write_behind,
+        env=spec.env,
+    )
+    gateway.mount(app, path)
+    async with contextlib.AsyncExitStack() as stack:
+        if write_behind:
+            await stack.enter_async_context(write_behind)
+        await stack.enter_async_context(gateway)
+        yield
+
+
+def available_cores() -> int:
+    """Returns the number of CPU cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+@asynccontextmanager
+async def start_language_servers(
+    app: Starlette,
+    specs: Sequence[LanguageServerSpec],
+    path_prefix: str = "/lsp",
+    scheduler: RequestScheduler | None = None,
+    resume_grace_period: float = 60.0,
+    write_behind: WriteBehind | None = None,
+) -> AsyncGenerator[None, Any, None]:
+    """Serves several language servers through one backend gateway.
+
+    Every spec is served at `<path_prefix>/<language_id>`, and all of them share one request scheduler sized to
+    the available cores. Specs without a `pool_size` split half of the cores between them as warm processes.
+
+    Args:
+        app (Starlette): The Reflex backend app, injected by Reflex.
+        specs (Sequence[LanguageServerSpec]): The language servers to serve.
+        path_prefix (str, optional): Websocket path prefix. Defaults to "/lsp".
+        scheduler (RequestScheduler | None, optional): Custom request scheduler. Defaults to None.
+        resume_grace_period (float, optional): Seconds a disconnected session's language server is kept alive for
+            the client to resume it. Defaults to 60.
+        write_behind (WriteBehind | None, optional): Persists edited documents into the workspace on disk, shared
+            by all the gateways. Defaults to None.
+
+    Yields:
+        None: Yields control while the gateway is running.
+    """
+    cores = available_cores()
+    auto_pools = sum(1 for spec in specs if spec.pool_size is None)
+    auto_pool_size = max(1, cores // (2 * auto_pools)) if auto_pools else 0
+    scheduler = scheduler or RequestScheduler(max_in_flight=cores * 2)
+    # Resolvers may download binaries, so run them off the event loop.
+    commands = await asyncio.gather(*(asyncio.to_thread(spec.resolve_command) for spec in specs))
+    async with contextlib.AsyncExitStack() as stack:
+        if write_behind:
+            # Entered first, so its pending writes are flushed after the gateways stop.
+            await stack.enter_async_context(write_behind)
+        for spec, command in zip(specs, commands, strict=True):
+            gateway = LanguageServerGateway(
+                command,
+                cwd=spec.cwd,
+                scheduler=scheduler,
+                resume_grace_period=resume_grace_period,
+                pool_size=auto_pool_size if spec.pool_size is None else spec.pool_size,
+                workspace_roots=spec.workspace_roots,
+                write_behind=write_behind,
+                env=spec.env,
+            )
+            gateway.mount(app, f"{path_prefix}/{spec.language_id}")
+            await stack.enter_async_context(gateway)
+        yield
+
+
+@asynccontextmanager
+async def serve_workspace_files(
+    app: Starlette,
+    roots: Sequence[str | os.PathLike],
+    path: str = "/workspace/files",
+    page_size: int = 500,
+) -> AsyncGenerator[None, Any, None]:
+    """Serves the files under `roots` to editors configured with `WorkspaceFiles`.
+
+    Args:
+        app (Starlette): The Reflex backend app, injected by Reflex.
+        roots (Sequence[str | os.PathLike]): The directories whose files may be served.
+        path (str, optional): Route prefix of the file routes. Defaults to "/workspace/files".
+        page_size (int, optional): Maximum entries per directory listing page. Defaults to 500.
+
+    Yields:
+        None: Yields control while the files are served.
+    """
+    WorkspaceFileServer(roots, page_size=page_size).mount(app, path)
+    yield
+
+
+@asynccontextmanager
+async def serve_documents(
+    app: Starlette, store: DocumentStore, path: str = "/documents"
+) -> AsyncGenerator[None, Any, None]:
+    """Serves a document store to editors bound to a `document_id` (see `DocumentSync`).
+
+    Args:
+        app (Starlette): The Reflex backend app, injected by Reflex.
+        store (DocumentStore): The document store, e.g. a `RedisDocumentStore` shared with the app's event handlers.
+        path (str, optional): Route prefix of the document routes. Defaults to "/documents".
+
+    Yields:
+        None: Yields control while the documents are served.
+    """
+    DocumentServer(store).mount(app, path)
+    yield
+
+
+@asynccontextmanager
+async def serve_workspace_search(
+    app: Starlette, index: WorkspaceIndex, path: str = "/workspace/search", interval: float = 5.0
+) -> AsyncGenerator[None, Any, None]:
+    """Keeps a workspace search index current and serves it (see `WorkspaceIndex.search_endpoint`).
+
+    The index is built in the background, so startup isn't held up by large workspaces, then refreshed every
+    `interval` seconds with the files changed since.
+
+    Args:
+        app (Starlette): The Reflex backend app, injected by Reflex.
+        index (WorkspaceIndex): The index, shared with the app's event handlers that search it.
+        path (str, optional): Route of the search endpoint. Defaults to "/workspace/search".
+        interval (float, optional): Seconds between refreshes. Defaults to 5.
+
+    Yields:
+        None: Yields control while the index is kept current.
+    """
+    index.mount(app, path)
+    task = asyncio.create_task(index.watch(interval))
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+@asynccontextmanager
+async def preindex_workspaces(
+    workspaces: Sequence[str | os.PathLike],
+    cache_dir: str | os.PathLike,
+    max_workers: int | None = None,
+    terraform: str = "terraform",
+) -> AsyncGenerator[None, Any, None]:
+    """Pre-indexes Terraform workspaces in the background into a cache shared by the language servers.
+
+    Pass the same `cache_dir` to `terraform_language_server` or `start_terraform_gateway`: every `terraform` the
+    language servers run (schema loading, `terraform.init`) then reuses the providers downloaded here. See
+    `WorkspacePreindexer`.
+
+    Args:
+        workspaces (Sequence[str | os.PathLike]): The Terraform root module directories to pre-index.
+        cache_dir (str | os.PathLike): The shared cache directory, e.g. on a volume kept across deploys.
+        max_workers (int | None, optional): Workspaces indexed at once. Defaults to None (half the cores).
+        terraform (str, optional): The `terraform` executable. Defaults to "terraform".
+
+    Yields:
+        None: Yields control while the workspaces are pre-indexed and the cache is in use.
+    """
+    preindexer = WorkspacePreindexer(
+        workspaces,
+        cache_dir,
+        max_workers=max_workers or max(1, available_cores() // 2),
+        terraform=terraform,
+    )
+    task = asyncio.create_task(preindexer.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+__all__ = (
+    "available_cores",
+    "preindex_workspaces",
+    "serve_documents",
+    "serve_workspace_files",
+    "serve_workspace_search",
+    "start_language_servers",
+    "start_terraform_gateway",
+    "start_terraform_ls",
+    "terraform_language_server",
+)
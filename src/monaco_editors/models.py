@@ -1,6 +1,8 @@
 """Models and configuration classes for Monaco editor integration with language servers."""
 
-from typing import Annotated, Any, Literal, TypedDict
+import os
+from collections.abc import Callable
+from typing import Annotated, Any, Literal, NotRequired, TypedDict
 
 import reflex as rx
 from pydantic import BaseModel, Field, PlainValidator
@@ -16,12 +18,15 @@ class Command(BaseModel):
         method (str): The LSP method to send (based on the specific language server).
         params (dict[str, Any]): The parameters to send.
         restart_client: (bool): If the editor's language client should be restarted after command completion.
+        concurrency (int): How many executions of the command may run at once. Further executions are queued, and
+            an execution with the same arguments as a queued or running one joins it instead of running again.
     """
 
     type: Literal["notification", "request"]
     method: str
     params: dict[str, Any]
     restart_client: bool = False
+    concurrency: Annotated[int, Field(default=1, ge=1)]
 
 
 class LanguageServerUrl(BaseModel):
@@ -49,6 +54,33 @@ class LanguageServerUrl(BaseModel):
         return f"{schema}://{self.host}:{self.port}{path}"
 
 
+MiddlewareMethod = Literal[
+    "textDocument/codeLens",
+    "textDocument/completion",
+    "textDocument/documentLink",
+    "textDocument/hover",
+    "textDocument/signatureHelp",
+]
+
+
+class ClientMiddleware(BaseModel):
+    """Language client request middleware.
+
+    Used to keep fast typing from piling up stale requests on the language server.
+
+    Params:
+        cancel_superseded (list[MiddlewareMethod]): Methods whose in-flight request is cancelled (`$/cancelRequest`)
+            when a newer one for the same document and method is issued.
+        cache_results (list[MiddlewareMethod]): Idempotent methods whose results are cached per document version.
+    """
+
+    cancel_superseded: Annotated[
+        list[MiddlewareMethod],
+        Field(default=["textDocument/completion", "textDocument/hover", "textDocument/codeLens"]),
+    ]
+    cache_results: Annotated[list[MiddlewareMethod], Field(default=["textDocument/hover", "textDocument/documentLink"])]
+
+
 def _var_validator(value: rx.Var) -> str:
     if not isinstance(value, rx.Var):
         msg = f"Value {value} must be passed as an rx.Var"
@@ -65,6 +97,13 @@ class LanguageClientConfig(BaseModel):
         register_commands (dict[str, Command]): The mapping of command names and configs to register wuth the editor.
         document_selector (list[str | dict[str, str]] | None): The optional document selector for the LSP.
         initialization_options (dict): The language-specific LSP opts to provide the language server upon connection.
+        middleware (ClientMiddleware | None): The optional request cancellation and caching middleware.
+        session_resume (bool): Whether to resume the gateway session after a websocket drop
+            (see `start_terraform_gateway`).
+        workspace_routing (bool): Whether to ask the gateway to run the session's language server in the editor's
+            workspace folder (see `LanguageServerSpec.workspace_roots`).
+        shared_worker (bool): Whether to connect through a SharedWorker that multiplexes the language clients of all
+            tabs onto one connection per server URL.
     """
 
     language_id: str
@@ -72,6 +111,170 @@ class LanguageClientConfig(BaseModel):
     register_commands: Annotated[str, PlainValidator(_var_validator), Field(default="")]
     document_selector: Annotated[list[str | dict[str, str]] | None, Field(default=None)]
     initialization_options: Annotated[str, PlainValidator(_var_validator), Field(default="")]
+    middleware: Annotated[ClientMiddleware | None, Field(default=None)]
+    session_resume: Annotated[bool, Field(default=False)]
+    workspace_routing: Annotated[bool, Field(default=False)]
+    shared_worker: Annotated[bool, Field(default=False)]
+
+
+class LargeFilePolicy(BaseModel):
+    """Feature degradation for large files.
+
+    Above either threshold the editor turns off expensive features (`editor_options`), loads the content in chunks,
+    and only syncs the document with its language servers (and fires `on_change`) on save (Ctrl/Cmd+S).
+
+    Params:
+        max_lines (int): The line count above which a file is large.
+        max_bytes (int): The UTF-8 size above which a file is large.
+        chunk_size (int): The characters loaded into the editor per chunk (split at line ends).
+        editor_options (dict[str, Any]): The Monaco editor options applied to large files.
+    """
+
+    max_lines: Annotated[int, Field(default=50_000, gt=0)]
+    max_bytes: Annotated[int, Field(default=5 * 1024 * 1024, gt=0)]
+    chunk_size: Annotated[int, Field(default=256 * 1024, gt=0)]
+    editor_options: Annotated[
+        dict[str, Any],
+        Field(
+            default={
+                "codeLens": False,
+                "minimap": {"enabled": False},
+                "guides": {"bracketPairs": False, "bracketPairsHorizontal": False, "indentation": False},
+                "bracketPairColorization": {"enabled": False},
+                "folding": False,
+                "occurrencesHighlight": "off",
+                "wordWrap": "off",
+                "largeFileOptimizations": True,
+            }
+        ),
+    ]
+
+
+class StreamConfig(BaseModel):
+    """Append-only streaming for a read-only editor, e.g. `terraform plan` output.
+
+    Chunks sent with `monaco_editor.append` are applied as edits at the end of the document, so the cost of an
+    update is proportional to the chunk rather than the whole log.
+
+    Params:
+        max_lines (int): The lines kept in the editor; the oldest are dropped as new chunks are appended.
+        auto_scroll (bool): Whether to follow the end of the log while the view is scrolled to the end.
+    """
+
+    max_lines: Annotated[int, Field(default=100_000, gt=0)]
+    auto_scroll: Annotated[bool, Field(default=True)]
+
+
+class DiffConfig(BaseModel):
+    """Diff editor options (see the `original` prop).
+
+    Diffs are computed in the editor's web worker, so large diffs don't block the page.
+
+    Params:
+        max_computation_time (int): Milliseconds the worker may spend on a diff before giving up (0 for no limit).
+        max_file_size (int): The largest file, in MB, that is diffed at all (0 for no limit).
+        render_side_by_side (bool): Whether to show the sides next to each other rather than inline.
+        original_editable (bool): Whether the original side can be edited.
+    """
+
+    max_computation_time: Annotated[int, Field(default=1000, ge=0)]
+    max_file_size: Annotated[int, Field(default=50, ge=0)]
+    render_side_by_side: Annotated[bool, Field(default=True)]
+    original_editable: Annotated[bool, Field(default=False)]
+
+
+class ModelCache(BaseModel):
+    """An LRU of the editor's open files.
+
+    When `filename` changes, the previous file's model (with its tokenization and language server state) and view
+    state (scroll, cursor, folding) are kept, and re-used when the file is opened again. The least recently used
+    models are closed (sending `didClose` to the language servers) once either limit is exceeded.
+
+    Params:
+        max_models (int): The most models kept open, including the current one.
+        max_bytes (int): The most text kept open across the models, in UTF-16 code units.
+    """
+
+    max_models: Annotated[int, Field(default=20, gt=0)]
+    max_bytes: Annotated[int, Field(default=50 * 1024 * 1024, gt=0)]
+
+
+class WorkspaceFiles(BaseModel):
+    """Lazily fetched workspace files (see `serve_workspace_files`).
+
+    Files under the editor's `workspace_folder` that aren't open (e.g. the target of a go-to-definition into another
+    module file) are fetched from the backend when the editor first reads them, and kept in a browser-side cache that
+    is revalidated with each file's ETag.
+
+    Params:
+        url (str): The base URL of the backend's workspace file routes, e.g. `http://localhost:8000/workspace/files`.
+        page_size (int): The directory entries fetched per listing request.
+        cache_size (int): The most files whose content is kept in the browser.
+        stat_ttl (int): Milliseconds fetched file metadata is trusted before it is revalidated.
+    """
+
+    url: str
+    page_size: Annotated[int, Field(default=500, gt=0)]
+    cache_size: Annotated[int, Field(default=200, ge=0)]
+    stat_ttl: Annotated[int, Field(default=2000, ge=0)]
+
+
+class DocumentSync(BaseModel):
+    """Loads and saves the editor's document through the backend's document routes (see `serve_documents`).
+
+    With a `document_id`, the editor loads the document's chunks (cached by the browser) instead of a `value`, and
+    sends its edits to the backend as deltas, so Reflex state only holds the ID.
+
+    Params:
+        url (str): The base URL of the backend's document routes, e.g. `http://localhost:8000/documents`.
+        debounce (int): Milliseconds of typing batched into one delta request.
+    """
+
+    url: str
+    debounce: Annotated[int, Field(default=300, ge=0)]
+
+
+class DiagnosticsConfig(BaseModel):
+    """Which language server diagnostics the editor's `on_diagnostics` forwards, and how often.
+
+    Diagnostics changed in between are batched, and a document is only sent when its (filtered) diagnostics differ
+    from the last ones sent for it.
+
+    Params:
+        min_severity (Literal["error", "warning", "information", "hint"]): The least severe diagnostics sent.
+        max_rate (float): The most batches sent per second.
+    """
+
+    min_severity: Annotated[Literal["error", "warning", "information", "hint"], Field(default="hint")]
+    max_rate: Annotated[float, Field(default=1.0, gt=0)]
+
+
+class LanguageServerSpec(BaseModel):
+    """A language server served by the backend gateway (see `start_language_servers`).
+
+    Params:
+        language_id (str): The language ID. The server is served at `<path_prefix>/<language_id>`.
+        command (str | Callable[[], str | os.PathLike]): The server executable, or a resolver returning its path
+            (e.g. one that downloads it first).
+        args (list[str]): The server's command line arguments.
+        pool_size (int | None): Started processes kept ready for new sessions. `None` scales it to the available cores.
+        cwd (str | None): The default working directory of the server processes.
+        workspace_roots (list[str]): Directories under which clients may route their session's working directory.
+        env (dict[str, str]): Environment variables set for the server processes, on top of the backend's.
+    """
+
+    language_id: str
+    command: str | Callable[[], str | os.PathLike]
+    args: Annotated[list[str], Field(default=[])]
+    pool_size: Annotated[int | None, Field(default=None, ge=0)]
+    cwd: Annotated[str | None, Field(default=None)]
+    workspace_roots: Annotated[list[str], Field(default=[])]
+    env: Annotated[dict[str, str], Field(default={})]
+
+    def resolve_command(self) -> list[str]:
+        """Returns the server command line, calling the `command` resolver if needed."""
+        executable = self.command() if callable(self.command) else self.command
+        return [str(executable), *self.args]
 
 
 class TextModel(TypedDict):
@@ -84,9 +287,175 @@ class TextModel(TypedDict):
     original: str
 
 
+class DiffTextModel(TypedDict, total=False):
+    """The response model sent by a diff editor's `onChange`, with only the side that changed."""
+
+    modified: str
+    original: str
+
+
+class DiffHunk(TypedDict):
+    """A changed range of lines between the original and modified text, as computed by `compute_hunks`.
+
+    Line numbers are 1-based and inclusive. An end line of 0 means the side has no lines in the hunk (an insertion or
+    deletion after the start line).
+    """
+
+    originalStartLineNumber: int
+    originalEndLineNumber: int
+    modifiedStartLineNumber: int
+    modifiedEndLineNumber: int
+
+
+class Position(TypedDict):
+    """A 0-based line and UTF-16 character position, as in LSP."""
+
+    line: int
+    character: int
+
+
+class Range(TypedDict):
+    """A range between two positions, as in LSP."""
+
+    start: Position
+    end: Position
+
+
+class TextChange(TypedDict):
+    """A text edit of a range, as in LSP's `TextDocumentContentChangeEvent`."""
+
+    range: Range
+    text: str
+
+
+class TextDelta(TypedDict):
+    """The response model sent by the editor's `onDelta`.
+
+    The `changes` apply in order to the previous text of the `side` (see `gateway.apply_changes`).
+    """
+
+    side: Literal["original", "modified"]
+    version: int
+    changes: list[TextChange]
+
+
+class CursorChange(TypedDict):
+    """The response model sent by the editor's `onCursorChange`.
+
+    The `source` is Monaco's, e.g. "keyboard", "mouse" or "api".
+    """
+
+    uri: str
+    position: Position
+    source: str
+
+
+class SelectionChange(TypedDict):
+    """The response model sent by the editor's `onSelectionChange`; the primary selection is first."""
+
+    uri: str
+    selections: list[Range]
+    source: str
+
+
+class ScrollChange(TypedDict):
+    """The response model sent by the editor's `onScroll`, with the scroll offsets in pixels."""
+
+    uri: str
+    scrollTop: int
+    scrollLeft: int
+    visibleRanges: list[Range]
+
+
+class Diagnostic(TypedDict):
+    """A language server diagnostic, as in LSP, with a named severity."""
+
+    range: Range
+    severity: Literal["error", "warning", "information", "hint"]
+    message: str
+    source: NotRequired[str]
+    code: NotRequired[str]
+
+
+class DocumentDiagnostics(TypedDict):
+    """The diagnostics of a document, and a hash of them. An empty list means they were cleared."""
+
+    uri: str
+    hash: str
+    diagnostics: list[Diagnostic]
+
+
+class CommandProgress(TypedDict):
+    """The response model sent by the editor's `onCommandProgress`.
+
+    The `status` is that of one execution of the command `name`; `running` and `queued` count all its executions
+    after the change. Failed executions have the `error` message.
+    """
+
+    name: str
+    status: Literal["queued", "started", "completed", "failed", "cancelled"]
+    running: int
+    queued: int
+    error: NotRequired[str]
+
+
+class SearchQuery(TypedDict):
+    """The response model sent by the editor's `onSearch`.
+
+    The `query` is the selected text, or the word at the cursor, and `uri` the document it was searched from.
+    """
+
+    query: str
+    uri: str
+
+
+class SearchMatch(TypedDict):
+    """A match of a workspace search (see `WorkspaceIndex.search`).
+
+    Lines and columns are 1-based, as the editor counts them, and the end is exclusive.
+    """
+
+    path: str
+    uri: str
+    line: int
+    column: int
+    end_line: int
+    end_column: int
+    preview: str
+
+
+class SearchResults(TypedDict):
+    """A page of ranked workspace search matches, the number of matches found, and the offset of the next page."""
+
+    matches: list[SearchMatch]
+    total: int
+    next: int | None
+
+
 __all__ = (
+    "ClientMiddleware",
     "Command",
+    "CommandProgress",
+    "CursorChange",
+    "Diagnostic",
+    "DiagnosticsConfig",
+    "DiffConfig",
+    "DiffHunk",
+    "DiffTextModel",
+    "DocumentDiagnostics",
+    "DocumentSync",
     "LanguageClientConfig",
+    "LanguageServerSpec",
     "LanguageServerUrl",
+    "LargeFilePolicy",
+    "ModelCache",
+    "ScrollChange",
+    "SearchMatch",
+    "SearchQuery",
+    "SearchResults",
+    "SelectionChange",
+    "StreamConfig",
+    "TextDelta",
     "TextModel",
+    "WorkspaceFiles",
 )
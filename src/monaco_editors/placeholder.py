@@ -0,0 +1,218 @@
+"""Server-side syntax highlighting for the static placeholder shown until the editor starts."""
+
+import hashlib
+import html
+import keyword
+import re
+from collections import OrderedDict
+from pathlib import PurePosixPath
+
+# Lines of `value` rendered in the placeholder; about a screenful, the rest is never painted before the editor starts.
+PLACEHOLDER_LINES = 200
+# Maximum number of distinct texts whose highlighted placeholders are kept.
+PLACEHOLDER_CACHE_SIZE = 256
+_PLACEHOLDER_CACHE: OrderedDict[str, str] = OrderedDict()
+
+# Token colors of the "Default Light Modern" and "Default Dark Modern" themes, picked by the page's color scheme.
+_COLORS = {
+    "comment": "light-dark(#008000, #6a9955)",
+    "string": "light-dark(#a31515, #ce9178)",
+    "number": "light-dark(#098658, #b5cea8)",
+    "keyword": "light-dark(#0000ff, #569cd6)",
+}
+# Roughly the editor's default font and line height, so the swap doesn't shift the text.
+FONT_STYLE = "white-space:pre;font-family:Menlo,Monaco,'Courier New',monospace;font-size:14px;line-height:19px"
+# The editor's line-number gutter is about 64px wide.
+PLACEHOLDER_STYLE = f"margin:0;padding:0 0 0 64px;overflow:hidden;height:100%;{FONT_STYLE}"
+
+_NUMBER = r"\b\d+(?:\.\d+)?\b"
+_STRING = r'"(?:[^"\\\n]|\\.)*"?'
+_SINGLE_QUOTED_STRING = r"'(?:[^'\\\n]|\\.)*'?"
+_HASH_COMMENT = r"#[^\n]*"
+_C_COMMENTS = r"//[^\n]*|/\*[\s\S]*?(?:\*/|$)"
+_LANGUAGES: dict[str, tuple[str, frozenset[str]]] = {
+    "hcl": (
+        f"{_HASH_COMMENT}|{_C_COMMENTS}",
+        frozenset(
+            {
+                "resource",
+                "data",
+                "variable",
+                "output",
+                "module",
+                "provider",
+                "locals",
+                "terraform",
+                "moved",
+                "import",
+                "check",
+                "removed",
+                "for",
+                "in",
+                "if",
+                "else",
+                "endif",
+                "endfor",
+                "true",
+                "false",
+                "null",
+                "dynamic",
+            }
+        ),
+    ),
+    "python": (_HASH_COMMENT, frozenset(keyword.kwlist)),
+    "yaml": (_HASH_COMMENT, frozenset(("true", "false", "null", "yes", "no", "on", "off"))),
+    "json": ("", frozenset(("true", "false", "null"))),
+    "javascript": (
+        _C_COMMENTS,
+        frozenset(
+            {
+                "async",
+                "await",
+                "break",
+                "case",
+                "catch",
+                "class",
+                "const",
+                "continue",
+                "default",
+                "delete",
+                "do",
+                "else",
+                "export",
+                "extends",
+                "false",
+                "finally",
+                "for",
+                "from",
+                "function",
+                "if",
+                "import",
+                "in",
+                "instanceof",
+                "let",
+                "new",
+                "null",
+                "return",
+                "switch",
+                "this",
+                "throw",
+                "true",
+                "try",
+                "typeof",
+                "undefined",
+                "var",
+                "void",
+                "while",
+                "yield",
+                "interface",
+                "type",
+                "enum",
+                "implements",
+            }
+        ),
+    ),
+    "shell": (
+        _HASH_COMMENT,
+        frozenset(
+            {
+                "if",
+                "then",
+                "else",
+                "elif",
+                "fi",
+                "for",
+                "while",
+                "do",
+                "done",
+                "case",
+                "esac",
+                "function",
+                "in",
+                "export",
+            }
+        ),
+    ),
+}
+_EXTENSIONS = {
+    ".tf": "hcl",
+    ".tfvars": "hcl",
+    ".hcl": "hcl",
+    ".py": "python",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".json": "json",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "javascript",
+    ".tsx": "javascript",
+    ".sh": "shell",
+}
+_PATTERNS = {
+    language: re.compile(
+        "|".join(
+            f"(?P<{name}>{pattern})"
+            for name, pattern in (
+                ("comment", comments),
+                ("string", _STRING if language == "json" else f"{_STRING}|{_SINGLE_QUOTED_STRING}"),
+                ("number", _NUMBER),
+                ("word", r"\b[A-Za-z_]\w*\b"),
+            )
+            if pattern
+        )
+    )
+    for language, (comments, _) in _LANGUAGES.items()
+}
+
+
+def _highlight(text: str, language: str | None) -> str:
+    """Returns the text as HTML, with its tokens colored in `language`'s syntax."""
+    if language is None:
+        return html.escape(text)
+    keywords = _LANGUAGES[language][1]
+    parts = []
+    position = 0
+    for match in _PATTERNS[language].finditer(text):
+        kind = match.lastgroup
+        if kind == "word":
+            if match.group() not in keywords:
+                continue
+            kind = "keyword"
+        parts.append(html.escape(text[position : match.start()]))
+        parts.append(f'<span style="color:{_COLORS[kind]}">{html.escape(match.group())}</span>')
+        position = match.end()
+    parts.append(html.escape(text[position:]))
+    return "".join(parts)
+
+
+def highlight_placeholder(
+    text: str, filename: str, max_lines: int = PLACEHOLDER_LINES, style: str = PLACEHOLDER_STYLE
+) -> str:
+    """Renders the start of a text as a syntax-highlighted static HTML view.
+
+    The editor shows it until Monaco has loaded and started, instead of an empty area. It's generated for a literal
+    `value` automatically; for a state-bound `value`, compute it in the state (e.g. a computed var) and pass it as the
+    editor's `placeholder`. Results are cached by a hash of the text and language.
+
+    Args:
+        text (str): The editor text.
+        filename (str): The file name, whose extension picks the syntax (Terraform, Python, YAML, JSON, JS/TS, shell).
+        max_lines (int): How many lines to render.
+        style (str): The CSS of the `pre` element.
+
+    Returns:
+        str: The HTML of a `pre` element.
+    """
+    language = _EXTENSIONS.get(PurePosixPath(filename).suffix.lower())
+    head = "\n".join(text.split("\n", max_lines)[:max_lines])
+    key = hashlib.sha256(f"{language}:{style}:{head}".encode()).hexdigest()
+    if (rendered := _PLACEHOLDER_CACHE.get(key)) is None:
+        rendered = _PLACEHOLDER_CACHE[key] = f'<pre style="{html.escape(style)}">{_highlight(head, language)}</pre>'
+        if len(_PLACEHOLDER_CACHE) > PLACEHOLDER_CACHE_SIZE:
+            _PLACEHOLDER_CACHE.popitem(last=False)
+    else:
+        _PLACEHOLDER_CACHE.move_to_end(key)
+    return rendered
+
+
+__all__ = ("highlight_placeholder",)
@@ -0,0 +1,186 @@
+"""Background pre-indexing of Terraform workspaces, sharing downloaded providers between language server processes.
+
+A fresh `terraform-ls` has no provider schemas for a workspace until its providers and modules are installed, which
+is why `getProviders` returns nothing until the user runs `terraform.init`. `WorkspacePreindexer` does that ahead of
+time: it runs `terraform init` in every configured workspace, with providers downloaded once into a plugin cache
+directory that every `terraform` run by the language servers reuses (`TF_PLUGIN_CACHE_DIR`). Terraform doesn't
+support concurrent use of the plugin cache, so the inits run one at a time; the rest of the work runs across a
+worker pool.
+
+What the language servers reuse is that plugin cache and each workspace's `.terraform` directory: `terraform-ls`
+loads provider schemas itself, by running `terraform providers schema -json` in the workspace, and cannot be given
+schemas from elsewhere. The schema JSON persisted per workspace, keyed by its dependency lock file, only marks the
+workspace as up to date, so it's skipped on the next start; `WorkspacePreindexer.schema` exposes it to other tooling.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+from collections.abc import Sequence
+from typing import Any, Final, Literal
+
+from reflex.utils import console
+
+PLUGIN_CACHE_ENV: Final = "TF_PLUGIN_CACHE_DIR"
+LOCK_FILE: Final = ".terraform.lock.hcl"
+
+Status = Literal["cached", "indexed", "failed"]
+
+
+def _write_json(path: pathlib.Path, data: Any) -> None:  # noqa: ANN401
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        pathlib.Path(temporary).replace(path)
+    except BaseException:
+        pathlib.Path(temporary).unlink(missing_ok=True)
+        raise
+
+
+def plugin_cache_dir(cache_dir: str | os.PathLike) -> pathlib.Path:
+    """Returns the provider plugin cache inside a pre-index cache directory."""
+    return pathlib.Path(cache_dir).resolve() / "plugins"
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    with contextlib.suppress(ProcessLookupError):
+        process.kill()
+
+
+class WorkspacePreindexer:
+    """Installs the providers and modules of Terraform workspaces and caches their provider schemas.
+
+    Args:
+        workspaces (Sequence[str | os.PathLike]): The Terraform root module directories to pre-index.
+        cache_dir (str | os.PathLike): The shared cache directory. Providers go into `<cache_dir>/plugins` and
+            the up-to-date markers (the workspaces' provider schemas) into `<cache_dir>/schemas`.
+        max_workers (int): The maximum number of workspaces indexed at once.
+        terraform (str): The `terraform` executable.
+        timeout (float): Seconds each `terraform` command may run.
+    """
+
+    def __init__(
+        self,
+        workspaces: Sequence[str | os.PathLike],
+        cache_dir: str | os.PathLike,
+        max_workers: int = 4,
+        terraform: str = "terraform",
+        timeout: float = 600.0,
+    ) -> None:
+        self.workspaces = [pathlib.Path(workspace).resolve() for workspace in workspaces]
+        self.cache_dir = pathlib.Path(cache_dir).resolve()
+        self.max_workers = max_workers
+        self.terraform = terraform
+        self.timeout = timeout
+        self.results: dict[pathlib.Path, Status] = {}
+        self._init_lock = asyncio.Lock()
+
+    @property
+    def plugin_cache_dir(self) -> pathlib.Path:
+        """The provider plugin cache shared by every `terraform` process that has `TF_PLUGIN_CACHE_DIR` set to it."""
+        return plugin_cache_dir(self.cache_dir)
+
+    def environment(self) -> dict[str, str]:
+        """Returns the environment `terraform` runs with, using the shared plugin cache."""
+        return {**os.environ, PLUGIN_CACHE_ENV: str(self.plugin_cache_dir), "TF_IN_AUTOMATION": "1"}
+
+    def schema_path(self, workspace: str | os.PathLike) -> pathlib.Path | None:
+        """Returns where a workspace's provider schemas are cached, or None before it has a dependency lock file."""
+        try:
+            lock = (pathlib.Path(workspace) / LOCK_FILE).read_bytes()
+        except FileNotFoundError:
+            return None
+        return self.cache_dir / "schemas" / f"{hashlib.sha256(lock).hexdigest()}.json"
+
+    def schema(self, workspace: str | os.PathLike) -> dict[str, Any] | None:
+        """Returns the cached `terraform providers schema -json` output of a workspace, if any.
+
+        The language servers don't read it (`terraform-ls` loads schemas from the workspace itself); it's for other
+        tooling, e.g. offline checks of resource attributes.
+        """
+        if (path := self.schema_path(workspace)) is None:
+            return None
+        with contextlib.suppress(FileNotFoundError, json.JSONDecodeError):
+            return json.loads(path.read_text(encoding="utf-8"))
+        return None
+
+    async def run(self) -> dict[pathlib.Path, Status]:
+        """Pre-indexes all workspaces, at most `max_workers` at once.
+
+        Returns:
+            dict[pathlib.Path, Status]: Whether each workspace was already cached, indexed, or failed.
+        """
+        self.plugin_cache_dir.mkdir(parents=True, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def work(workspace: pathlib.Path) -> None:
+            async with semaphore:
+                self.results[workspace] = await self.index(workspace)
+
+        await asyncio.gather(*(work(workspace) for workspace in self.workspaces))
+        counts = {status: list(self.results.values()).count(status) for status in ("cached", "indexed", "failed")}
+        console.info(f"Pre-indexed Terraform workspaces: {counts}")
+        return dict(self.results)
+
+    async def index(self, workspace: pathlib.Path) -> Status:
+        """Installs a workspace's providers and modules and caches its provider schemas, unless already done.
+
+        A workspace is up to date when it still has its `.terraform` directory and its schemas are cached for its
+        current dependency lock file.
+        """
+        path = self.schema_path(workspace)
+        if path is not None and path.exists() and (workspace / ".terraform").is_dir():
+            return "cached"
+        # Inits installing the same provider at once can corrupt the shared plugin cache.
+        async with self._init_lock:
+            init = await self._terraform(workspace, "init", "-input=false", "-backend=false", "-no-color")
+        if init is None:
+            return "failed"
+        schema = await self._terraform(workspace, "providers", "schema", "-json")
+        if schema is None or (path := self.schema_path(workspace)) is None:
+            return "failed"
+        try:
+            await asyncio.to_thread(_write_json, path, json.loads(schema))
+        except (OSError, json.JSONDecodeError) as error:
+            console.warn(f"Caching the provider schemas of {workspace} failed: {error}")
+            return "failed"
+        return "indexed"
+
+    async def _terraform(self, workspace: pathlib.Path, *args: str) -> bytes | None:
+        """Runs a `terraform` command in a workspace, returning its output, or None (with a warning) if it fails."""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.terraform,
+                *args,
+                cwd=workspace,
+                env=self.environment(),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as error:
+            console.warn(f"Running terraform {args[0]} in {workspace} failed: {error}")
+            return None
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+        except TimeoutError:
+            _kill(process)
+            await process.wait()
+            console.warn(f"terraform {args[0]} in {workspace} timed out after {self.timeout}s")
+            return None
+        except asyncio.CancelledError:
+            _kill(process)
+            raise
+        if process.returncode:
+            console.warn(f"terraform {args[0]} in {workspace} failed: {stderr.decode(errors='replace').strip()}")
+            return None
+        return stdout
+
+
+__all__ = ("LOCK_FILE", "PLUGIN_CACHE_ENV", "WorkspacePreindexer", "plugin_cache_dir")
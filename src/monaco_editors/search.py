@@ -0,0 +1,352 @@
+"""Trigram-indexed find-in-files over the workspace directories.
+
+`WorkspaceIndex` keeps the text of the workspace files in memory together with an inverted index from every
+(lowercased) three-character substring to the files containing it. A query only scans the files containing all of
+the trigrams of its literal parts, so searching a large monorepo takes milliseconds instead of a full scan. The
+index is kept current incrementally: `refresh` re-reads only the files whose mtime or size changed.
+"""
+
+import asyncio
+import bisect
+import dataclasses
+import fnmatch
+import itertools
+import os
+import pathlib
+import re
+from collections.abc import Sequence
+from typing import Final
+
+from reflex.utils import console
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import BaseRoute, Route
+
+from .models import SearchMatch, SearchResults
+
+# Matches collected per query; ranking and paging only see these.
+MAX_MATCHES: Final = 10_000
+# Characters of a matching line sent as its preview.
+MAX_PREVIEW: Final = 250
+# Regex characters that end a run of literal characters.
+_SPECIAL: Final = frozenset(".^$*+?{}[]()|\\")
+_ESCAPE: Final = re.compile(r"\\(?:x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|[0-9]+|.)", re.DOTALL)
+_CLASS: Final = re.compile(r"\[\^?\]?(?:\\.|[^\]\\])*\]", re.DOTALL)
+# Group 1 is the minimum repetition when it is not zero.
+_QUANTIFIER: Final = re.compile(r"\{(?:0*([1-9][0-9]*)|0*)(?:,[0-9]*)?\}")
+_VERBOSE: Final = re.compile(r"\(\?[a-zA-Z]*x")
+
+
+@dataclasses.dataclass
+class _File:
+    text: str
+    trigrams: frozenset[str]
+    line_starts: list[int] = dataclasses.field(default_factory=list)
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Returns the 1-based line and UTF-16 column of a text offset, as the editor counts them."""
+        if not self.line_starts:
+            self.line_starts = [0, *(match.end() for match in re.finditer("\n", self.text))]
+        line = bisect.bisect_right(self.line_starts, offset) - 1
+        prefix = self.text[self.line_starts[line] : offset]
+        return line + 1, len(prefix.encode("utf-16-le")) // 2 + 1
+
+    def line(self, number: int) -> str:
+        """Returns the text of a 1-based line without its line break."""
+        start = self.line_starts[number - 1]
+        end = self.line_starts[number] - 1 if number < len(self.line_starts) else len(self.text)
+        return self.text[start:end].rstrip("\r")
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """Returns the lowercased three-character substrings of a text."""
+    text = text.lower()
+    return frozenset(text[i : i + 3] for i in range(len(text) - 2))
+
+
+def literals(pattern: str) -> list[str]:
+    """Returns literal substrings every match of a regular expression contains.
+
+    This is conservative: alternations and verbose patterns yield nothing, and literals inside groups or before an
+    optional quantifier are skipped, so the result may miss literals but never includes one a match lacks.
+    """
+    if "|" in pattern or _VERBOSE.search(pattern):
+        return []
+    runs, run, depth, i = [], "", 0, 0
+    while i < len(pattern):
+        end, literal, optional = _token(pattern, i)
+        if optional:
+            run = run[:-1]
+        depth += {"(": 1, ")": -1}.get(pattern[i], 0)
+        if literal is None:
+            runs.append(run)
+            run = ""
+        elif depth == 0:
+            run += literal
+        i = end
+    runs.append(run)
+    return [run for run in runs if run]
+
+
+def _token(pattern: str, i: int) -> tuple[int, str | None, bool]:
+    """Returns the end of the regex token at `i`, its literal character, and whether it makes the previous optional."""
+    char = pattern[i]
+    if char == "\\":
+        if (escape := _ESCAPE.match(pattern, i)) is None:
+            return len(pattern), None, False
+        text = escape.group()
+        return escape.end(), text[1] if len(text) == 2 and not text[1].isalnum() else None, False  # noqa: PLR2004
+    if char == "[":
+        return (klass.end() if (klass := _CLASS.match(pattern, i)) else len(pattern)), None, False
+    if char == "{" and (quantifier := _QUANTIFIER.match(pattern, i)):
+        return quantifier.end(), None, not quantifier.group(1)
+    return i + 1, None if char in _SPECIAL else char, char in "*?"
+
+
+def _excluded(name: str, exclude: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in exclude)
+
+
+def _read(path: pathlib.Path) -> _File | None:
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    if b"\0" in data[:8192]:
+        return None
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    return _File(text, trigrams(text))
+
+
+def _scan(
+    roots: Sequence[pathlib.Path],
+    known: dict[pathlib.Path, tuple[int, int]],
+    exclude: Sequence[str],
+    max_file_size: int,
+) -> tuple[dict[pathlib.Path, tuple[tuple[int, int], _File | None]], set[pathlib.Path]]:
+    """Walks the roots, reading the files whose (mtime, size) differs from `known`.
+
+    Returns the read files with their (mtime, size), None for files that aren't UTF-8 text, and the paths of the known
+    files that are gone.
+    """
+    changed: dict[pathlib.Path, tuple[tuple[int, int], _File | None]] = {}
+    seen = set()
+    for root in roots:
+        for directory, directories, files in os.walk(root):
+            directories[:] = [name for name in directories if not _excluded(name, exclude)]
+            for name in files:
+                if _excluded(name, exclude):
+                    continue
+                path = pathlib.Path(directory, name)
+                try:
+                    stat_result = path.stat()
+                except OSError:
+                    continue
+                if stat_result.st_size > max_file_size:
+                    continue
+                seen.add(path)
+                key = (stat_result.st_mtime_ns, stat_result.st_size)
+                if known.get(path) != key:
+                    changed[path] = (key, _read(path))
+    return changed, known.keys() - seen
+
+
+def _whole_word(text: str, match: re.Match) -> bool:
+    """Returns whether a match is neither preceded nor followed by a word character."""
+    before = text[match.start() - 1] if match.start() else " "
+    after = text[match.end()] if match.end() < len(text) else " "
+    return not (before.isalnum() or before == "_" or after.isalnum() or after == "_")
+
+
+class WorkspaceIndex:
+    """An incrementally updated trigram index of the text files under the workspace roots.
+
+    Share one instance between `serve_workspace_search`, which keeps it current and serves it over HTTP, and the
+    app's event handlers (e.g. the editor's `on_search`), which call `search` directly.
+
+    Args:
+        roots (Sequence[str | os.PathLike]): The directories to index.
+        exclude (Sequence[str]): Glob patterns of file and directory names to skip. Defaults to hidden names (such
+            as `.git` and `.terraform`) and `node_modules`.
+        max_file_size (int): Files larger than this many bytes are not indexed.
+        page_size (int): The maximum number of matches per page served over HTTP.
+    """
+
+    def __init__(
+        self,
+        roots: Sequence[str | os.PathLike],
+        exclude: Sequence[str] = (".*", "node_modules"),
+        max_file_size: int = 1 << 20,
+        page_size: int = 100,
+    ) -> None:
+        self.roots = [pathlib.Path(root).resolve() for root in roots]
+        self.exclude = tuple(exclude)
+        self.max_file_size = max_file_size
+        self.page_size = page_size
+        self._files: dict[pathlib.Path, _File] = {}
+        # The (mtime, size) of every file seen by the last refresh, including the ones that aren't text.
+        self._seen: dict[pathlib.Path, tuple[int, int]] = {}
+        self._postings: dict[str, set[pathlib.Path]] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        """Returns the number of indexed files."""
+        return len(self._files)
+
+    async def refresh(self) -> int:
+        """Re-reads the files added, changed or removed since the last refresh.
+
+        Files are walked and read in a thread; the index itself is only updated on the event loop, so searches
+        never see it half-updated.
+
+        Returns:
+            int: The number of files added, changed or removed.
+        """
+        async with self._lock:
+            changed, removed = await asyncio.to_thread(
+                _scan, self.roots, dict(self._seen), self.exclude, self.max_file_size
+            )
+            for path in removed:
+                del self._seen[path]
+                self._remove(path)
+            for path, (key, file) in changed.items():
+                self._seen[path] = key
+                self._remove(path)
+                if file is not None:
+                    self._add(path, file)
+            return len(changed) + len(removed)
+
+    async def watch(self, interval: float = 5.0) -> None:
+        """Refreshes the index every `interval` seconds until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except OSError as error:
+                console.error(f"Refreshing the workspace search index failed: {error}")
+            await asyncio.sleep(interval)
+
+    def search(
+        self,
+        query: str,
+        *,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> SearchResults:
+        """Finds the matches of a substring or regular expression in the indexed files.
+
+        Files are ranked by whether their name matches, then by their whole-word and total match counts, and their
+        matches are in line order. At most `MAX_MATCHES` matches are collected.
+
+        Args:
+            query (str): The substring, or the regular expression if `regex` is set.
+            regex (bool): Whether `query` is a regular expression.
+            case_sensitive (bool): Whether letter case must match.
+            offset (int): The number of ranked matches to skip.
+            limit (int): The maximum number of matches to return.
+
+        Returns:
+            SearchResults: A page of ranked matches, the number collected, and the offset of the next page.
+
+        Raises:
+            re.error: If `query` is not a valid regular expression.
+        """
+        if not query:
+            return SearchResults(matches=[], total=0, next=None)
+        flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+        pattern = re.compile(query if regex else re.escape(query), flags)
+        ranked = []
+        collected = 0
+        for path in self._candidates(literals(query) if regex else [query]):
+            file = self._files[path]
+            found = list(itertools.islice(pattern.finditer(file.text), MAX_MATCHES - collected))
+            if not found:
+                continue
+            collected += len(found)
+            words = sum(_whole_word(file.text, match) for match in found)
+            rank = (pattern.search(path.name) is not None, words, len(found))
+            ranked.append((rank, path, found))
+            if collected >= MAX_MATCHES:
+                break
+        ranked.sort(key=lambda item: (tuple(-value for value in item[0]), item[1]))
+        flat = ((path, match) for _, path, found in ranked for match in found)
+        page = [self._match(path, match) for path, match in itertools.islice(flat, offset + limit)][offset:]
+        return SearchResults(matches=page, total=collected, next=offset + limit if offset + limit < collected else None)
+
+    def _candidates(self, parts: list[str]) -> list[pathlib.Path]:
+        """Returns the files containing every trigram of the literal parts, or all files without any trigram."""
+        postings = sorted((self._postings.get(trigram, set()) for part in parts for trigram in trigrams(part)), key=len)
+        if not postings:
+            return sorted(self._files)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates &= posting
+        return sorted(candidates)
+
+    def _match(self, path: pathlib.Path, match: re.Match) -> SearchMatch:
+        file = self._files[path]
+        line, column = file.position(match.start())
+        end_line, end_column = file.position(match.end())
+        return SearchMatch(
+            path=str(path),
+            uri=path.as_uri(),
+            line=line,
+            column=column,
+            end_line=end_line,
+            end_column=end_column,
+            preview=file.line(line)[:MAX_PREVIEW],
+        )
+
+    def _add(self, path: pathlib.Path, file: _File) -> None:
+        self._files[path] = file
+        for trigram in file.trigrams:
+            self._postings.setdefault(trigram, set()).add(path)
+
+    def _remove(self, path: pathlib.Path) -> None:
+        if (file := self._files.pop(path, None)) is None:
+            return
+        for trigram in file.trigrams:
+            posting = self._postings[trigram]
+            posting.discard(path)
+            if not posting:
+                del self._postings[trigram]
+
+    def routes(self, path: str) -> list[BaseRoute]:
+        """Returns the search route."""
+        return [Route(path, self.search_endpoint)]
+
+    def mount(self, app: Starlette, path: str) -> None:
+        """Mounts the search route ahead of the app's catch-all mounts.
+
+        Args:
+            app (Starlette): The Reflex backend app, as passed to lifespan tasks.
+            path (str): The route path, e.g. `/workspace/search`.
+        """
+        app.router.routes[0:0] = self.routes(path)
+
+    async def search_endpoint(self, request: Request) -> Response:
+        """Serves a page of `search` results for the `q`, `regex`, `case`, `offset` and `limit` query parameters."""
+        params = request.query_params
+        try:
+            offset = max(0, int(params.get("offset", 0)))
+            limit = min(self.page_size, max(1, int(params.get("limit", self.page_size))))
+            results = self.search(
+                params.get("q", ""),
+                regex=params.get("regex") in {"1", "true"},
+                case_sensitive=params.get("case") in {"1", "true"},
+                offset=offset,
+                limit=limit,
+            )
+        except (ValueError, re.error):
+            return Response(status_code=400)
+        return JSONResponse(results)
+
+
+__all__ = ("MAX_MATCHES", "MAX_PREVIEW", "WorkspaceIndex", "literals", "trigrams")
@@ -0,0 +1,125 @@
+"""Read-only code snippets sharing one Monaco editor per page."""
+
+from typing import Any
+
+import reflex as rx
+
+from monaco_editors import constants
+
+from .placeholder import FONT_STYLE, highlight_placeholder
+
+# The static view lines up with the shared editor, which has no line numbers or gutter.
+SNIPPET_STYLE = f"margin:0;padding:0;overflow:auto;{FONT_STYLE}"
+
+
+class MonacoSnippet(rx.Component):
+    """Read-only code snippet, shown as static highlighted HTML until it's focused.
+
+    Focusing (or clicking) a snippet moves the page's one shared read-only editor into it, so pages with dozens of
+    snippets pay for a single editor. Off-screen snippets skip rendering (`content-visibility: auto`) and hand the
+    editor back; the editor starts when the first snippet nears the viewport.
+    """
+
+    library = "monaco-languageclient@9.11.0"
+    lib_dependencies = [  # noqa: RUF012
+        "monaco-editor-wrapper@6.12.0",
+        "@codingame/monaco-vscode-api@20.2.1",
+    ]
+
+    @classmethod
+    def create(cls, *children: rx.Component, **props: Any) -> rx.Component:  # noqa: ANN401
+        """Creates the snippet, with its static view as its only child.
+
+        The static view is the highlighted `value`, or plain text for a state-bound `value` without a `placeholder`.
+        """
+        component = super().create(*children, **props)
+        html, value, filename = (
+            x._var_value if isinstance(x, rx.vars.LiteralVar) else x  # noqa: SLF001
+            for x in (component.placeholder, component.value, component.filename)
+        )
+        if html is None and isinstance(value, str) and isinstance(filename, str):
+            html = highlight_placeholder(value, filename, max_lines=value.count("\n") + 1, style=SNIPPET_STYLE)
+        if html is None:
+            static_view = rx.el.pre(
+                component.value,
+                style={
+                    "margin": 0,
+                    "overflow": "auto",
+                    "whiteSpace": "pre",
+                    "fontFamily": "Menlo,Monaco,'Courier New',monospace",
+                    "fontSize": "14px",
+                    "lineHeight": "19px",
+                },
+                custom_attrs={"data-snippet-view": "true"},
+            )
+        else:
+            static_view = rx.el.div(
+                dangerouslySetInnerHTML={"__html": html}, custom_attrs={"data-snippet-view": "true"}
+            )
+        component.children = [static_view]
+        component.custom_attrs = {
+            **component.custom_attrs,
+            "data-monaco-snippet": "true",
+            "data-filename": component.filename,
+            # The shared editor loads the code from here, as the static view may be a truncated placeholder.
+            "data-value": component.value,
+            "data-theme": component.theme,
+            "tabIndex": 0,
+        }
+        component.style.update({"contentVisibility": "auto", "containIntrinsicSize": "auto 10em"})
+        return component
+
+    def add_imports(self) -> dict:
+        """Add imports."""
+        return {
+            "@codingame/monaco-vscode-api": rx.ImportVar("LogLevel", is_default=False, install=False),
+            "monaco-editor-wrapper": [
+                rx.ImportVar("MonacoEditorLanguageClientWrapper", is_default=False, install=False),
+                rx.ImportVar(
+                    "configureDefaultWorkerFactory",
+                    is_default=False,
+                    install=False,
+                    package_path="/workers/workerLoaders",
+                ),
+            ],
+            "@codingame/monaco-vscode-keybindings-service-override": rx.ImportVar(
+                "getKeybindingsServiceOverride", is_default=True, install=False
+            ),
+            "@codingame/monaco-vscode-extensions-service-override": rx.ImportVar(
+                "getExtensionServiceOverride", is_default=True, install=False
+            ),
+            "@codingame/monaco-vscode-configuration-service-override": rx.ImportVar(
+                "updateUserConfiguration", is_default=False, install=False
+            ),
+        }
+
+    def add_custom_code(self) -> list:
+        """Returns the shared snippet editor, registered with each snippet through its ref."""
+        return [constants.FunctionConstants.SNIPPETS]
+
+    def render(self) -> dict:
+        """Render the snippet as a div with its static view.
+
+        Returns:
+            dict: A dictionary containing the component name, filtered props and children.
+        """
+        self.ref = self._ref
+        rendered = super().render()
+        forbidden_props = ("filename", "theme", "value", "placeholder")
+        props = [prop for prop in rendered["props"] if not any(prop.startswith(i) for i in forbidden_props)]
+        return {"name": '"div"', "props": props, "children": rendered.get("children", [])}
+
+    # The callback ref registering the snippet with the shared editor.
+    _ref = rx.Var("registerMonacoSnippet")
+
+    ###### Required Attributes ######
+    # The name of the 'file' the snippet is from; its extension picks the syntax.
+    filename: str | rx.Var[str]
+    # The snippet's code.
+    value: str | rx.Var[str]
+
+    ###### Optional Attributes ######
+    # Theme configured based on Reflex color mode condition.
+    theme = rx.color_mode_cond(dark="Default Dark Modern", light="Default Light Modern")
+    # Highlighted HTML of a state-bound `value` (see `highlight_placeholder`), shown until the snippet is focused.
+    placeholder: str | rx.Var[str] | None = None
@@ -0,0 +1,154 @@
+"""HTTP endpoints serving workspace files to the editors' file system provider on demand.
+
+Instead of pushing whole workspaces into state, editors configured with `WorkspaceFiles` fetch a file only when
+it is opened (e.g. on go-to-definition into another module file), and revalidate what they have cached with the
+file's ETag. Directory listings are paginated so huge directories don't need one huge response.
+"""
+
+import asyncio
+import email.utils
+import os
+import pathlib
+import stat
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, Final
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import BaseRoute, Route
+
+# Sorted directory listings (names only) kept for pagination, keyed by path and directory mtime.
+LISTING_CACHE_SIZE: Final = 64
+
+
+def etag(stat_result: os.stat_result) -> str:
+    """Returns the ETag of a file, derived from its modification time and size."""
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def _entry(stat_result: os.stat_result) -> dict[str, Any]:
+    directory = stat.S_ISDIR(stat_result.st_mode)
+    return {
+        "type": "directory" if directory else "file",
+        "size": stat_result.st_size,
+        "mtime": stat_result.st_mtime_ns // 1_000_000,
+        "etag": None if directory else etag(stat_result),
+    }
+
+
+def _page(directory: pathlib.Path, names: list[str]) -> list[dict[str, Any]]:
+    entries = []
+    for name in names:
+        try:
+            entries.append({"name": name, **_entry((directory / name).stat())})
+        except OSError:
+            continue
+    return entries
+
+
+class WorkspaceFileServer:
+    """Serves files under the workspace roots over HTTP.
+
+    Paths are absolute, as in the editor's `file://` URIs (e.g. `/srv/workspaces/app/main.tf`), and anything
+    outside the roots (including through symlinks) is answered with 404.
+
+    Args:
+        roots (Sequence[str | os.PathLike]): The directories whose files may be served.
+        page_size (int): The maximum number of entries per directory listing page.
+    """
+
+    def __init__(self, roots: Sequence[str | os.PathLike], page_size: int = 500) -> None:
+        self.roots = [pathlib.Path(root).resolve() for root in roots]
+        self.page_size = page_size
+        self._listings: OrderedDict[tuple[pathlib.Path, int], list[str]] = OrderedDict()
+
+    def routes(self, path: str) -> list[BaseRoute]:
+        """Returns the `<path>/stat`, `<path>/list` and `<path>/file` routes."""
+        return [
+            Route(f"{path}/stat", self.stat_endpoint),
+            Route(f"{path}/list", self.list_endpoint),
+            Route(f"{path}/file", self.file_endpoint),
+        ]
+
+    def mount(self, app: Starlette, path: str) -> None:
+        """Mounts the routes ahead of the app's catch-all mounts.
+
+        Args:
+            app (Starlette): The Reflex backend app, as passed to lifespan tasks.
+            path (str): The route prefix, e.g. `/workspace/files`.
+        """
+        app.router.routes[0:0] = self.routes(path)
+
+    def resolve(self, path: str | None) -> pathlib.Path | None:
+        """Returns the resolved path if it exists under one of the roots."""
+        if not path:
+            return None
+        resolved = pathlib.Path(path).resolve()
+        if not any(resolved == root or root in resolved.parents for root in self.roots):
+            return None
+        return resolved if resolved.exists() else None
+
+    async def listing(self, directory: pathlib.Path) -> list[str]:
+        """Returns the sorted entry names of a directory, cached until entries are added, removed or renamed."""
+        key = (directory, (await asyncio.to_thread(directory.stat)).st_mtime_ns)
+        if (names := self._listings.get(key)) is not None:
+            self._listings.move_to_end(key)
+            return names
+        names = self._listings[key] = sorted(await asyncio.to_thread(os.listdir, directory))
+        while len(self._listings) > LISTING_CACHE_SIZE:
+            self._listings.popitem(last=False)
+        return names
+
+    async def stat_endpoint(self, request: Request) -> Response:
+        """Serves the type, size, mtime (ms) and ETag of a file or directory."""
+        if (path := self.resolve(request.query_params.get("path"))) is None:
+            return Response(status_code=404)
+        return JSONResponse(_entry(await asyncio.to_thread(path.stat)))
+
+    async def list_endpoint(self, request: Request) -> Response:
+        """Serves a page of a directory listing, with the `next` cursor or `null` on the last page."""
+        path = self.resolve(request.query_params.get("path"))
+        if path is None or not path.is_dir():
+            return Response(status_code=404)
+        try:
+            cursor = max(0, int(request.query_params.get("cursor", 0)))
+            limit = min(self.page_size, max(1, int(request.query_params.get("limit", self.page_size))))
+        except ValueError:
+            return Response(status_code=400)
+        names = await self.listing(path)
+        # Entries are stat'ed per page, so their ETags are current even when the listing is cached.
+        entries = await asyncio.to_thread(_page, path, names[cursor : cursor + limit])
+        return JSONResponse({"entries": entries, "next": cursor + limit if cursor + limit < len(names) else None})
+
+    async def file_endpoint(self, request: Request) -> Response:
+        """Serves a file's content, or 304 if the client's `If-None-Match`/`If-Modified-Since` is still current."""
+        path = self.resolve(request.query_params.get("path"))
+        if path is None or not path.is_file():
+            return Response(status_code=404)
+        stat_result = await asyncio.to_thread(path.stat)
+        headers = {
+            "ETag": etag(stat_result),
+            "Last-Modified": email.utils.formatdate(stat_result.st_mtime, usegmt=True),
+            "Cache-Control": "no-cache",
+            # The backend is usually on another origin than the frontend.
+            "Access-Control-Expose-Headers": "ETag, Last-Modified",
+        }
+        if _not_modified(request, headers["ETag"], stat_result.st_mtime):
+            return Response(status_code=304, headers=headers)
+        return Response(await asyncio.to_thread(path.read_bytes), headers=headers)
+
+
+def _not_modified(request: Request, current_etag: str, mtime: float) -> bool:
+    if (if_none_match := request.headers.get("if-none-match")) is not None:
+        return current_etag in (tag.strip() for tag in if_none_match.split(","))
+    if (if_modified_since := request.headers.get("if-modified-since")) is not None:
+        try:
+            return int(mtime) <= email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+__all__ = ("LISTING_CACHE_SIZE", "WorkspaceFileServer", "etag")
@@ -0,0 +1,184 @@
+"""Write-behind of editor buffers into the language server workspace on disk.
+
+Language server commands such as `terraform-ls.terraform.validate` read the files on disk, not the editor's buffer.
+`WriteBehind` persists the buffers the gateway tracks without per-keystroke disk I/O: changes to a document are
+coalesced until it has been quiet for `delay` seconds, written atomically, and the written files are fsync'ed in
+batches. Pending writes are flushed before the gateway dispatches a heavy command, so the command sees the editor's
+current content.
+"""
+
+import asyncio
+import contextlib
+import os
+import pathlib
+import tempfile
+import urllib.parse
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from typing import Any, Final, Self
+
+from reflex.utils import console
+
+# The most document URIs whose paths are remembered, so `update` doesn't touch the disk on every change.
+RESOLVE_CACHE_SIZE: Final = 1024
+
+
+def _write_atomic(path: pathlib.Path, text: str) -> bool:
+    """Writes a file by renaming a temporary file over it, unless it already has the text."""
+    with contextlib.suppress(FileNotFoundError, UnicodeDecodeError):
+        # Rewriting an unchanged file would only bump its mtime and make file watchers re-read it.
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    fd, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+            file.write(text)
+        with contextlib.suppress(FileNotFoundError):
+            os.chmod(temporary, path.stat().st_mode & 0o7777)  # noqa: PTH101
+        pathlib.Path(temporary).replace(path)
+    except BaseException:
+        pathlib.Path(temporary).unlink(missing_ok=True)
+        raise
+    return True
+
+
+def _fsync(paths: Iterable[pathlib.Path]) -> None:
+    """Flushes files, then their directories (for the renames), to disk."""
+    paths = list(paths)
+    for path in [*paths, *{path.parent for path in paths}]:
+        with contextlib.suppress(FileNotFoundError):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+
+class WriteBehind:
+    """Coalesced, atomic write-behind of documents into workspace directories.
+
+    Use it as an async context manager (the lifespan tasks do this when it is passed to them), which writes and
+    fsyncs everything still pending on exit.
+
+    Args:
+        roots (Sequence[str | os.PathLike]): The directories documents may be written to. Documents whose `file://`
+            URI is elsewhere are ignored.
+        delay (float): Seconds a document must be unchanged before it is written.
+        fsync_delay (float): Seconds after a write before the files written since are fsync'ed together.
+    """
+
+    def __init__(self, roots: Sequence[str | os.PathLike], delay: float = 1.0, fsync_delay: float = 5.0) -> None:
+        self.roots = [pathlib.Path(root).resolve() for root in roots]
+        self.delay = delay
+        self.fsync_delay = fsync_delay
+        self._paths: OrderedDict[str, pathlib.Path | None] = OrderedDict()
+        self._pending: dict[pathlib.Path, str] = {}
+        self._timers: dict[pathlib.Path, asyncio.TimerHandle] = {}
+        self._locks: dict[pathlib.Path, asyncio.Lock] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._unsynced: set[pathlib.Path] = set()
+        self._fsync_timer: asyncio.TimerHandle | None = None
+        self._counts = {"updates": 0, "writes": 0, "unchanged": 0, "fsyncs": 0, "errors": 0}
+
+    async def __aenter__(self) -> Self:
+        """Returns the write-behind."""
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        """Writes and fsyncs everything still pending."""
+        await self.flush()
+        await self.sync()
+
+    def resolve(self, uri: str) -> pathlib.Path | None:
+        """Returns the path of a `file://` URI if it is under one of the roots, cached per URI."""
+        if uri in self._paths:
+            self._paths.move_to_end(uri)
+            return self._paths[uri]
+        parsed = urllib.parse.urlparse(uri)
+        path = None
+        if parsed.scheme in {"file", ""}:
+            path = pathlib.Path(urllib.parse.unquote(parsed.path)).resolve()
+            if path.is_dir() or not any(root in path.parents for root in self.roots):
+                path = None
+        self._paths[uri] = path
+        while len(self._paths) > RESOLVE_CACHE_SIZE:
+            self._paths.popitem(last=False)
+        return path
+
+    def update(self, uri: str, text: str) -> None:
+        """Records a document's latest text, to be written once it has been unchanged for `delay` seconds.
+
+        Args:
+            uri (str): The document URI.
+            text (str): The document's full text.
+        """
+        if (path := self.resolve(uri)) is None:
+            return
+        self._counts["updates"] += 1
+        self._pending[path] = text
+        if timer := self._timers.pop(path, None):
+            timer.cancel()
+        self._timers[path] = asyncio.get_running_loop().call_later(self.delay, self._spawn_write, path)
+
+    async def flush(self, uris: Iterable[str] | None = None) -> None:
+        """Writes pending documents now.
+
+        Args:
+            uris (Iterable[str] | None): The document URIs to write. Defaults to all pending documents.
+        """
+        paths = list(self._pending) if uris is None else [path for uri in uris if (path := self.resolve(uri))]
+        await asyncio.gather(*(self._write(path) for path in paths))
+
+    async def sync(self) -> None:
+        """Fsyncs the files written since the last fsync now."""
+        if self._fsync_timer:
+            self._fsync_timer.cancel()
+            self._fsync_timer = None
+        if not self._unsynced:
+            return
+        paths, self._unsynced = self._unsynced, set()
+        try:
+            await asyncio.to_thread(_fsync, paths)
+        except OSError as error:
+            self._counts["errors"] += 1
+            console.error(f"Fsyncing written documents failed: {error}")
+            return
+        self._counts["fsyncs"] += 1
+
+    def metrics(self) -> dict[str, Any]:
+        """Returns the pending document and unsynced file counts, and how many updates, writes and fsyncs ran."""
+        return {"pending": len(self._pending), "unsynced": len(self._unsynced), **self._counts}
+
+    def _spawn_write(self, path: pathlib.Path) -> None:
+        task = asyncio.create_task(self._write(path))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, path: pathlib.Path) -> None:
+        async with self._locks.setdefault(path, asyncio.Lock()):
+            if timer := self._timers.pop(path, None):
+                timer.cancel()
+            if (text := self._pending.pop(path, None)) is None:
+                return
+            try:
+                written = await asyncio.to_thread(_write_atomic, path, text)
+            except OSError as error:
+                self._counts["errors"] += 1
+                console.error(f"Writing {path} failed: {error}")
+                return
+            self._counts["writes" if written else "unchanged"] += 1
+            if written:
+                self._unsynced.add(path)
+                # Not pushed back by later writes, so files are fsync'ed at most `fsync_delay` after being written.
+                self._fsync_timer = self._fsync_timer or asyncio.get_running_loop().call_later(
+                    self.fsync_delay, self._spawn_sync
+                )
+
+    def _spawn_sync(self) -> None:
+        self._fsync_timer = None
+        task = asyncio.create_task(self.sync())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+__all__ = ("RESOLVE_CACHE_SIZE", "WriteBehind")
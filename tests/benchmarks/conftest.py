@@ -0,0 +1,105 @@
+import contextlib
+import functools
+import json
+import os
+import pathlib
+import socket
+import sys
+import threading
+import time
+import warnings
+
+import pytest
+import uvicorn
+from starlette.applications import Starlette
+
+from monaco_editors.lifespan_tasks import start_language_servers
+from monaco_editors.models import LanguageServerSpec
+
+FAKE_SERVER = pathlib.Path(__file__).parent.parent / "fake_language_server.py"
+# Stored results the run is compared to; regenerate with MONACO_BENCHMARK_UPDATE_BASELINE=1.
+BASELINE = pathlib.Path(__file__).parent / "baseline.json"
+# Where the run's results are written.
+RESULTS = pathlib.Path(os.environ.get("MONACO_BENCHMARK_RESULTS", "benchmark-results.json"))
+# How much worse than the baseline a metric may be.
+TOLERANCE = float(os.environ.get("MONACO_BENCHMARK_TOLERANCE", "0.25"))
+
+
+class Benchmark:
+    """Records one benchmark's metrics, and compares them to the stored baseline."""
+
+    def __init__(self, name, record_property):
+        self.name = name
+        self.metrics = {}
+        self.higher_is_better = set()
+        self._record_property = record_property
+
+    def record(self, metric, value, *, higher_is_better=False):
+        self.metrics[metric] = round(value, 2)
+        if higher_is_better:
+            self.higher_is_better.add(metric)
+        self._record_property(metric, self.metrics[metric])
+
+    def regressed(self, metric, value, baseline):
+        if metric in self.higher_is_better:
+            return value < baseline * (1 - TOLERANCE)
+        return value > baseline * (1 + TOLERANCE)
+
+    def check_baseline(self):
+        if os.environ.get("MONACO_BENCHMARK_UPDATE_BASELINE"):
+            return
+        baseline = json.loads(BASELINE.read_text()).get(self.name, {}) if BASELINE.exists() else {}
+        if missing := sorted(set(self.metrics) - set(baseline)):
+            warnings.warn(
+                f"{self.name} has no baseline for {missing}; record one with MONACO_BENCHMARK_UPDATE_BASELINE=1",
+                stacklevel=2,
+            )
+        regressions = {
+            metric: (value, baseline[metric])
+            for metric, value in self.metrics.items()
+            if metric in baseline and self.regressed(metric, value, baseline[metric])
+        }
+        assert not regressions, f"{self.name} regressed (value, baseline): {regressions}"
+
+
+@pytest.fixture(scope="session")
+def benchmark_results():
+    results = {}
+    yield results
+    if not results:
+        return
+    RESULTS.write_text(json.dumps(results, indent=2, sort_keys=True))
+    if os.environ.get("MONACO_BENCHMARK_UPDATE_BASELINE"):
+        baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        BASELINE.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture
+def benchmark(request, record_property, benchmark_results):
+    recorder = Benchmark(request.node.name, record_property)
+    yield recorder
+    if recorder.metrics:
+        benchmark_results[recorder.name] = recorder.metrics
+
+
+@pytest.fixture
+def language_server_port():
+    """Serves the fake stdio language server at `/lsp/terraform` through the gateway, on a free local port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    spec = LanguageServerSpec(language_id="terraform", command=sys.executable, args=[str(FAKE_SERVER)], pool_size=1)
+    app = Starlette(lifespan=functools.partial(start_language_servers, specs=[spec]))
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        assert time.monotonic() < deadline, "language server gateway didn't start"
+        time.sleep(0.05)
+    try:
+        yield port
+    finally:
+        server.should_exit = True
+        with contextlib.suppress(RuntimeError):
+            thread.join(10)
@@ -0,0 +1,33 @@
+import pathlib
+import sys
+import time
+
+import pytest
+
+from monaco_editors.client import validate_files
+from monaco_editors.models import LanguageServerSpec
+
+FAKE_SERVER = LanguageServerSpec(
+    language_id="terraform",
+    command=sys.executable,
+    args=[str(pathlib.Path(__file__).parent.parent / "fake_language_server.py")],
+)
+MODULE = 'resource "aws_s3_bucket" "bucket_{n}" {{   \n  bucket = "bucket-{n}"\n}}\n' * 20
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pool_size", [1, 4])
+async def test_validate_files_throughput(tmp_path, benchmark, pool_size):
+    paths = []
+    for n in range(200):
+        path = tmp_path / f"module_{n}.tf"
+        path.write_text(MODULE.format(n=n))
+        paths.append(path)
+    start = time.perf_counter()
+    results = [result async for result in validate_files(paths, FAKE_SERVER, pool_size=pool_size)]
+    elapsed = time.perf_counter() - start
+    assert len(results) == len(paths)
+    assert all(result["formatted"] and "   \n" not in result["formatted"] for result in results)
+    benchmark.record("files_per_second", len(paths) / elapsed, higher_is_better=True)
+    print(f"validate_files pool_size={pool_size}: {benchmark.metrics['files_per_second']} files/s")
+    benchmark.check_baseline()
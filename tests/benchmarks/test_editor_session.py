@@ -0,0 +1,140 @@
+import os
+import pathlib
+import statistics
+import time
+
+import psutil
+from playwright.sync_api import Page
+from reflex.testing import AppHarness
+
+# Counts every websocket frame (Reflex events and language client traffic), marks when the editor can take input,
+# and times each keystroke until the frame after the editor's view lines change.
+INSTRUMENTATION = """
+window.__bench = {frames: [], keys: [], interactive: undefined, pendingKey: undefined};
+const frameBytes = (data) => typeof data === "string" ? new Blob([data]).size : (data.byteLength ?? data.size ?? 0);
+const NativeWebSocket = window.WebSocket;
+window.WebSocket = class extends NativeWebSocket {
+    constructor(...args) {
+        super(...args);
+        this.addEventListener("message", (event) => window.__bench.frames.push({
+            url: this.url, direction: "in", bytes: frameBytes(event.data), time: performance.now(), onChange: false,
+        }));
+    }
+    send(data) {
+        window.__bench.frames.push({
+            url: this.url, direction: "out", bytes: frameBytes(data), time: performance.now(),
+            onChange: typeof data === "string" && data.includes("on_change"),
+        });
+        return super.send(data);
+    }
+};
+document.addEventListener("keydown", (event) => {
+    window.__bench.pendingKey = event.timeStamp;
+}, true);
+new MutationObserver((mutations) => {
+    const bench = window.__bench;
+    const viewLines = (node) => (node.nodeType === Node.ELEMENT_NODE ? node : node.parentElement)?.closest(".view-lines");
+    if (!mutations.some((mutation) => viewLines(mutation.target))) {
+        return;
+    }
+    if (bench.interactive === undefined && document.querySelector(".monaco-editor textarea")) {
+        requestAnimationFrame(() => bench.interactive ??= performance.now());
+    }
+    if (bench.pendingKey !== undefined) {
+        const start = bench.pendingKey;
+        bench.pendingKey = undefined;
+        requestAnimationFrame(() => setTimeout(() => bench.keys.push(performance.now() - start)));
+    }
+}).observe(document, {subtree: true, childList: true, characterData: true});
+"""
+# The scripted session: keystrokes typed into the editor, and the delay between them.
+KEYSTROKES = 120
+KEYSTROKE_DELAY_MS = 50
+
+
+def BenchmarkEditorApp():
+    import os
+
+    import reflex as rx
+    from monaco_editors import monaco_editor
+
+    class BenchmarkState(rx.State):
+        value: str = 'resource "null_resource" "example" {\n  triggers = {}\n}\n' * 100
+
+        @rx.event
+        def on_change(self, model: dict):
+            self.value = model["modified"]
+
+    def index():
+        return monaco_editor(
+            filename="main.tf",
+            value=BenchmarkState.value,
+            on_change=BenchmarkState.on_change,
+            language_clients=[
+                monaco_editor.language_client(
+                    language_id="terraform",
+                    url=monaco_editor.server_url(
+                        host="127.0.0.1",
+                        port=int(os.environ["MONACO_BENCHMARK_LSP_PORT"]),
+                        secured=False,
+                        path="/lsp/terraform",
+                    ),
+                )
+            ],
+            data_testid="benchmark_editor",
+            class_name="w-full h-[600px]",
+        )
+
+    app = rx.App()
+    app.add_page(index, route="/")
+
+
+def language_servers():
+    """Returns the running fake language server processes (the gateway's children)."""
+    return [
+        process
+        for process in psutil.Process().children(recursive=True)
+        if any("fake_language_server" in part for part in process.cmdline())
+    ]
+
+
+def test_editor_session(create_app_harness: AppHarness, page: Page, language_server_port, benchmark):
+    os.environ.setdefault("HOME", str(pathlib.Path.cwd()))
+    os.environ["MONACO_BENCHMARK_LSP_PORT"] = str(language_server_port)
+    page.add_init_script(INSTRUMENTATION)
+    with create_app_harness.create(BenchmarkEditorApp) as editor_app:
+        assert editor_app.frontend_url is not None
+        page.goto(editor_app.frontend_url)
+        page.wait_for_function("window.__bench.interactive !== undefined", timeout=60000)
+        benchmark.record("time_to_interactive_ms", page.evaluate("window.__bench.interactive"))
+
+        servers = language_servers()
+        for process in servers:
+            process.cpu_percent(None)
+        page.get_by_test_id("benchmark_editor").locator(".view-lines").click()
+        start = page.evaluate("performance.now()")
+        session_start = time.monotonic()
+        page.keyboard.type("x" * KEYSTROKES, delay=KEYSTROKE_DELAY_MS)
+        page.wait_for_timeout(2000)
+        session_s = time.monotonic() - session_start
+        bench = page.evaluate("window.__bench")
+
+        keys = sorted(bench["keys"])
+        assert len(keys) >= KEYSTROKES * 0.9
+        benchmark.record("keystroke_to_paint_p50_ms", statistics.median(keys))
+        benchmark.record("keystroke_to_paint_p95_ms", keys[int(len(keys) * 0.95) - 1])
+
+        frames = [frame for frame in bench["frames"] if frame["time"] >= start]
+        on_change = [frame for frame in frames if frame["onChange"]]
+        assert on_change
+        benchmark.record("on_change_events_per_s", len(on_change) / session_s)
+        benchmark.record("on_change_bytes_per_event", sum(frame["bytes"] for frame in on_change) / len(on_change))
+        benchmark.record("websocket_frames_per_min", len(frames) / session_s * 60)
+        lsp_frames = [frame for frame in frames if "/lsp/" in frame["url"]]
+        benchmark.record("lsp_frames_per_min", len(lsp_frames) / session_s * 60)
+        benchmark.record("websocket_bytes_per_min", sum(frame["bytes"] for frame in frames) / session_s * 60)
+
+        assert servers
+        benchmark.record("language_server_cpu_percent", sum(process.cpu_percent(None) for process in servers))
+        benchmark.record("language_server_rss_mb", sum(process.memory_info().rss for process in servers) / 2**20)
+    benchmark.check_baseline()
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+import reflex as rx
+
+from monaco_editors import base
+from monaco_editors.models import LanguageClientConfig, LanguageServerUrl
+
+
+class HookBenchmarkState(rx.State):
+    value: str = ""
+    commands: dict = {"terraform-ls.terraform.init": {"type": "request", "method": "workspace/executeCommand"}}
+
+    @rx.event
+    def on_change(self, model: dict):
+        pass
+
+
+CLIENTS = [
+    LanguageClientConfig(
+        language_id="terraform",
+        url=LanguageServerUrl(host="localhost", port=3000),
+        register_commands=HookBenchmarkState.commands,
+    )
+]
+
+
+@pytest.mark.parametrize("distinct_configs", [1, 10])
+def test_hook_generation_1000_editors(benchmark, distinct_configs):
+    editors = [
+        base.MonacoEditorReactComp.create(
+            filename=f"main_{n % distinct_configs}.tf",
+            value=HookBenchmarkState.value,
+            on_change=HookBenchmarkState.on_change,
+            language_clients=CLIENTS,
+        )
+        for n in range(1000)
+    ]
+
+    def generate(clear_cache):
+        start = time.perf_counter()
+        for editor in editors:
+            if clear_cache:
+                base._HOOK_CACHE.clear()
+            editor._get_all_hooks()
+        return time.perf_counter() - start
+
+    uncached = generate(clear_cache=True)
+    base._HOOK_CACHE.clear()
+    cached = generate(clear_cache=False)
+    assert len(base._HOOK_CACHE) == distinct_configs
+    benchmark.record("uncached_ms", uncached * 1000)
+    benchmark.record("cached_ms", cached * 1000)
+    print(f"hooks for 1000 editors ({distinct_configs} configs): {uncached * 1000:.1f}ms -> {cached * 1000:.1f}ms")
+    assert cached < uncached
+    benchmark.check_baseline()
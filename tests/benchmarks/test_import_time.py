@@ -0,0 +1,48 @@
+import os
+import pathlib
+import subprocess
+import sys
+
+import monaco_editors
+
+# Self time (the package's own module bodies, not reflex's) allowed for `import monaco_editors`.
+IMPORT_BUDGET_MS = 200
+
+
+def run_python(*args):
+    """Runs a fresh interpreter that imports this checkout of the package."""
+    env = {**os.environ, "PYTHONPATH": str(pathlib.Path(monaco_editors.__file__).parent.parent)}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True, env=env)
+
+
+def import_times(statement):
+    """Runs the statement in a fresh interpreter under `-X importtime`; returns each module's (self, cumulative) us."""
+    times = {}
+    for line in run_python("-X", "importtime", "-c", statement).stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "self [us]" not in line:
+            self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def test_import_time(benchmark):
+    times = import_times("import monaco_editors")
+    assert "monaco_editors.lifespan_tasks" not in times
+    assert "monaco_editors.terraform" not in times
+    own_ms = sum(self_us for name, (self_us, _) in times.items() if name.startswith("monaco_editors")) / 1000
+    total_ms = times["monaco_editors"][1] / 1000
+    benchmark.record("own_ms", own_ms)
+    benchmark.record("total_ms", total_ms)
+    print(f"import monaco_editors: {total_ms:.1f}ms ({own_ms:.1f}ms in the package itself)")
+    assert own_ms < IMPORT_BUDGET_MS
+    benchmark.check_baseline()
+
+
+def test_lifespan_tasks_loaded_on_access():
+    # `-X importtime` doesn't log modules loaded with `importlib.import_module`, so check `sys.modules` instead.
+    result = run_python(
+        "-c",
+        "import sys, monaco_editors; monaco_editors.start_language_servers; "
+        "print(*(name in sys.modules for name in ('monaco_editors.lifespan_tasks', 'monaco_editors.terraform')))",
+    )
+    assert result.stdout.split() == ["True", "False"]
@@ -0,0 +1,100 @@
+"""Minimal stdio language server stand-in used by the gateway, client and benchmark tests.
+
+- `initialize` answers with a fixed capability set.
+- `textDocument/didOpen`/`didChange` publish one error diagnostic per line containing "error", and nothing for
+  documents containing "quiet" (like servers that skip empty publishes).
+- `textDocument/formatting` strips trailing whitespace.
+- `workspace/executeCommand` sleeps for `arguments[0]` seconds (if numeric) before answering.
+- Any other request is answered with `null`, and `exit` stops the server.
+"""
+
+import json
+import sys
+import time
+
+
+def read():
+    length = 0
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            return None
+        if line == b"\r\n":
+            break
+        name, _, value = line.partition(b":")
+        if name.strip() == b"Content-Length":
+            length = int(value.strip())
+    return json.loads(sys.stdin.buffer.read(length))
+
+
+def write(message):
+    body = json.dumps(message).encode()
+    sys.stdout.buffer.write(b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+    sys.stdout.buffer.flush()
+
+
+def diagnostics(uri, text):
+    if "quiet" in text:
+        return
+    items = [
+        {
+            "range": {"start": {"line": n, "character": 0}, "end": {"line": n, "character": len(line)}},
+            "severity": 1,
+            "message": "error found",
+        }
+        for n, line in enumerate(text.split("\n"))
+        if "error" in line
+    ]
+    write({"jsonrpc": "2.0", "method": "textDocument/publishDiagnostics", "params": {"uri": uri, "diagnostics": items}})
+
+
+def formatting(text):
+    edits = []
+    for n, line in enumerate(text.split("\n")):
+        stripped = line.rstrip()
+        if stripped != line:
+            edits.append(
+                {
+                    "range": {
+                        "start": {"line": n, "character": len(stripped)},
+                        "end": {"line": n, "character": len(line)},
+                    },
+                    "newText": "",
+                }
+            )
+    return edits
+
+
+def main():
+    documents = {}
+    while (message := read()) is not None:
+        method = message.get("method")
+        params = message.get("params") or {}
+        result = None
+        if method == "exit":
+            return
+        if method == "initialize":
+            result = {"capabilities": {"textDocumentSync": 1, "documentFormattingProvider": True}, "pid": 0}
+        elif method == "textDocument/didOpen":
+            document = params["textDocument"]
+            documents[document["uri"]] = document["text"]
+            diagnostics(document["uri"], document["text"])
+        elif method == "textDocument/didChange":
+            uri = params["textDocument"]["uri"]
+            documents[uri] = params["contentChanges"][-1]["text"]
+            diagnostics(uri, documents[uri])
+        elif method == "textDocument/didClose":
+            documents.pop(params["textDocument"]["uri"], None)
+        elif method == "textDocument/formatting":
+            result = formatting(documents.get(params["textDocument"]["uri"], ""))
+        elif method == "workspace/executeCommand":
+            delay = (params.get("arguments") or [0])[0]
+            if isinstance(delay, (int, float)):
+                time.sleep(delay)
+            result = params.get("command")
+        if "id" in message and method is not None:
+            write({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,13 @@ import reflex.config
 from playwright.sync_api import Page, expect
 
 from monaco_editors import base
-from monaco_editors.models import LanguageClientConfig, LanguageServerUrl
+from monaco_editors.models import ClientMiddleware, DiagnosticsConfig, DiffConfig, DocumentSync, LanguageClientConfig, LanguageServerUrl, LargeFilePolicy, ModelCache, StreamConfig, WorkspaceFiles
 
 
 class MonacoBaseTestState(rx.State):
     register_commands = {"foo", "bar"}
     initialization_options = {"bar", "baz"}
+    text: str = ""
 
 @pytest.mark.parametrize("clients,expected", [
     ([        
@@ -23,18 +24,51 @@ class MonacoBaseTestState(rx.State):
             url=LanguageServerUrl(host="localhost", port=9999, secured=False),
             register_commands=MonacoBaseTestState.register_commands
         )
-    ], ["startOptions:", "await registerCommand(params);"]),
+    ], [f"registerCommands: {MonacoBaseTestState.register_commands!s}, initializationOptions: undefined"]),
     ([
         LanguageClientConfig(
             language_id="terraform",
             url=LanguageServerUrl(host="0.0.0.0", port=1234),
             initialization_options=MonacoBaseTestState.initialization_options
         )
-    ], ["connection", "clientOptions"]),
+    ], [f"initializationOptions: {MonacoBaseTestState.initialization_options!s}", '"documentSelector": ["terraform"]']),
+    ([
+        LanguageClientConfig(
+            language_id="terraform",
+            url=LanguageServerUrl(host="localhost", port=9999, secured=False),
+            middleware=ClientMiddleware(cache_results=["textDocument/hover"]),
+        )
+    ], ['"middleware": {"cacheResults": ["textDocument/hover"], "cancelSuperseded": ']),
+    ([
+        LanguageClientConfig(
+            language_id="terraform",
+            url=LanguageServerUrl(host="localhost", port=8000, secured=False, path="/lsp/terraform"),
+            session_resume=True,
+        )
+    ], ['"restartOptions": {"keepWorker": true, ', '"sessionResume": true']),
+    ([
+        LanguageClientConfig(
+            language_id="yaml",
+            url=LanguageServerUrl(host="localhost", port=8000, secured=False, path="/lsp/yaml"),
+            workspace_routing=True,
+        )
+    ], ['"workspaceRouting": true']),
+    ([
+        LanguageClientConfig(
+            language_id="terraform",
+            url=LanguageServerUrl(host="localhost", port=8000, secured=False, path="/lsp/terraform"),
+            shared_worker=True,
+        )
+    ], ['"sharedWorker": "/external/monaco_editors/base/language_client_worker.js"']),
     ([], ["undefined"])
 ])
 def test_configure_language_clients(clients, expected):
+    name, declaration = base.client_statics_constant(clients)
     result = base.configure_language_clients(clients)
+    if clients:
+        assert result.startswith(f"buildLanguageClientConfigs({name}, workspace, ")
+        assert declaration.startswith(f"const {name} = ")
+        result += declaration
     for client in clients:
         assert client.language_id in result
         assert client.url.formatted in result
@@ -42,6 +76,288 @@ def test_configure_language_clients(clients, expected):
         assert expected_string in result
 
 
+def test_client_statics_shared_by_config():
+    url = LanguageServerUrl(host="localhost", port=9999, secured=False)
+    first = base.client_statics_constant([LanguageClientConfig(language_id="terraform", url=url)])
+    second = base.client_statics_constant([LanguageClientConfig(language_id="terraform", url=url)])
+    other = base.client_statics_constant([LanguageClientConfig(language_id="terraform", url=url, session_resume=True)])
+    assert first == second
+    assert first[0] != other[0]
+
+
+def test_client_middleware_custom_code():
+    url = LanguageServerUrl(host="localhost", port=9999, secured=False)
+    plain = base.MonacoEditorReactComp.create(
+        filename="main.tf", language_clients=[LanguageClientConfig(language_id="terraform", url=url)]
+    )
+    assert "const createClientMiddleware" not in "".join(plain._get_all_custom_code())
+    with_middleware = base.MonacoEditorReactComp.create(
+        filename="main.tf",
+        language_clients=[LanguageClientConfig(language_id="terraform", url=url, middleware=ClientMiddleware())],
+    )
+    assert "const createClientMiddleware" in "".join(with_middleware._get_all_custom_code())
+
+
+def test_shared_worker_custom_code():
+    url = LanguageServerUrl(host="localhost", port=9999, secured=False)
+    plain = base.MonacoEditorReactComp.create(
+        filename="main.tf", language_clients=[LanguageClientConfig(language_id="terraform", url=url)]
+    )
+    assert "const sharedWorkerConnection" not in "".join(plain._get_all_custom_code())
+    shared = base.MonacoEditorReactComp.create(
+        filename="main.tf",
+        language_clients=[LanguageClientConfig(language_id="terraform", url=url, shared_worker=True)],
+    )
+    assert "const sharedWorkerConnection" in "".join(shared._get_all_custom_code())
+    assert (Path(base.__file__).parent / "language_client_worker.js").is_file()
+
+
+def test_command_queue():
+    url = LanguageServerUrl(host="localhost", port=9999, secured=False)
+    plain = base.MonacoEditorReactComp.create(filename="main.tf")
+    assert "const monacoEditorCommands" not in "".join(plain._get_all_custom_code())
+    editor = base.MonacoEditorReactComp.create(
+        filename="main.tf", language_clients=[LanguageClientConfig(language_id="terraform", url=url)]
+    )
+    assert "const monacoEditorCommands" in "".join(editor._get_all_custom_code())
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    assert "const registerCommands = async (language, commands)" in hooks
+    assert hooks.count("vscode.commands.getCommands(true)") == 1
+    assert "monacoEditorCommands.execute(name, args" in hooks
+
+
+def test_cancel_command():
+    for name, expected in (("terraform.init", 'cancel("terraform.init")'), (None, "cancel()")):
+        spec = base.cancel_command(name)
+        javascript_code = dict((str(key), value) for key, value in spec.args)["javascript_code"]
+        assert javascript_code._var_value == f"globalThis.monacoEditorCommands?.{expected}"
+
+
+def test_placeholder():
+    editor = base.MonacoEditorReactComp.create(filename="main.tf", value='resource "a" "b" {}')
+    rendered = editor.render()
+    assert len(rendered["children"]) == 1
+    assert "data-monaco-placeholder" in str(rendered["children"])
+    assert "resource" in str(rendered["children"])
+    assert not any(prop.startswith("placeholder") for prop in rendered["props"])
+    assert 'querySelector(":scope > [data-monaco-placeholder]")' in "".join(str(hook) for hook in editor._get_all_hooks())
+    for props in (
+        {"value": MonacoBaseTestState.text},
+        {"value": "a", "placeholder": ""},
+        {"value": "a", "original": "b"},
+        {"value": "a", "id": "log", "stream": StreamConfig()},
+    ):
+        assert not base.MonacoEditorReactComp.create(filename="main.tf", **props).children
+    with pytest.raises(TypeError, match="doesn't take children"):
+        base.MonacoEditorReactComp.create(rx.text("x"), filename="main.tf")
+    custom = base.MonacoEditorReactComp.create(filename="main.tf", value="a", placeholder="<pre>custom</pre>")
+    assert "<pre>custom</pre>" in str(custom.render()["children"])
+
+
+class ViewEventTestState(rx.State):
+    @rx.event
+    def on_scroll(self, change: dict):
+        pass
+
+
+def test_view_events():
+    plain = base.MonacoEditorReactComp.create(filename="main.tf")
+    assert "const watchViewEvents" not in "".join(plain._get_all_custom_code())
+    editor = base.MonacoEditorReactComp.create(
+        filename="main.tf", on_scroll=ViewEventTestState.on_scroll, view_event_rate=4
+    )
+    custom_code = "".join(editor._get_all_custom_code())
+    assert "const watchViewEvents" in custom_code
+    assert "scrollTop: editor.getScrollTop()" in custom_code
+    assert "visibleRanges:" in custom_code
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    assert "onCursorChange: undefined, onSelectionChange: undefined, onScroll: " in hooks
+    assert "}, 4);" in hooks
+    assert not any(prop.startswith(("onScroll", "viewEventRate")) for prop in editor.render()["props"])
+
+
+class DiagnosticsTestState(rx.State):
+    @rx.event
+    def on_diagnostics(self, batch: list[dict]):
+        pass
+
+
+def test_diagnostics():
+    plain = base.MonacoEditorReactComp.create(filename="main.tf")
+    assert "const watchDiagnostics" not in "".join(plain._get_all_custom_code())
+    editor = base.MonacoEditorReactComp.create(
+        filename="main.tf",
+        on_diagnostics=DiagnosticsTestState.on_diagnostics,
+        diagnostics_config=DiagnosticsConfig(min_severity="warning", max_rate=2),
+    )
+    assert "const watchDiagnostics" in "".join(editor._get_all_custom_code())
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    assert '{"minSeverity": "warning", "maxRate": 2.0});' in hooks
+    assert not any(prop.startswith(("onDiagnostics", "diagnosticsConfig")) for prop in editor.render()["props"])
+
+
+def test_hooks_cached_by_config():
+    base._HOOK_CACHE.clear()
+    first = base.MonacoEditorReactComp.create(filename="main.tf", value="a").add_hooks()
+    second = base.MonacoEditorReactComp.create(filename="main.tf", value="a").add_hooks()
+    other = base.MonacoEditorReactComp.create(filename="other.tf", value="a").add_hooks()
+    assert len(base._HOOK_CACHE) == 2
+    assert all(x is y for x, y in zip(first, second))
+    assert first is not second
+    assert "other.tf" in str(other[-1])
+
+
+def test_large_file_threshold():
+    url = LanguageServerUrl(host="localhost", port=9999, secured=False)
+    clients = [LanguageClientConfig(language_id="terraform", url=url)]
+    plain = base.MonacoEditorReactComp.create(filename="main.tf", language_clients=clients)
+    assert "saveOnlyUris" not in "".join(str(hook) for hook in plain._get_all_hooks())
+    assert "const loadLargeFile" not in "".join(plain._get_all_custom_code())
+
+    policy = LargeFilePolicy(max_lines=10)
+    editor = base.MonacoEditorReactComp.create(filename="main.tf", language_clients=clients, large_file_threshold=policy)
+    name, declaration = base.large_file_constant(policy)
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    assert f"isLargeFile(codeValue, {name})" in hooks
+    assert 'text: largeFile ? "" : codeValue' in hooks
+    assert "initializationOptions: undefined}, }, saveOnlyUris)" in hooks
+    assert f"loadLargeFile(wrapper.getEditor(), codeValue, {name}, largeFile, configs)" in hooks
+    custom_code = "".join(editor._get_all_custom_code())
+    assert "const loadLargeFile" in custom_code
+    assert declaration in custom_code
+    assert not any(prop.startswith("largeFileThreshold") for prop in editor.render()["props"])
+
+
+def test_stream():
+    editor = base.MonacoEditorReactComp.create(id="plan", filename="plan.log", stream=StreamConfig(max_lines=10))
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    assert 'monacoEditorStream("plan")' in hooks
+    assert '{"maxLines": 10, "autoScroll": true}' in hooks
+    assert "const monacoEditorStream " in "".join(editor._get_all_custom_code())
+    assert 'id:"plan"' in editor.render()["props"]
+    with pytest.raises(ValueError):
+        base.MonacoEditorReactComp.create(filename="plan.log", stream=StreamConfig())._get_all_hooks()
+
+
+def test_append():
+    spec = base.append("plan", 'Plan: 1 to add\n"quoted"')
+    javascript_code = dict((str(name), value) for name, value in spec.args)["javascript_code"]
+    assert javascript_code._var_value == (
+        'globalThis.monacoEditorStream?.("plan").append("Plan: 1 to add\\n\\"quoted\\"")'
+    )
+
+
+class DiffTestState(rx.State):
+    original: str = ""
+    modified: str = ""
+    hunks: list[dict] = []
+
+    @rx.event
+    def on_delta(self, delta: dict):
+        pass
+
+
+def test_diff_editor():
+    editor = base.MonacoEditorReactComp.create(
+        filename="main.tf",
+        value=DiffTestState.modified,
+        original=DiffTestState.original,
+        hunks=DiffTestState.hunks,
+        diff_config=DiffConfig(max_computation_time=200),
+        on_delta=DiffTestState.on_delta,
+    )
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    assert f"const originalValue = `${{{DiffTestState.original!s}}}`" in hooks
+    assert f"const precomputedHunks = {DiffTestState.hunks!s};" in hooks
+    assert "useDiffEditor: true" in hooks
+    assert '"maxComputationTime": 200' in hooks
+    assert "uri: `${workspace}/.original/${\"main.tf\"}`" in hooks
+    assert '[["original", diffEditor.getOriginalEditor()], ["modified", diffEditor.getModifiedEditor()]]' in hooks
+    assert "registerTextChangedCallback" not in hooks
+    custom_code = "".join(editor._get_all_custom_code())
+    assert "const showDiffHunks" in custom_code
+    assert "const watchEditorChanges" in custom_code
+    props = editor.render()["props"]
+    assert not any(prop.startswith(("original", "hunks", "diffConfig", "onDelta")) for prop in props)
+
+
+def test_diff_editor_literal_hunks():
+    hunks = [
+        {"originalStartLineNumber": 1, "originalEndLineNumber": 1, "modifiedStartLineNumber": 1, "modifiedEndLineNumber": 1}
+    ]
+    editor = base.MonacoEditorReactComp.create(filename="main.tf", value="b", original="a", hunks=hunks)
+    name, declaration = base.json_constant("diffHunks", hunks)
+    assert f"const precomputedHunks = {name};" in "".join(str(hook) for hook in editor._get_all_hooks())
+    assert declaration in editor._get_all_custom_code()
+
+
+def test_editor_deltas():
+    editor = base.MonacoEditorReactComp.create(filename="main.tf", on_delta=DiffTestState.on_delta)
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    assert 'watchEditorChanges([["modified", editor]], undefined, ' in hooks
+    assert "useDiffEditor" not in hooks
+
+
+def test_model_cache():
+    plain = base.MonacoEditorReactComp.create(filename=DiffTestState.original)
+    assert "@codingame/monaco-vscode-api/monaco" not in plain._get_all_imports()
+    editor = base.MonacoEditorReactComp.create(
+        filename=DiffTestState.original, model_cache=ModelCache(max_models=3, max_bytes=1000)
+    )
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    assert 'openCachedModel(uri, codeValue, {"maxModels": 3, "maxBytes": 1000})' in hooks
+    assert f"}}, [codeValue, {DiffTestState.original!s}]);" in hooks
+    assert "const openCachedModel" in "".join(editor._get_all_custom_code())
+    assert "@codingame/monaco-vscode-api/monaco" in editor._get_all_imports()
+    assert not any(prop.startswith("modelCache") for prop in editor.render()["props"])
+
+
+def test_workspace_files():
+    editor = base.MonacoEditorReactComp.create(
+        filename="main.tf", workspace_files=WorkspaceFiles(url="http://localhost:8000/workspace/files/", page_size=100)
+    )
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    assert (
+        'registerWorkspaceFiles(workspace, {"url": "http://localhost:8000/workspace/files", "pageSize": 100, '
+        '"cacheSize": 200, "statTtl": 2000});'
+    ) in hooks
+    assert "const registerWorkspaceFiles" in "".join(editor._get_all_custom_code())
+    assert "@codingame/monaco-vscode-files-service-override" in editor._get_all_imports()
+    assert not any(prop.startswith("workspaceFiles") for prop in editor.render()["props"])
+
+
+def test_document_sync():
+    editor = base.MonacoEditorReactComp.create(
+        filename="main.tf",
+        document_id=DiffTestState.original,
+        document_sync=DocumentSync(url="http://localhost:8000/documents/", debounce=100),
+    )
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    config = '{"url": "http://localhost:8000/documents", "debounce": 100}'
+    assert f"await loadStoredDocument({config}, {DiffTestState.original!s});" in hooks
+    assert f'}}, [started, {DiffTestState.original!s}, "main.tf"]);' in hooks
+    assert "const syncStoredDocument" in "".join(editor._get_all_custom_code())
+    assert not any(prop.startswith(("documentId", "documentSync")) for prop in editor.render()["props"])
+    with pytest.raises(ValueError, match="must be set together"):
+        base.MonacoEditorReactComp.create(filename="main.tf", document_id="main")._get_all_hooks()
+
+
+class SearchTestState(rx.State):
+    @rx.event
+    def on_search(self, query: dict):
+        pass
+
+
+def test_search_action():
+    plain = base.MonacoEditorReactComp.create(filename="main.tf")
+    assert "findInWorkspace" not in "".join(str(hook) for hook in plain._get_all_hooks())
+    editor = base.MonacoEditorReactComp.create(filename="main.tf", on_search=SearchTestState.on_search)
+    hooks = "".join(str(hook) for hook in editor._get_all_hooks())
+    assert 'id: "monaco-editors.findInWorkspace"' in hooks
+    assert "keybindings: [2048 | 1024 | 36]" in hooks
+    assert ')({query, uri: model?.uri.toString() ?? ""});' in hooks
+    assert not any(prop.startswith("onSearch") for prop in editor.render()["props"])
+
 # Upper-casing to have it stand out from test functions
 # Must be a function and include all imports for AppHarness to generate the app correctly
 def EditorApp(): 
@@ -66,3 +382,105 @@ def test_editor_render(create_app_harness: AppHarness, page: Page):
         assert editor_app.frontend_url is not None
         page.goto(editor_app.frontend_url)
         expect(page.get_by_test_id("basic_monaco_editor")).to_be_visible(timeout=15000)
+
+
+def LargeFileEditorApp():
+    import reflex as rx
+    from monaco_editors import monaco_editor
+
+    class LargeFileState(rx.State):
+        value: str = ""
+
+        @rx.event
+        def load(self):
+            # ~50MB of generated Terraform-like JSON lines.
+            self.value = '{"resource": "aws_s3_bucket", "bucket": "bucket-name-padding-padding-padding"},\n' * 640_000
+
+    def index():
+        return rx.vstack(
+            monaco_editor(
+                filename="state.json",
+                value=LargeFileState.value,
+                large_file_threshold=monaco_editor.large_file_policy(),
+                data_testid="large_monaco_editor",
+            ),
+            on_mount=LargeFileState.load,
+        )
+
+    app = rx.App()
+    app.add_page(index, route="/")
+
+
+# Longest main-thread task allowed while the large file is loaded into the editor.
+LONG_TASK_BUDGET_MS = 250
+
+
+def test_large_file_render(create_app_harness: AppHarness, page: Page):
+    os.environ.setdefault("HOME", str(Path.cwd()))
+    page.add_init_script(
+        """
+        window.__longTasks = [];
+        new PerformanceObserver((list) => window.__longTasks.push(...list.getEntries().map((entry) => ({
+            start: entry.startTime, duration: entry.duration,
+        })))).observe({type: "longtask", buffered: true});
+        """
+    )
+    with create_app_harness.create(LargeFileEditorApp) as editor_app:
+        assert editor_app.frontend_url is not None
+        page.goto(editor_app.frontend_url)
+        # The editor's container is the test div, which is marked once the last chunk is loaded.
+        loaded = page.locator("[data-testid=large_monaco_editor][data-large-file=true]")
+        expect(loaded).to_be_attached(timeout=120000)
+        load_start = page.evaluate(
+            "performance.getEntriesByName('monaco-editors:large-file-load', 'mark')[0].startTime"
+        )
+        long_tasks = page.evaluate("window.__longTasks")
+        loading_tasks = [task["duration"] for task in long_tasks if task["start"] >= load_start]
+        assert max(loading_tasks, default=0) < LONG_TASK_BUDGET_MS
+
+
+def ScrollEventsApp():
+    import reflex as rx
+    from monaco_editors import monaco_editor
+
+    class ScrollState(rx.State):
+        scroll_events: int = 0
+
+        @rx.event
+        def on_scroll(self, change: dict):
+            self.scroll_events += 1
+
+    def index():
+        return rx.vstack(
+            rx.text(ScrollState.scroll_events, data_testid="scroll_events"),
+            monaco_editor(
+                filename="main.tf",
+                value="\n".join(f'resource "null_resource" "r{n}" {{}}' for n in range(5_000)),
+                on_scroll=ScrollState.on_scroll,
+                view_event_rate=5,
+                data_testid="scroll_monaco_editor",
+                class_name="w-full h-[400px]",
+            ),
+        )
+
+    app = rx.App()
+    app.add_page(index, route="/")
+
+
+def test_scroll_events_coalesced(create_app_harness: AppHarness, page: Page):
+    os.environ.setdefault("HOME", str(Path.cwd()))
+    with create_app_harness.create(ScrollEventsApp) as editor_app:
+        assert editor_app.frontend_url is not None
+        page.goto(editor_app.frontend_url)
+        editor = page.get_by_test_id("scroll_monaco_editor")
+        expect(editor.locator(".view-lines")).to_be_visible(timeout=15000)
+        editor.hover()
+        # ~200 wheel events over about two seconds; at 5 events/second, at most ~11 reach the backend.
+        start = page.evaluate("performance.now()")
+        for _ in range(200):
+            page.mouse.wheel(0, 40)
+            page.wait_for_timeout(10)
+        elapsed = (page.evaluate("performance.now()") - start) / 1000
+        page.wait_for_timeout(1000)
+        count = int(page.get_by_test_id("scroll_events").inner_text())
+        assert 0 < count <= elapsed * 5 + 2
@@ -0,0 +1,77 @@
+import pathlib
+import sys
+import time
+
+import pytest
+
+from monaco_editors import client
+from monaco_editors.models import Command, LanguageServerSpec
+
+FAKE_SERVER = LanguageServerSpec(
+    language_id="terraform",
+    command=sys.executable,
+    args=[str(pathlib.Path(__file__).parent / "fake_language_server.py")],
+)
+
+
+def test_apply_edits():
+    edits = [
+        {"range": {"start": {"line": 0, "character": 1}, "end": {"line": 0, "character": 3}}, "newText": ""},
+        {"range": {"start": {"line": 1, "character": 0}, "end": {"line": 1, "character": 0}}, "newText": "  "},
+    ]
+    assert client.apply_edits("a  \nb", edits) == "a\n  b"
+
+
+def test_apply_edits_keeps_order_of_inserts_at_same_position():
+    position = {"line": 0, "character": 1}
+    edits = [
+        {"range": {"start": {"line": 0, "character": 2}, "end": {"line": 0, "character": 3}}, "newText": "C"},
+        {"range": {"start": position, "end": position}, "newText": "1"},
+        {"range": {"start": position, "end": position}, "newText": "2"},
+    ]
+    assert client.apply_edits("abc", edits) == "a12bC"
+
+
+@pytest.mark.asyncio
+async def test_language_server_client():
+    async with client.LanguageServerClient(FAKE_SERVER) as lsp:
+        assert lsp.capabilities["documentFormattingProvider"]
+        result = await lsp.validate("file:///main.tf", 'resource "x" "y" {}   \n# error\n', "terraform")
+        assert result["uri"] == "file:///main.tf"
+        assert [d["range"]["start"]["line"] for d in result["diagnostics"]] == [1]
+        assert result["formatted"] == 'resource "x" "y" {}\n# error\n'
+        command = Command(type="request", method="workspace/executeCommand", params={"command": "validate"})
+        assert await lsp.execute(command) == "validate"
+
+
+@pytest.mark.asyncio
+async def test_validate_without_published_diagnostics():
+    async with client.LanguageServerClient(FAKE_SERVER, diagnostics_timeout=0.2) as lsp:
+        start = time.monotonic()
+        result = await lsp.validate("file:///main.tf", "# quiet\n", "terraform", format_document=False)
+        assert result["diagnostics"] == []
+        assert time.monotonic() - start < lsp.timeout
+
+
+@pytest.mark.asyncio
+async def test_validate_files(tmp_path):
+    paths = []
+    for n in range(6):
+        path = tmp_path / f"{n}.tf"
+        path.write_text("error\n" if n % 2 else "ok\n")
+        paths.append(path)
+    results = [result async for result in client.validate_files(paths, FAKE_SERVER, pool_size=2, concurrency=2)]
+    assert sorted(result["uri"] for result in results) == sorted(path.as_uri() for path in paths)
+    assert sum(len(result["diagnostics"]) for result in results) == 3
+    assert all(result["error"] is None for result in results)
+
+
+@pytest.mark.asyncio
+async def test_validate_files_reports_errors_per_file(tmp_path):
+    valid = tmp_path / "main.tf"
+    valid.write_text("error\n")
+    missing = tmp_path / "missing.tf"
+    results = {result["uri"]: result async for result in client.validate_files([missing, valid], FAKE_SERVER)}
+    assert len(results[valid.as_uri()]["diagnostics"]) == 1
+    assert results[valid.as_uri()]["error"] is None
+    assert "missing.tf" in results[missing.as_uri()]["error"]
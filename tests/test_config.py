@@ -22,3 +22,14 @@ def test_get_vite_config():
     vsix_plugin = vite_config["plugins"][0]
     assert isinstance(vsix_plugin, config.RawJS)
     assert vsix_plugin.code == "vsixPlugin()"
+
+def test_get_vite_config_service_worker():
+    assert len(config.MonacoEditorsReflexConfig.get_vite_config()["plugins"]) == 1
+    vite_config = config.MonacoEditorsReflexConfig.get_vite_config(service_worker=True)
+    vsix_plugin, service_worker_plugin = vite_config["plugins"]
+    assert vsix_plugin.code == "vsixPlugin()"
+    assert isinstance(service_worker_plugin, config.RawJS)
+    assert 'name: "monaco-editors-service-worker"' in service_worker_plugin.code
+    assert 'apply: "build"' in service_worker_plugin.code
+    assert 'const fileName = "monaco-editors-sw.js";' in service_worker_plugin.code
+    assert "__VERSION__" in service_worker_plugin.code
@@ -0,0 +1,27 @@
+import pytest
+
+from monaco_editors.diff import compute_hunks
+
+
+def hunk(original_start, original_end, modified_start, modified_end):
+    return {
+        "originalStartLineNumber": original_start,
+        "originalEndLineNumber": original_end,
+        "modifiedStartLineNumber": modified_start,
+        "modifiedEndLineNumber": modified_end,
+    }
+
+
+@pytest.mark.parametrize(
+    "original,modified,expected",
+    [
+        ("a\nb\nc", "a\nb\nc", []),
+        ("a\nb\nc", "a\nB\nc", [hunk(2, 2, 2, 2)]),
+        ("a\nc", "a\nb\nc", [hunk(1, 0, 2, 2)]),
+        ("a\nb\nc", "a\nc", [hunk(2, 2, 1, 0)]),
+        ("a\r\nb\r\nc", "a\nb\nd", [hunk(3, 3, 3, 3)]),
+        ("", "a\nb", [hunk(1, 1, 1, 2)]),
+    ],
+)
+def test_compute_hunks(original, modified, expected):
+    assert compute_hunks(original, modified) == expected
@@ -0,0 +1,129 @@
+import fnmatch
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from monaco_editors import documents
+
+TEXT = "".join(f'resource "null_resource" "r{n}" {{\n  triggers = {{ n = "{n}" }}\n}}\n' for n in range(20_000))
+
+
+class FakeRedis:
+    """The subset of `redis.asyncio.Redis` used by `RedisDocumentStore`."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def mset(self, mapping):
+        self.data.update(mapping)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key.encode()
+
+
+@pytest.fixture(params=["memory", "disk", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return documents.MemoryDocumentStore()
+    if request.param == "disk":
+        return documents.DiskDocumentStore(tmp_path / "documents")
+    return documents.RedisDocumentStore(FakeRedis())
+
+
+def test_chunk_text():
+    chunks = documents.chunk_text(TEXT)
+    assert "".join(chunks) == TEXT
+    assert len(chunks) > 1
+    assert all(len(chunk) <= documents.CHUNK_MAX_SIZE for chunk in chunks)
+    assert all(len(chunk) >= documents.CHUNK_MIN_SIZE for chunk in chunks[:-1])
+    # Boundaries follow the content, so an edit near the start leaves the later chunks unchanged.
+    edited = documents.chunk_text(TEXT.replace('"r5"', '"renamed"'))
+    assert len(set(edited) - set(chunks)) == 1
+    assert documents.chunk_text("x" * 10, min_size=1, max_size=4) == ["xxxx", "xxxx", "xx"]
+    assert documents.chunk_text("") == []
+
+
+@pytest.mark.asyncio
+async def test_store_save_load(store):
+    assert await store.load("main.tf") is None
+    manifest = await store.save("main.tf", TEXT)
+    assert manifest["version"] == 1
+    assert manifest["length"] == len(TEXT)
+    assert await store.load("main.tf") == TEXT
+    # A copy shares all its chunks.
+    copy = await store.save("copy.tf", TEXT)
+    assert copy["chunks"] == manifest["chunks"]
+    assert len({chunk async for chunk in store.chunk_digests()}) == len(set(manifest["chunks"]))
+
+
+@pytest.mark.asyncio
+async def test_store_apply(store):
+    await store.save("main.tf", "a = 1\nb = 2\n")
+    change = {"range": {"start": {"line": 1, "character": 4}, "end": {"line": 1, "character": 5}}, "text": "3"}
+    manifest = await store.apply("main.tf", [change], version=1)
+    assert manifest["version"] == 2
+    assert await store.load("main.tf") == "a = 1\nb = 3\n"
+    with pytest.raises(documents.DocumentConflictError):
+        await store.apply("main.tf", [change], version=1)
+    # Changes against version 0 create the document.
+    await store.apply("new.tf", [{"text": "c = 4\n"}], version=0)
+    assert await store.load("new.tf") == "c = 4\n"
+
+
+@pytest.mark.asyncio
+async def test_store_collect(store):
+    await store.save("main.tf", TEXT)
+    await store.save("other.tf", "x = 1\n")
+    await store.save("main.tf", "y = 2\n")
+    assert await store.collect() == len(documents.chunk_text(TEXT))
+    await store.delete("other.tf")
+    assert await store.collect() == 1
+    assert await store.load("main.tf") == "y = 2\n"
+    assert [document_id async for document_id in store.document_ids()] == ["main.tf"]
+
+
+def test_server():
+    store = documents.MemoryDocumentStore()
+    app = Starlette()
+    documents.DocumentServer(store).mount(app, "/documents")
+    with TestClient(app) as client:
+        assert client.get("/documents/documents/modules/main.tf").status_code == 404
+        manifest = client.put("/documents/documents/modules/main.tf", json={"text": TEXT}).json()
+        assert client.get("/documents/documents/modules/main.tf").json() == manifest
+        chunk = client.get(f"/documents/chunks/{manifest['chunks'][0]}")
+        assert chunk.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert TEXT.startswith(chunk.text)
+        assert client.get(f"/documents/chunks/{'0' * 64}").status_code == 404
+
+        change = {"range": {"start": {"line": 0, "character": 0}, "end": {"line": 0, "character": 8}}, "text": "data"}
+        response = client.post("/documents/documents/modules/main.tf", json={"version": 1, "changes": [change]})
+        assert response.json()["version"] == 2
+        response = client.post("/documents/documents/modules/main.tf", json={"version": 1, "changes": [change]})
+        assert response.status_code == 409
+        assert client.post("/documents/documents/modules/main.tf", json={"changes": []}).status_code == 400
+
+
+def test_server_rejects_invalid_digests(tmp_path):
+    store = documents.DiskDocumentStore(tmp_path)
+    app = Starlette()
+    documents.DocumentServer(store).mount(app, "/documents")
+    with TestClient(app) as client:
+        manifest = client.put("/documents/documents/main.tf", json={"text": TEXT}).json()
+        for invalid in ("..", "%2E%2E", manifest["chunks"][0].upper(), manifest["chunks"][0][:-1]):
+            assert client.get(f"/documents/chunks/{invalid}").status_code == 404
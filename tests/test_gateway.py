@@ -0,0 +1,245 @@
+import contextlib
+import json
+import pathlib
+import sys
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from monaco_editors import gateway
+
+FAKE_SERVER = [sys.executable, str(pathlib.Path(__file__).parent / "fake_language_server.py")]
+
+
+def request(request_id, method, params=None):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+
+
+@pytest.mark.parametrize(
+    "method,expected",
+    [
+        ("textDocument/completion", gateway.Priority.INTERACTIVE),
+        ("textDocument/hover", gateway.Priority.INTERACTIVE),
+        ("textDocument/signatureHelp", gateway.Priority.INTERACTIVE),
+        ("textDocument/codeLens", gateway.Priority.NORMAL),
+        ("workspace/executeCommand", gateway.Priority.HEAVY),
+    ],
+)
+def test_classify(method, expected):
+    assert gateway.classify(method) == expected
+
+
+def test_token_bucket():
+    bucket = gateway.TokenBucket(rate=1.0, capacity=2.0)
+    assert bucket.try_consume(1)
+    assert bucket.try_consume(1)
+    assert not bucket.try_consume(1)
+    assert 0 < bucket.delay(1) <= 1
+    # Costs above the capacity are capped so they can eventually run.
+    assert bucket.delay(10) <= 2
+
+
+def test_scheduler_priority_and_fairness():
+    scheduler = gateway.RequestScheduler(max_in_flight=10, heavy_in_flight=1)
+    dispatched = []
+    for n in range(3):
+        scheduler.submit("greedy", request(f"cmd{n}", "workspace/executeCommand"), lambda: None)
+    scheduler.submit("greedy", request("c1", "textDocument/completion"), lambda: None)
+    scheduler.submit("other", request("c2", "textDocument/completion"), lambda: None)
+    scheduler.submit("other", request("lens", "textDocument/codeLens"), lambda: None)
+    while (pending := scheduler._next()[0]) is not None:
+        dispatched.append(pending.request_id)
+        scheduler._in_flight[(pending.session_id, pending.request_id)] = pending.priority
+    # Interactive first, then normal, and only `heavy_in_flight` heavy commands at a time.
+    assert dispatched == ["c1", "c2", "lens", "cmd0"]
+    metrics = scheduler.metrics()
+    assert metrics["queue_depth"]["heavy"] == 2
+    assert metrics["session_queue_depth"] == {"greedy": 2}
+    scheduler.complete("greedy", "cmd0")
+    assert scheduler._next()[0].request_id == "cmd1"
+
+
+def test_scheduler_rate_limit_and_cancel():
+    scheduler = gateway.RequestScheduler(max_in_flight=10, rate=1.0, burst=1.0)
+    for n in range(2):
+        scheduler.submit("session", request(n, "textDocument/hover"), lambda: None)
+    assert scheduler._next()[0].request_id == 0
+    pending, delay = scheduler._next()
+    assert pending is None
+    assert delay > 0
+    assert scheduler.cancel("session", 1)
+    assert not scheduler.cancel("session", 1)
+    scheduler.remove_session("session")
+    assert scheduler.metrics()["session_queue_depth"] == {}
+
+
+def test_scheduler_holds_notifications_behind_queued_requests():
+    scheduler = gateway.RequestScheduler(max_in_flight=10, heavy_in_flight=1)
+    sent = []
+
+    def dispatch_all():
+        while (pending := scheduler._next()[0]) is not None:
+            scheduler._dispatch(pending)
+
+    scheduler.notify("session", lambda: sent.append("open"))
+    scheduler.submit("other", request("cmd0", "workspace/executeCommand"), lambda: sent.append("cmd0"))
+    scheduler.submit("session", request("cmd1", "workspace/executeCommand"), lambda: sent.append("cmd1"))
+    for n in range(3):
+        scheduler.notify("session", lambda n=n: sent.append(f"change{n}"))
+        scheduler.submit("session", request(f"hover{n}", "textDocument/hover"), lambda n=n: sent.append(f"hover{n}"))
+        dispatch_all()
+    # The heavy request stays capped, and the edits and requests made after it wait behind it.
+    assert sent == ["open", "cmd0"]
+    assert scheduler.metrics()["held_notifications"] == 3
+    scheduler.complete("other", "cmd0")
+    dispatch_all()
+    assert sent == ["open", "cmd0", "cmd1", "change0", "hover0", "change1", "hover1", "change2", "hover2"]
+    assert scheduler.metrics()["held_notifications"] == 0
+    # Cancelling the request a notification waits for releases it.
+    scheduler.submit("session", request("cmd2", "workspace/executeCommand"), lambda: sent.append("cmd2"))
+    scheduler.notify("session", lambda: sent.append("change3"))
+    assert scheduler.cancel("session", "cmd2")
+    assert sent[-1] == "change3"
+
+
+def test_gateway_websocket_session():
+    lsp = gateway.LanguageServerGateway(FAKE_SERVER)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        async with lsp:
+            yield
+
+    app = Starlette(lifespan=lifespan)
+    lsp.mount(app, "/lsp/fake")
+    with TestClient(app) as client:
+        with client.websocket_connect("/lsp/fake") as websocket:
+            websocket.send_text(json.dumps(request(1, "initialize")))
+            response = json.loads(websocket.receive_text())
+            assert response["id"] == 1
+            assert response["result"]["capabilities"]["documentFormattingProvider"]
+            assert client.get("/lsp/fake/metrics").json()["sessions"] == 1
+            websocket.send_text(json.dumps(request(2, "workspace/executeCommand", {"command": "validate"})))
+            assert json.loads(websocket.receive_text()) == {"jsonrpc": "2.0", "id": 2, "result": "validate"}
+        metrics = client.get("/lsp/fake/metrics").json()
+        assert metrics["dispatched"]["heavy"] == 1
+        assert metrics["in_flight"] == 0
+
+
+@pytest.mark.parametrize(
+    "text,changes,expected",
+    [
+        ("abc", [{"text": "xyz"}], "xyz"),
+        (
+            "line one\nline two\n",
+            [{"range": {"start": {"line": 1, "character": 5}, "end": {"line": 1, "character": 8}}, "text": "2"}],
+            "line one\nline 2\n",
+        ),
+        (
+            "a = \"😀\"\nb",
+            [{"range": {"start": {"line": 0, "character": 8}, "end": {"line": 1, "character": 1}}, "text": "\nc"}],
+            "a = \"😀\"\nc",
+        ),
+    ],
+)
+def test_apply_changes(text, changes, expected):
+    assert gateway.apply_changes(text, changes) == expected
+
+
+def did_open(text, version=1):
+    document = {"uri": "file:///main.tf", "languageId": "terraform", "version": version, "text": text}
+    return {"jsonrpc": "2.0", "method": "textDocument/didOpen", "params": {"textDocument": document}}
+
+
+def test_gateway_session_resume():
+    lsp = gateway.LanguageServerGateway(FAKE_SERVER, resume_grace_period=30)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        async with lsp:
+            yield
+
+    def wait_for_detach(client):
+        for _ in range(100):
+            if client.get("/lsp/fake/metrics").json()["detached_sessions"]:
+                return
+            time.sleep(0.01)
+        pytest.fail("Session was not detached")
+
+    app = Starlette(lifespan=lifespan)
+    lsp.mount(app, "/lsp/fake")
+    with TestClient(app) as client:
+        with client.websocket_connect("/lsp/fake?session=tab") as websocket:
+            websocket.send_text(json.dumps(request(1, "initialize")))
+            initialize = json.loads(websocket.receive_text())
+            websocket.send_text(json.dumps(did_open("error here", version=7)))
+            assert len(json.loads(websocket.receive_text())["params"]["diagnostics"]) == 1
+        wait_for_detach(client)
+
+        with client.websocket_connect("/lsp/fake?session=tab") as websocket:
+            websocket.send_text(json.dumps(request(1, "initialize")))
+            assert json.loads(websocket.receive_text()) == initialize
+            websocket.send_text(json.dumps({"jsonrpc": "2.0", "method": "initialized", "params": {}}))
+            # The last diagnostics are replayed without asking the server.
+            assert json.loads(websocket.receive_text())["params"]["uri"] == "file:///main.tf"
+            # Unchanged documents are not re-sent; the next server message answers the request.
+            websocket.send_text(json.dumps(did_open("error here")))
+            websocket.send_text(json.dumps(request(2, "textDocument/hover")))
+            assert json.loads(websocket.receive_text())["id"] == 2
+        wait_for_detach(client)
+        assert client.get("/lsp/fake/metrics").json()["sessions"] == 1
+
+        with client.websocket_connect("/lsp/fake?session=tab") as websocket:
+            websocket.send_text(json.dumps(did_open("fixed")))
+            assert json.loads(websocket.receive_text())["params"]["diagnostics"] == []
+        document = lsp._tokens["tab"].documents["file:///main.tf"]
+        assert document.text == "fixed"
+        assert document.version == 8
+
+
+def test_gateway_workspace_routing_and_pool(tmp_path):
+    workspace = tmp_path / "module"
+    workspace.mkdir()
+    lsp = gateway.LanguageServerGateway(FAKE_SERVER, pool_size=1, workspace_roots=[tmp_path])
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        async with lsp:
+            yield
+
+    app = Starlette(lifespan=lifespan)
+    lsp.mount(app, "/lsp/fake")
+    with TestClient(app) as client:
+        assert client.get("/lsp/fake/metrics").json()["warm_processes"] == 1
+        with client.websocket_connect("/lsp/fake") as websocket:
+            websocket.send_text(json.dumps(request(1, "initialize")))
+            assert json.loads(websocket.receive_text())["id"] == 1
+        with client.websocket_connect(f"/lsp/fake?workspace=file://{workspace}") as websocket:
+            websocket.send_text(json.dumps(request(1, "initialize")))
+            assert json.loads(websocket.receive_text())["id"] == 1
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            with client.websocket_connect("/lsp/fake?workspace=/etc") as websocket:
+                websocket.receive_text()
+        assert disconnect.value.code == 1008
+        assert client.get("/lsp/fake/metrics").json()["warm_processes"] == 1
+
+
+def test_gateway_malformed_message():
+    lsp = gateway.LanguageServerGateway(FAKE_SERVER)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        async with lsp:
+            yield
+
+    app = Starlette(lifespan=lifespan)
+    lsp.mount(app, "/lsp/fake")
+    with TestClient(app) as client:
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            with client.websocket_connect("/lsp/fake") as websocket:
+                websocket.send_text("{not json")
+                websocket.receive_text()
+        assert disconnect.value.code == 1007
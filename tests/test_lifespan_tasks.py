@@ -1,5 +1,18 @@
+import asyncio
+import pathlib
+
 import pytest
-from monaco_editors import lifespan_tasks
+import reflex.utils.processes
+from monaco_editors import lifespan_tasks, terraform
+
+def test_lazy_package_attributes():
+    import monaco_editors
+
+    assert "start_language_servers" in dir(monaco_editors)
+    assert monaco_editors.start_language_servers is lifespan_tasks.start_language_servers
+    with pytest.raises(AttributeError):
+        monaco_editors.not_an_attribute
+
 
 @pytest.mark.asyncio
 async def test_start_terraform_ls(monkeypatch):
@@ -18,10 +31,10 @@ async def test_start_terraform_ls(monkeypatch):
     def fake_new_process(cmd, show_logs, shell, cwd):
         called['new_process'] = cmd
         return FakeProc()
-    monkeypatch.setattr(lifespan_tasks, "download_terraform_ls", fake_download_terraform_ls)
-    monkeypatch.setattr(lifespan_tasks, "download_lsp_ws_proxy", fake_download_lsp_ws_proxy)
-    monkeypatch.setattr(lifespan_tasks, "get_bin_dir", fake_get_bin_dir)
-    monkeypatch.setattr(lifespan_tasks, "new_process", fake_new_process)
+    monkeypatch.setattr(terraform, "download_terraform_ls", fake_download_terraform_ls)
+    monkeypatch.setattr(terraform, "download_lsp_ws_proxy", fake_download_lsp_ws_proxy)
+    monkeypatch.setattr(terraform, "get_bin_dir", fake_get_bin_dir)
+    monkeypatch.setattr(reflex.utils.processes, "new_process", fake_new_process)
     async with lifespan_tasks.start_terraform_ls(port=1234):
         pass
     assert called['terraform_ls']
@@ -29,3 +42,104 @@ async def test_start_terraform_ls(monkeypatch):
     assert called['new_process']
     assert called['terminated']
     assert called['waited']
+
+
+@pytest.mark.asyncio
+async def test_start_terraform_gateway(monkeypatch, tmp_path):
+    from starlette.applications import Starlette
+
+    called = {}
+    monkeypatch.setattr(terraform, "download_terraform_ls", lambda: called.setdefault("terraform_ls", True))
+    monkeypatch.setattr(terraform, "get_bin_dir", lambda: tmp_path)
+    app = Starlette()
+    async with lifespan_tasks.start_terraform_gateway(app=app, path="/lsp/tf"):
+        assert [route.path for route in app.router.routes[:2]] == ["/lsp/tf", "/lsp/tf/metrics"]
+    assert called["terraform_ls"]
+
+
+@pytest.mark.asyncio
+async def test_start_language_servers(monkeypatch):
+    import sys
+    from starlette.applications import Starlette
+    from monaco_editors.models import LanguageServerSpec
+
+    monkeypatch.setattr(lifespan_tasks, "available_cores", lambda: 4)
+    fake = str(pathlib.Path(__file__).parent / "fake_language_server.py")
+    specs = [
+        LanguageServerSpec(language_id="yaml", command=sys.executable, args=[fake], env={"YAML_CACHE": "/cache"}),
+        LanguageServerSpec(language_id="json", command=lambda: sys.executable, args=[fake], pool_size=0),
+    ]
+    app = Starlette()
+    async with lifespan_tasks.start_language_servers(app=app, specs=specs):
+        paths = [route.path for route in app.router.routes]
+        assert "/lsp/yaml" in paths
+        assert "/lsp/json/metrics" in paths
+        gateways = {route.path: route.endpoint.__self__ for route in app.router.routes}
+        yaml, json = gateways["/lsp/yaml"], gateways["/lsp/json"]
+        assert sorted([yaml.pool_size, json.pool_size]) == [0, 2]
+        assert yaml.scheduler is json.scheduler
+        assert yaml.env == {"YAML_CACHE": "/cache"}
+        assert yaml.scheduler.max_in_flight == 8
+    assert all(process.returncode is not None for process in yaml._warm) and not yaml._warm
+
+
+@pytest.mark.asyncio
+async def test_serve_workspace_files(tmp_path):
+    from starlette.applications import Starlette
+
+    app = Starlette()
+    async with lifespan_tasks.serve_workspace_files(app=app, roots=[tmp_path], page_size=10):
+        assert [route.path for route in app.router.routes[:3]] == [
+            "/workspace/files/stat",
+            "/workspace/files/list",
+            "/workspace/files/file",
+        ]
+        assert app.router.routes[0].endpoint.__self__.page_size == 10
+
+
+@pytest.mark.asyncio
+async def test_serve_documents():
+    from starlette.applications import Starlette
+    from monaco_editors.documents import MemoryDocumentStore
+
+    app = Starlette()
+    store = MemoryDocumentStore()
+    async with lifespan_tasks.serve_documents(app=app, store=store, path="/docs"):
+        assert [route.path for route in app.router.routes[:2]] == ["/docs/chunks/{digest}", "/docs/documents/{document_id:path}"]
+        assert app.router.routes[0].endpoint.__self__.store is store
+
+
+@pytest.mark.asyncio
+async def test_serve_workspace_search(tmp_path):
+    from starlette.applications import Starlette
+    from monaco_editors.search import WorkspaceIndex
+
+    (tmp_path / "main.tf").write_text('module "network" {}\n')
+    app = Starlette()
+    index = WorkspaceIndex([tmp_path])
+    async with lifespan_tasks.serve_workspace_search(app=app, index=index, interval=60):
+        assert app.router.routes[0].path == "/workspace/search"
+        await asyncio.sleep(0.1)
+        assert index.search("network")["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_preindex_workspaces(tmp_path, monkeypatch):
+    import os
+    from monaco_editors import preindex
+
+    monkeypatch.setenv(preindex.PLUGIN_CACHE_ENV, "/previous")
+    runs = []
+
+    async def run(self):
+        runs.append(self)
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(preindex.WorkspacePreindexer, "run", run)
+    async with lifespan_tasks.preindex_workspaces(workspaces=[tmp_path], cache_dir=tmp_path / "cache", max_workers=3):
+        await asyncio.sleep(0)
+        assert runs[0].max_workers == 3
+        # The backend's own environment is left alone; the language servers get the cache through their spec.
+        assert os.environ[preindex.PLUGIN_CACHE_ENV] == "/previous"
+    spec = lifespan_tasks.terraform_language_server(cache_dir=tmp_path / "cache")
+    assert spec.env == {preindex.PLUGIN_CACHE_ENV: str(tmp_path / "cache" / "plugins")}
@@ -1,3 +1,5 @@
+import pytest
+
 from monaco_editors import models
 import reflex as rx
 
@@ -7,6 +9,9 @@ def test_command_model():
     assert cmd.method == "test"
     assert cmd.params["foo"] == "bar"
     assert not cmd.restart_client
+    assert cmd.concurrency == 1
+    with pytest.raises(ValueError):
+        models.Command(type="request", method="test", params={}, concurrency=0)
 
 def test_language_server_url():
     url = models.LanguageServerUrl(host="localhost", port=9999, secured=True, path="/ws")
@@ -28,3 +33,72 @@ def test_language_client_config():
     config = models.LanguageClientConfig(language_id="terraform", url=url)
     assert config.language_id == "terraform"
     assert config.url == url
+    assert not config.shared_worker
+
+def test_client_middleware():
+    middleware = models.ClientMiddleware()
+    assert "textDocument/completion" in middleware.cancel_superseded
+    assert middleware.cache_results == ["textDocument/hover", "textDocument/documentLink"]
+    url = models.LanguageServerUrl(host="localhost", port=9999)
+    config = models.LanguageClientConfig(language_id="terraform", url=url, middleware=middleware)
+    assert config.middleware == middleware
+    with pytest.raises(ValueError):
+        models.ClientMiddleware(cache_results=["workspace/executeCommand"])
+
+def test_language_server_spec():
+    spec = models.LanguageServerSpec(language_id="yaml", command="yaml-language-server", args=["--stdio"])
+    assert spec.resolve_command() == ["yaml-language-server", "--stdio"]
+    assert spec.pool_size is None
+    resolved = models.LanguageServerSpec(language_id="terraform", command=lambda: "/bin/terraform-ls", args=["serve"])
+    assert resolved.resolve_command() == ["/bin/terraform-ls", "serve"]
+
+def test_large_file_policy():
+    policy = models.LargeFilePolicy(max_lines=100)
+    assert policy.max_bytes == 5 * 1024 * 1024
+    assert policy.editor_options["codeLens"] is False
+    assert models.LargeFilePolicy().editor_options is not policy.editor_options
+    with pytest.raises(ValueError):
+        models.LargeFilePolicy(chunk_size=0)
+
+def test_stream_config():
+    config = models.StreamConfig()
+    assert config.max_lines == 100_000
+    assert config.auto_scroll
+    with pytest.raises(ValueError):
+        models.StreamConfig(max_lines=0)
+
+def test_diagnostics_config():
+    config = models.DiagnosticsConfig()
+    assert config.min_severity == "hint"
+    assert config.max_rate == 1.0
+    with pytest.raises(ValueError):
+        models.DiagnosticsConfig(max_rate=0)
+    with pytest.raises(ValueError):
+        models.DiagnosticsConfig(min_severity="fatal")
+
+def test_diff_config():
+    config = models.DiffConfig(max_computation_time=0)
+    assert config.max_file_size == 50
+    assert config.render_side_by_side
+    assert not config.original_editable
+    with pytest.raises(ValueError):
+        models.DiffConfig(max_computation_time=-1)
+
+def test_model_cache():
+    cache = models.ModelCache(max_models=5)
+    assert cache.max_bytes == 50 * 1024 * 1024
+    with pytest.raises(ValueError):
+        models.ModelCache(max_models=0)
+
+
+def test_workspace_files():
+    files = models.WorkspaceFiles(url="http://localhost:8000/workspace/files")
+    assert (files.page_size, files.cache_size, files.stat_ttl) == (500, 200, 2000)
+    with pytest.raises(ValueError):
+        models.WorkspaceFiles(url="http://localhost:8000/workspace/files", page_size=0)
+
+
+def test_document_sync():
+    assert models.DocumentSync(url="http://localhost:8000/documents").debounce == 300
+    with pytest.raises(ValueError):
+        models.DocumentSync(url="http://localhost:8000/documents", debounce=-1)
@@ -0,0 +1,34 @@
+import pytest
+
+from monaco_editors import placeholder
+from monaco_editors.placeholder import highlight_placeholder
+
+
+@pytest.mark.parametrize(
+    "text,filename,expected",
+    [
+        ('resource "aws_s3_bucket" "b" {}', "main.tf", ['">resource</span>', '">&quot;aws_s3_bucket&quot;</span>']),
+        ("# note\ncount = 3", "vars.tfvars", ['"># note</span>', "\ncount = <span", '">3</span>']),
+        ("def f():\n    return 'x'", "app.py", ['">def</span>', '">return</span>', '">&#x27;x&#x27;</span>']),
+        ('{"a": true}', "data.json", ['">&quot;a&quot;</span>', '">true</span>']),
+        ("x < y", "notes.txt", ["x &lt; y</pre>"]),
+    ],
+)
+def test_highlight_placeholder(text, filename, expected):
+    html = highlight_placeholder(text, filename)
+    assert html.startswith("<pre ")
+    for expected_string in expected:
+        assert expected_string in html
+
+
+def test_highlight_placeholder_lines():
+    html = highlight_placeholder("\n".join(str(n) for n in range(1000)), "log.txt", max_lines=3)
+    assert html.endswith(">0\n1\n2</pre>")
+
+
+def test_highlight_placeholder_cache():
+    placeholder._PLACEHOLDER_CACHE.clear()
+    first = highlight_placeholder("a = 1", "main.tf")
+    assert highlight_placeholder("a = 1", "main.tf") is first
+    highlight_placeholder("a = 1", "main.py")
+    assert len(placeholder._PLACEHOLDER_CACHE) == 2
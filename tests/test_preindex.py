@@ -0,0 +1,80 @@
+import asyncio
+import json
+import sys
+
+import pytest
+
+from monaco_editors import preindex
+
+# Stands in for `terraform`: `init` records the plugin cache and writes a lock file and `.terraform` (failing if another
+# init runs at the same time), `providers schema -json` prints a schema, and workspaces named "broken" fail.
+FAKE_TERRAFORM = """#!{python}
+import json, os, pathlib, sys, time
+if pathlib.Path.cwd().name == "broken":
+    sys.exit("Error: Failed to query available provider packages")
+if pathlib.Path.cwd().name == "slow":
+    time.sleep(5)
+with open(os.environ["CALLS"], "a") as calls:
+    calls.write(json.dumps([pathlib.Path.cwd().name, sys.argv[1:], os.environ["TF_PLUGIN_CACHE_DIR"]]) + "\\n")
+if sys.argv[1] == "init":
+    running = pathlib.Path(os.environ["CALLS"] + ".init")
+    if running.exists():
+        sys.exit("Error: the plugin cache is in use by another init")
+    running.touch()
+    time.sleep(0.1)
+    running.unlink()
+    pathlib.Path(".terraform").mkdir(exist_ok=True)
+    pathlib.Path(".terraform.lock.hcl").write_text('provider "registry.terraform.io/hashicorp/aws" {}')
+else:
+    print(json.dumps({"provider_schemas": {"registry.terraform.io/hashicorp/aws": {}}}))
+"""
+
+
+@pytest.fixture
+def terraform(tmp_path, monkeypatch):
+    path = tmp_path / "terraform"
+    path.write_text(FAKE_TERRAFORM.replace("{python}", sys.executable))
+    path.chmod(0o755)
+    monkeypatch.setenv("CALLS", str(tmp_path / "calls.jsonl"))
+    return str(path)
+
+
+def calls(tmp_path):
+    return [json.loads(line) for line in (tmp_path / "calls.jsonl").read_text().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_run(tmp_path, terraform):
+    workspaces = [tmp_path / name for name in ("network", "app", "broken")]
+    for workspace in workspaces:
+        workspace.mkdir()
+    cache_dir = tmp_path / "cache"
+    preindexer = preindex.WorkspacePreindexer(workspaces, cache_dir, max_workers=2, terraform=terraform)
+    results = await preindexer.run()
+    # Both inits succeed, so they didn't run at the same time.
+    assert results == {workspaces[0]: "indexed", workspaces[1]: "indexed", workspaces[2]: "failed"}
+    assert sorted(call[0:2] for call in calls(tmp_path)) == [
+        ["app", ["init", "-input=false", "-backend=false", "-no-color"]],
+        ["app", ["providers", "schema", "-json"]],
+        ["network", ["init", "-input=false", "-backend=false", "-no-color"]],
+        ["network", ["providers", "schema", "-json"]],
+    ]
+    assert {call[2] for call in calls(tmp_path)} == {str(cache_dir / "plugins")}
+    assert preindexer.schema(workspaces[0]) == {"provider_schemas": {"registry.terraform.io/hashicorp/aws": {}}}
+    assert preindexer.schema(workspaces[2]) is None
+
+    # Unchanged workspaces are skipped on the next start; ones whose `.terraform` is gone are re-initialized.
+    (tmp_path / "calls.jsonl").unlink()
+    (workspaces[1] / ".terraform").rmdir()
+    preindexer = preindex.WorkspacePreindexer(workspaces[:2], cache_dir, terraform=terraform)
+    assert await preindexer.run() == {workspaces[0]: "cached", workspaces[1]: "indexed"}
+    assert {call[0] for call in calls(tmp_path)} == {"app"}
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_missing_terraform(tmp_path, terraform):
+    (tmp_path / "slow").mkdir()
+    preindexer = preindex.WorkspacePreindexer([tmp_path / "slow"], tmp_path / "cache", terraform=terraform, timeout=0.2)
+    assert await asyncio.wait_for(preindexer.run(), 2) == {tmp_path / "slow": "failed"}
+    preindexer = preindex.WorkspacePreindexer([tmp_path / "slow"], tmp_path / "cache", terraform=str(tmp_path / "nope"))
+    assert await preindexer.run() == {tmp_path / "slow": "failed"}
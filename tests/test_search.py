@@ -0,0 +1,119 @@
+import asyncio
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from monaco_editors import search
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "workspace"
+    (root / "modules" / "bucket").mkdir(parents=True)
+    (root / ".terraform").mkdir()
+    (root / "main.tf").write_text('module "bucket" {\n  source = "./modules/bucket"\n}\n')
+    (root / "modules" / "bucket" / "bucket.tf").write_text(
+        'resource "aws_s3_bucket" "this" {\n  bucket = var.bucket_name\n}\n'
+    )
+    (root / "modules" / "bucket" / "variables.tf").write_text('variable "bucket_name" {\n  type = string\n}\n')
+    (root / ".terraform" / "cached.tf").write_text('resource "aws_s3_bucket" "cached" {}\n')
+    (root / "plugin.bin").write_bytes(b"\0bucket")
+    return root
+
+
+def test_literals():
+    assert search.literals(r'resource\s+"aws_s3') == ["resource", '"aws_s3']
+    assert search.literals(r"colou?r") == ["colo", "r"]
+    assert search.literals(r"ab{0,2}c{2}d") == ["a", "c", "d"]
+    assert search.literals(r"foo(bar)?baz") == ["foo", "baz"]
+    assert search.literals(r"\bvar\.bucket\b") == ["var.bucket"]
+    assert search.literals(r"[\]ab]cd\x41ef") == ["cd", "ef"]
+    assert search.literals(r"foo|bar") == []
+
+
+@pytest.mark.asyncio
+async def test_search(root):
+    index = search.WorkspaceIndex([root])
+    assert await index.refresh() == 4
+    assert len(index) == 3
+
+    results = index.search("BUCKET")
+    assert results["total"] == 6
+    assert results["next"] is None
+    # bucket.tf matches by name and has the most whole-word matches.
+    assert results["matches"][0] == {
+        "path": str(root / "modules" / "bucket" / "bucket.tf"),
+        "uri": (root / "modules" / "bucket" / "bucket.tf").as_uri(),
+        "line": 1,
+        "column": 18,
+        "end_line": 1,
+        "end_column": 24,
+        "preview": 'resource "aws_s3_bucket" "this" {',
+    }
+    assert index.search("BUCKET", case_sensitive=True)["total"] == 0
+
+    results = index.search(r"^\s+bucket\s*=", regex=True)
+    assert [(match["path"], match["line"]) for match in results["matches"]] == [
+        (str(root / "modules" / "bucket" / "bucket.tf"), 2)
+    ]
+    assert index.search("string|number", regex=True)["total"] == 1
+
+    pages, offset = [], 0
+    while offset is not None:
+        page = index.search("bucket", offset=offset, limit=4)
+        pages.extend(page["matches"])
+        offset = page["next"]
+    assert pages == index.search("bucket", limit=100)["matches"]
+    with pytest.raises(search.re.error):
+        index.search("(", regex=True)
+
+
+@pytest.mark.asyncio
+async def test_refresh(root):
+    index = search.WorkspaceIndex([root])
+    await index.refresh()
+    assert await index.refresh() == 0
+
+    variables = root / "modules" / "bucket" / "variables.tf"
+    variables.write_text('variable "bucket_region" {\n  type = string\n}\n')
+    os.utime(variables, ns=(0, variables.stat().st_mtime_ns + 1_000_000_000))
+    (root / "main.tf").unlink()
+    (root / "outputs.tf").write_text('output "region" {\n  value = "eu-west-1"\n}\n')
+    assert await index.refresh() == 3
+
+    assert index.search("bucket_name")["total"] == 1
+    # outputs.tf has a whole-word match, variables.tf only `bucket_region`.
+    assert [match["path"] for match in index.search("region")["matches"]] == [str(root / "outputs.tf"), str(variables)]
+    assert index.search("./modules")["total"] == 0
+    assert "./m" not in index._postings  # Trigrams of removed text are dropped.
+
+
+@pytest.mark.asyncio
+async def test_watch(root):
+    index = search.WorkspaceIndex([root])
+    task = asyncio.create_task(index.watch(0.01))
+    await asyncio.sleep(0.05)
+    (root / "outputs.tf").write_text('output "id" {}\n')
+    await asyncio.sleep(0.1)
+    task.cancel()
+    assert index.search("output")["total"] == 1
+
+
+def test_search_endpoint(root):
+    index = search.WorkspaceIndex([root], page_size=2)
+    asyncio.run(index.refresh())
+    app = Starlette()
+    index.mount(app, "/workspace/search")
+    with TestClient(app) as client:
+        page = client.get("/workspace/search", params={"q": "bucket", "limit": 100}).json()
+        assert len(page["matches"]) == 2
+        assert page["total"] == 6
+        assert page["next"] == 2
+        page = client.get("/workspace/search", params={"q": "Bucket", "case": "1"}).json()
+        assert page["total"] == 0
+        page = client.get("/workspace/search", params={"q": r"var\.\w+", "regex": "true"}).json()
+        assert page["matches"][0]["preview"] == "  bucket = var.bucket_name"
+        assert client.get("/workspace/search", params={"q": "(", "regex": "1"}).status_code == 400
+        assert client.get("/workspace/search", params={"q": "a", "offset": "x"}).status_code == 400
@@ -0,0 +1,44 @@
+import reflex as rx
+
+from monaco_editors import base, constants, snippet
+
+
+class SnippetTestState(rx.State):
+    code: str = ""
+    code_placeholder: str = ""
+
+
+def test_snippet_static_view():
+    component = snippet.MonacoSnippet.create(filename="main.tf", value='module "vpc" {}\n# done')
+    rendered = component.render()
+    assert len(rendered["children"]) == 1
+    assert '">module</span>' in str(rendered["children"])
+    assert any("registerMonacoSnippet" in prop for prop in rendered["props"])
+    assert not any(prop.startswith(("value", "placeholder")) for prop in rendered["props"])
+    assert "const registerMonacoSnippet" in "".join(component._get_all_custom_code())
+
+
+def test_snippet_state_bound():
+    plain = snippet.MonacoSnippet.create(filename="main.tf", value=SnippetTestState.code)
+    assert "dangerouslySetInnerHTML" not in str(plain.render()["children"])
+    highlighted = snippet.MonacoSnippet.create(
+        filename="main.tf", value=SnippetTestState.code, placeholder=SnippetTestState.code_placeholder
+    )
+    assert "code_placeholder" in str(highlighted.render()["children"])
+    assert any(prop.startswith('"data-value":') and "code" in prop for prop in highlighted.render()["props"])
+
+
+def test_snippet_loads_full_value():
+    code = "\n".join(f"line {n}" for n in range(100))
+    component = snippet.MonacoSnippet.create(filename="a.py", value=code, placeholder="<pre>line 0</pre>")
+    rendered = component.render()
+    assert any(prop.startswith('"data-value":') and "line 99" in prop for prop in rendered["props"])
+    assert "element.dataset.value" in constants.FunctionConstants.SNIPPETS
+
+
+def test_snippets_share_custom_code():
+    page = rx.el.div(
+        base.monaco_editor.snippet(filename="a.py", value="a = 1"),
+        base.monaco_editor.snippet(filename="b.py", value="b = 2"),
+    )
+    assert "".join(page._get_all_custom_code()).count("const registerMonacoSnippet") == 1
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from monaco_editors import workspace
+
+
+@pytest.fixture
+def client(tmp_path):
+    root = tmp_path / "workspace"
+    (root / "modules" / "network").mkdir(parents=True)
+    (root / "main.tf").write_text('module "network" {}\n')
+    for n in range(5):
+        (root / "modules" / "network" / f"file{n}.tf").write_text(f"# {n}\n")
+    (tmp_path / "secret.txt").write_text("secret")
+    (root / "escape").symlink_to(tmp_path / "secret.txt")
+    app = Starlette()
+    workspace.WorkspaceFileServer([root], page_size=2).mount(app, "/workspace/files")
+    with TestClient(app) as test_client:
+        yield test_client, root
+
+
+def test_stat(client):
+    test_client, root = client
+    stat = test_client.get("/workspace/files/stat", params={"path": f"{root}/main.tf"}).json()
+    assert stat["type"] == "file"
+    assert stat["size"] == len('module "network" {}\n')
+    assert stat["etag"] == workspace.etag(os.stat(root / "main.tf"))
+    assert test_client.get("/workspace/files/stat", params={"path": f"{root}/modules"}).json()["type"] == "directory"
+    assert test_client.get("/workspace/files/stat", params={"path": f"{root}/missing.tf"}).status_code == 404
+
+
+def test_list_pagination(client):
+    test_client, root = client
+    names, cursor = [], 0
+    while cursor is not None:
+        page = test_client.get(
+            "/workspace/files/list", params={"path": f"{root}/modules/network", "cursor": cursor, "limit": 100}
+        ).json()
+        assert len(page["entries"]) <= 2
+        names.extend(entry["name"] for entry in page["entries"])
+        cursor = page["next"]
+    assert names == [f"file{n}.tf" for n in range(5)]
+    assert test_client.get("/workspace/files/list", params={"path": f"{root}/main.tf"}).status_code == 404
+
+
+def test_file_validation(client):
+    test_client, root = client
+    response = test_client.get("/workspace/files/file", params={"path": f"{root}/main.tf"})
+    assert response.text == 'module "network" {}\n'
+    assert response.headers["cache-control"] == "no-cache"
+    headers = {"If-None-Match": response.headers["etag"]}
+    assert test_client.get("/workspace/files/file", params={"path": f"{root}/main.tf"}, headers=headers).status_code == 304
+    headers = {"If-Modified-Since": response.headers["last-modified"]}
+    assert test_client.get("/workspace/files/file", params={"path": f"{root}/main.tf"}, headers=headers).status_code == 304
+
+    (root / "main.tf").write_text('module "network" {\n  source = "./modules/network"\n}\n')
+    os.utime(root / "main.tf", ns=(0, os.stat(root / "main.tf").st_mtime_ns + 1_000_000_000))
+    response = test_client.get(
+        "/workspace/files/file", params={"path": f"{root}/main.tf"}, headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert response.status_code == 200
+    assert "source" in response.text
+
+
+@pytest.mark.parametrize("path", ["/etc/passwd", "{root}/../secret.txt", "{root}/escape", ""])
+def test_outside_roots(client, path):
+    test_client, root = client
+    response = test_client.get("/workspace/files/file", params={"path": path.format(root=root)})
+    assert response.status_code == 404
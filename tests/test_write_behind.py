@@ -0,0 +1,107 @@
+import asyncio
+import contextlib
+import json
+import pathlib
+import sys
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from monaco_editors import gateway
+from monaco_editors.write_behind import WriteBehind
+
+FAKE_SERVER = [sys.executable, str(pathlib.Path(__file__).parent / "fake_language_server.py")]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_writes(tmp_path):
+    main = tmp_path / "main.tf"
+    main.write_text("a = 0\n")
+    async with WriteBehind([tmp_path], delay=60, fsync_delay=60) as write_behind:
+        for n in range(1, 11):
+            write_behind.update(main.as_uri(), f"a = {n}\n")
+        assert main.read_text() == "a = 0\n"
+        await write_behind.flush()
+        await write_behind.sync()
+        assert main.read_text() == "a = 10\n"
+        metrics = write_behind.metrics()
+        assert (metrics["updates"], metrics["writes"], metrics["fsyncs"], metrics["pending"]) == (10, 1, 1, 0)
+        # Unchanged content and documents outside the roots are not written.
+        write_behind.update(main.as_uri(), "a = 10\n")
+        write_behind.update("file:///etc/hosts", "")
+        write_behind.update("inmemory://model/1", "")
+        await write_behind.flush()
+        assert write_behind.metrics()["unchanged"] == 1
+    assert [path.name for path in tmp_path.iterdir()] == ["main.tf"]
+
+
+@pytest.mark.asyncio
+async def test_delayed_write(tmp_path):
+    main = tmp_path / "main.tf"
+    async with WriteBehind([tmp_path], delay=0.01, fsync_delay=0.01) as write_behind:
+        write_behind.update(main.as_uri(), "a = 1\n")
+
+        async def synced():
+            while write_behind.metrics()["fsyncs"] == 0:
+                await asyncio.sleep(0.01)
+
+        # The timers write and then fsync the document without a flush.
+        await asyncio.wait_for(synced(), timeout=5)
+        assert main.read_text() == "a = 1\n"
+
+
+def test_resolve_is_cached(tmp_path):
+    write_behind = WriteBehind([tmp_path])
+    uri = (tmp_path / "main.tf").as_uri()
+    assert write_behind.resolve(uri) is write_behind.resolve(uri)
+    assert write_behind.resolve(tmp_path.as_uri()) is None
+    assert write_behind.resolve("inmemory://model/1") is None
+
+
+@pytest.mark.asyncio
+async def test_flush_and_exit(tmp_path):
+    (tmp_path / "modules").mkdir()
+    first, second = tmp_path / "main.tf", tmp_path / "modules" / "variables.tf"
+    async with WriteBehind([tmp_path], delay=60, fsync_delay=60) as write_behind:
+        write_behind.update(first.as_uri(), "a = 1\n")
+        write_behind.update(second.as_uri(), 'variable "b" {}\n')
+        await write_behind.flush([first.as_uri()])
+        assert first.read_text() == "a = 1\n"
+        assert not second.exists()
+        assert write_behind.metrics()["unsynced"] == 1
+    # Leaving the context writes and fsyncs the rest.
+    assert second.read_text() == 'variable "b" {}\n'
+    assert write_behind.metrics()["fsyncs"] == 1
+
+
+def test_gateway_flushes_before_commands(tmp_path):
+    main = tmp_path / "main.tf"
+    main.write_text("a = 0\n")
+    write_behind = WriteBehind([tmp_path], delay=60)
+    lsp = gateway.LanguageServerGateway(FAKE_SERVER, write_behind=write_behind)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        async with write_behind, lsp:
+            yield
+
+    app = Starlette(lifespan=lifespan)
+    lsp.mount(app, "/lsp/fake")
+    document = {"uri": main.as_uri(), "languageId": "terraform", "version": 1, "text": "a = 0\n"}
+    change = {
+        "textDocument": {"uri": main.as_uri(), "version": 2},
+        "contentChanges": [{"range": {"start": {"line": 0, "character": 4}, "end": {"line": 0, "character": 5}}, "text": "1"}],
+    }
+    with TestClient(app) as client:
+        with client.websocket_connect("/lsp/fake") as websocket:
+            websocket.send_text(json.dumps({"jsonrpc": "2.0", "method": "textDocument/didOpen", "params": {"textDocument": document}}))
+            websocket.receive_text()
+            websocket.send_text(json.dumps({"jsonrpc": "2.0", "method": "textDocument/didChange", "params": change}))
+            websocket.receive_text()
+            assert client.get("/lsp/fake/metrics").json()["write_behind"]["pending"] == 1
+            assert main.read_text() == "a = 0\n"
+            command = {"jsonrpc": "2.0", "id": 1, "method": "workspace/executeCommand", "params": {"command": "validate"}}
+            websocket.send_text(json.dumps(command))
+            assert json.loads(websocket.receive_text())["id"] == 1
+            assert main.read_text() == "a = 1\n"